@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark for the page table generation in gen_mmu.py
+
+Builds the page tables for a synthetic memory map in each paging mode, and
+measures how long the different stages take:
+
+  reserve: instantiating the paging structures for the address space
+  map:     mapping the kernel image and the extra regions
+  perms:   adjusting the permissions of the text and rodata regions
+  check:   checking that the extra regions are not already mapped
+  write:   writing out the page tables
+
+Each paging mode is run once for each of the --sizes values. The address
+space and the mapped kernel image are that many bytes large, so GB-scale
+regions can be used to find out how the generation scales with large memory
+maps or demand paging.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import gen_mmu
+
+STAGES = ("reserve", "map", "perms", "check", "write")
+
+PTABLE_CLASSES = (gen_mmu.Ptables32bit, gen_mmu.PtablesPAE,
+                  gen_mmu.PtablesIA32e)
+
+# Base address of the address space in the benchmark
+VM_BASE = 0x40000000
+
+
+def main():
+    args = parse_args()
+
+    # gen_mmu.py reads its command line arguments from a global
+    gen_mmu.args = argparse.Namespace(verbose=None)
+
+    print(f"{'mode':>14} {'size (MiB)':>12} " +
+          " ".join(f"{stage + ' (s)':>12}" for stage in STAGES) +
+          f" {'tables (KiB)':>13}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, "mmu_tables.bin")
+
+        for pclass in PTABLE_CLASSES:
+            for size in args.sizes:
+                if pclass is gen_mmu.Ptables32bit and \
+                   VM_BASE + 2 * size > 1 << 32:
+                    # Does not fit in the 32-bit address space
+                    continue
+
+                times, written_size = run_stages(pclass, size, output)
+
+                print(f"{pclass.__name__:>14} {size >> 20:>12} " +
+                      " ".join(f"{times[stage]:>12.3f}" for stage in STAGES) +
+                      f" {written_size >> 10:>13}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        allow_abbrev=False)
+
+    parser.add_argument("--sizes", type=lambda s: int(s, 0), nargs="+",
+                        default=[64 << 20, 1 << 30],
+                        help="sizes of the address space in bytes "
+                             "(default: 64 MiB and 1 GiB)")
+
+    return parser.parse_args()
+
+
+def run_stages(pclass, size, output):
+    # Builds the page tables for an address space of 'size' bytes with
+    # 'pclass'. Returns a (dict mapping stage names to times, number of bytes
+    # written) tuple.
+
+    times = {}
+
+    # Like a kernel with a quarter of its image being text and an eighth
+    # rodata, and an extra region of the same size as the image mapped right
+    # after the address space
+    gen_mmu.syms = {
+        "__text_region_start": VM_BASE,
+        "__text_region_size": size // 4,
+        "__rodata_region_start": VM_BASE + size // 4,
+        "__rodata_region_size": size // 8,
+    }
+    extra_base = VM_BASE + size
+
+    pt = pclass(VM_BASE + size - 0x100000)
+
+    t = time.perf_counter()
+    pt.reserve(VM_BASE, size)
+    pt.reserve_unaligned(extra_base, size)
+    times["reserve"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    pt.map(VM_BASE, VM_BASE, size,
+           gen_mmu.FLAG_P | gen_mmu.ENTRY_RW | gen_mmu.ENTRY_XD)
+    pt.map(extra_base, None, size, gen_mmu.FLAG_P | gen_mmu.ENTRY_RW)
+    times["map"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    pt.set_region_perms("__text_region", gen_mmu.FLAG_P | gen_mmu.ENTRY_US)
+    pt.set_region_perms("__rodata_region",
+                        gen_mmu.FLAG_P | gen_mmu.ENTRY_US | gen_mmu.ENTRY_XD)
+    times["perms"] = time.perf_counter() - t
+
+    # Unmapped regions need to be searched completely
+    t = time.perf_counter()
+    if pt.is_region_mapped(extra_base + size, size):
+        sys.exit("region after the extra region unexpectedly mapped")
+    times["check"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    written_size = pt.write_output(output)
+    times["write"] = time.perf_counter() - t
+
+    return times, written_size
+
+
+if __name__ == "__main__":
+    main()
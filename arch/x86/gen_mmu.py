@@ -70,19 +70,20 @@ import array
 import argparse
 import ctypes
 import os
-import struct
 import re
 import textwrap
 
 from packaging import version
 
 import elftools
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
 
 if version.parse(elftools.__version__) < version.parse('0.24'):
     sys.exit("pyelftools is out of date, need version 0.24 or later")
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..',
+                                'scripts', 'build'))
+from elf_index import ElfIndex
+
 
 def bit(pos):
     """Get value by shifting 1 by pos"""
@@ -188,15 +189,14 @@ class MMUTable():
                                    [0 for i in range(self.num_entries)])
 
     def get_binary(self):
-        """Return a bytearray representation of this table"""
+        """Return a bytes representation of this table"""
         # Always little-endian
-        ctype = "<" + self.type_code
-        entry_size = struct.calcsize(ctype)
-        ret = bytearray(entry_size * self.num_entries)
+        if sys.byteorder == "little":
+            return self.entries.tobytes()
 
-        for i in range(self.num_entries):
-            struct.pack_into(ctype, ret, entry_size * i, self.entries[i])
-        return ret
+        entries = array.array(self.type_code, self.entries)
+        entries.byteswap()
+        return entries.tobytes()
 
     @property
     def supported_flags(self):
@@ -277,6 +277,54 @@ class MMUTable():
         self.entries[index] = ((self.entries[index] & self.addr_mask) |
                                (entry_flags & self.supported_flags))
 
+    def map_range(self, virt_addr, count, phys_addr, entry_flags):
+        """Like map(), but for 'count' consecutive entries starting at the
+        entry for the provided virtual address, mapping consecutive physical
+        addresses starting at phys_addr. All entries must be in this table.
+
+        Only valid for leaf tables, where consecutive entries map
+        consecutive physical addresses."""
+        index = self.entry_index(virt_addr)
+        step = 1 << self.addr_shift
+
+        verbose("%s: mapping 0x%x to 0x%x (%d entries) : %s" %
+                (self.__class__.__name__,
+                 phys_addr, virt_addr, count, dump_flags(entry_flags)))
+
+        phys_end = phys_addr + count * step
+        flags = entry_flags & self.supported_flags
+
+        if (phys_addr & self.addr_mask) + count * step == \
+           ((phys_end - step) & self.addr_mask) + step:
+            # No address bits are masked out within the run, so the entries
+            # are just a range
+            start = (phys_addr & self.addr_mask) | flags
+            entries = range(start, start + count * step, step)
+        else:
+            entries = [(addr & self.addr_mask) | flags
+                       for addr in range(phys_addr, phys_end, step)]
+
+        self.entries[index:index + count] = array.array(self.type_code,
+                                                        entries)
+
+    def set_perms_range(self, virt_addr, count, entry_flags):
+        """Like set_perms(), but for 'count' consecutive entries starting at
+        the entry for the provided virtual address. All entries must be in
+        this table."""
+        index = self.entry_index(virt_addr)
+
+        verbose("%s: changing perm at 0x%x (%d entries) : %s" %
+                (self.__class__.__name__,
+                 virt_addr, count, dump_flags(entry_flags)))
+
+        flags = entry_flags & self.supported_flags
+        mask = self.addr_mask
+
+        self.entries[index:index + count] = array.array(
+            self.type_code,
+            [(entry & mask) | flags
+             for entry in self.entries[index:index + count]])
+
 
 # Specific supported table types
 class Pml4(MMUTable):
@@ -372,34 +420,68 @@ class PtableSet():
         level_from_last == 1 searches both page directories and page tables.
 
         """
-        table = self.toplevel
+        return self.is_region_mapped(round_down(virt_addr, 4096), 4096, level)
+
+    def is_region_mapped(self, virt_base, size, level=PT_LEVEL):
+        """Find out if a region has been mapped"""
+        align_check(virt_base, size)
+
         num_levels = len(self.levels) + level + 1
-        has_mapping = False
+        scope = 1 << self.levels[level].addr_shift
+        end = virt_base + size
 
-        # Create and link up intermediate tables if necessary
-        for depth in range(0, num_levels):
-            # Create child table if needed
-            if table.has_entry(virt_addr):
-                if depth == num_levels:
-                    has_mapping = True
-                else:
-                    table = self.tables[table.lookup(virt_addr)]
+        # Check the entries one table at a time
+        vaddr = round_down(virt_base, scope)
+        while vaddr < end:
+            span_end = min(end, self.table_span_end(vaddr, level))
 
-            if has_mapping:
-                # pylint doesn't like break in the above if-block
-                break
+            table = self.toplevel
+            for _ in range(1, num_levels):
+                if not table.has_entry(vaddr):
+                    table = None
+                    break
 
-        return has_mapping
+                if table.entries[table.entry_index(vaddr)] & FLAG_SZ:
+                    # Mapped by a larger page at this level
+                    return True
+                table = self.tables[table.lookup(vaddr)]
 
-    def is_region_mapped(self, virt_base, size, level=PT_LEVEL):
-        """Find out if a region has been mapped"""
-        align_check(virt_base, size)
-        for vaddr in range(virt_base, virt_base + size, 4096):
-            if self.is_mapped(vaddr, level):
+            if table is not None:
+                index = table.entry_index(vaddr)
+                count = (span_end - vaddr + scope - 1) // scope
+                if self.has_mappings(table, table.entries[index:index + count]):
+                    return True
+
+            vaddr = span_end
+
+        return False
+
+    def has_mappings(self, table, entries):
+        """Return True if any of the given entries of the table maps a page,
+        either directly or through the child tables they point to"""
+        is_leaf = isinstance(table, self.levels[PT_LEVEL])
+
+        for entry in entries:
+            if not entry & FLAG_P:
+                continue
+
+            if is_leaf or entry & FLAG_SZ:
+                return True
+
+            child = self.tables[entry & table.addr_mask]
+            if self.has_mappings(child, child.entries):
                 return True
 
         return False
 
+    def table_span_end(self, virt_addr, level):
+        """Return the end of the virtual address range covered by the table
+        at the given level that maps virt_addr"""
+        table_class = self.levels[level]
+        span = table_class.num_entries << table_class.addr_shift
+
+        return round_down(virt_addr, span) + span
+
     def new_child_table(self, table, virt_addr, depth):
         """Create a new child table"""
         new_table_addr = self.get_new_mmutable_addr()
@@ -411,9 +493,9 @@ class PtableSet():
 
         return new_table
 
-    def map_page(self, virt_addr, phys_addr, flags, reserve, level=PT_LEVEL):
-        """Map a virtual address to a physical address in the page tables,
-        with provided access flags"""
+    def get_table(self, virt_addr, level=PT_LEVEL):
+        """Return the table at the given level that maps virt_addr, creating
+        and linking up the intermediate tables leading to it if necessary"""
         table = self.toplevel
 
         num_levels = len(self.levels) + level + 1
@@ -426,6 +508,13 @@ class PtableSet():
             else:
                 table = self.tables[table.lookup(virt_addr)]
 
+        return table
+
+    def map_page(self, virt_addr, phys_addr, flags, reserve, level=PT_LEVEL):
+        """Map a virtual address to a physical address in the page tables,
+        with provided access flags"""
+        table = self.get_table(virt_addr, level)
+
         # Set up entry in leaf page table
         if not reserve:
             table.map(virt_addr, phys_addr, flags)
@@ -474,14 +563,24 @@ class PtableSet():
 
         align_check(phys_base, size, scope)
         align_check(virt_base, size, scope)
-        for paddr in range(phys_base, phys_base + size, scope):
-            if is_identity_map and paddr == 0 and level == PT_LEVEL:
-                # Never map the NULL page at page table level.
-                continue
 
-            vaddr = virt_base + (paddr - phys_base)
+        if is_identity_map and phys_base == 0 and level == PT_LEVEL and size:
+            # Never map the NULL page at page table level.
+            phys_base = virt_base = scope
+            size -= scope
+
+        # Fill in the entries one table at a time, creating the tables in
+        # the same order as mapping page by page would
+        vaddr = virt_base
+        end = virt_base + size
+        while vaddr < end:
+            span_end = min(end, self.table_span_end(vaddr, level))
 
-            self.map_page(vaddr, paddr, flags, False, level)
+            table = self.get_table(vaddr, level)
+            table.map_range(vaddr, (span_end - vaddr) // scope,
+                            phys_base + (vaddr - virt_base), flags)
+
+            vaddr = span_end
 
     def identity_map_unaligned(self, phys_base, size, flags, level=PT_LEVEL):
         """Identity map a region of memory"""
@@ -541,16 +640,24 @@ class PtableSet():
 
         align_check(base, size, scope)
 
+        end = base + size
+
+        # Never map the NULL page
+        if base == 0:
+            base = scope
+
         try:
-            for addr in range(base, base + size, scope):
-                # Never map the NULL page
-                if addr == 0:
-                    continue
+            # Update the entries one table at a time
+            addr = base
+            while addr < end:
+                span_end = min(end, self.table_span_end(addr, level))
 
                 table = self.toplevel
                 for _ in range(1, num_levels):
                     table = self.tables[table.lookup(addr)]
-                table.set_perms(addr, flags)
+                table.set_perms_range(addr, (span_end - addr) // scope, flags)
+
+                addr = span_end
         except KeyError:
             error("no mapping for %s region 0x%x (size 0x%x)" %
                   (name, base, size))
@@ -628,31 +735,11 @@ def parse_args():
         args.verbose = 1
 
 
-def get_symbols(elf_obj):
-    """Get all symbols from the ELF file"""
-    for section in elf_obj.iter_sections():
-        if isinstance(section, SymbolTableSection):
-            return {sym.name: sym.entry.st_value
-                    for sym in section.iter_symbols()}
-
-    raise LookupError("Could not find symbol table")
-
 def isdef(sym_name):
     """True if symbol is defined in ELF file"""
     return sym_name in syms
 
 
-def find_symbol(obj, name):
-    """Find symbol object from ELF file"""
-    for section in obj.iter_sections():
-        if isinstance(section, SymbolTableSection):
-            for sym in section.iter_symbols():
-                if sym.name == name:
-                    return sym
-
-    return None
-
-
 def map_extra_regions(pt):
     """Map extra regions specified in command line"""
     # Extract command line arguments
@@ -725,15 +812,14 @@ def main():
     global syms
     parse_args()
 
-    with open(args.kernel, "rb") as elf_fp:
-        kernel = ELFFile(elf_fp)
-        syms = get_symbols(kernel)
+    kernel = ElfIndex(args.kernel)
+    syms = kernel.symbol_values()
 
-        sym_dummy_pagetables = find_symbol(kernel, "dummy_pagetables")
-        if sym_dummy_pagetables:
-            reserved_pt_size = sym_dummy_pagetables['st_size']
-        else:
-            reserved_pt_size = None
+    sym_dummy_pagetables = kernel.symbol("dummy_pagetables")
+    if sym_dummy_pagetables:
+        reserved_pt_size = sym_dummy_pagetables.size
+    else:
+        reserved_pt_size = None
 
     if isdef("CONFIG_X86_64"):
         pclass = PtablesIA32e
@@ -219,6 +219,7 @@ macro(toolchain_ld_relocation)
     -s ${MEM_RELOCATION_SRAM_DATA_LD}
     -b ${MEM_RELOCATION_SRAM_BSS_LD}
     -c ${MEM_RELOCATION_CODE}
+    --cache-file ${PROJECT_BINARY_DIR}/relocation_sections_cache.json
     DEPENDS app kernel ${ZEPHYR_LIBS_PROPERTY}
     )
 
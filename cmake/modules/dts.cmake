@@ -55,6 +55,9 @@ set(DT_SCRIPTS                  ${ZEPHYR_BASE}/scripts/dts)
 set(GEN_DEFINES_SCRIPT          ${DT_SCRIPTS}/gen_defines.py)
 # The edtlib.EDT object in pickle format.
 set(EDT_PICKLE                  ${PROJECT_BINARY_DIR}/edt.pickle)
+# Bindings cached by gen_defines.py, which speeds up reruns after
+# devicetree overlay changes.
+set(EDT_BINDING_CACHE           ${PROJECT_BINARY_DIR}/edt_binding_cache.pickle)
 # The generated file containing the final DTS, for debugging.
 set(ZEPHYR_DTS                  ${PROJECT_BINARY_DIR}/zephyr.dts)
 # The generated C header needed by <zephyr/devicetree.h>
@@ -282,6 +285,7 @@ set(CMD_GEN_DEFINES ${PYTHON_EXECUTABLE} ${GEN_DEFINES_SCRIPT}
 --header-out ${DEVICETREE_GENERATED_H}.new
 --dts-out ${ZEPHYR_DTS}.new # for debugging and dtc
 --edt-pickle-out ${EDT_PICKLE}
+--binding-cache ${EDT_BINDING_CACHE}
 ${EXTRA_GEN_DEFINES_ARGS}
 )
 
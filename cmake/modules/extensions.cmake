@@ -637,7 +637,7 @@ function(generate_inc_file
     ${ZEPHYR_BASE}/scripts/build/file2hex.py
     ${ARGN} # Extra arguments are passed to file2hex.py
     --file ${source_file}
-    > ${generated_file} # Does pipe redirection work on Windows?
+    --output ${generated_file}
     DEPENDS ${source_file}
     WORKING_DIRECTORY ${CMAKE_CURRENT_SOURCE_DIR}
     )
@@ -70,6 +70,9 @@ if((DEFINED BOARD_REVISION) AND EXISTS ${BOARD_DIR}/${BOARD}_${BOARD_REVISION_ST
 endif()
 set(DOTCONFIG                  ${PROJECT_BINARY_DIR}/.config)
 set(PARSED_KCONFIG_SOURCES_TXT ${PROJECT_BINARY_DIR}/kconfig/sources.txt)
+# Cache of the parsed Kconfig tree, used to skip parsing when no Kconfig files
+# or inputs to them have changed
+set(KCONFIG_TREE_CACHE         ${PROJECT_BINARY_DIR}/kconfig/kconfig_cache.pickle)
 
 if(CONF_FILE)
   string(CONFIGURE "${CONF_FILE}" CONF_FILE_EXPANDED)
@@ -314,6 +317,7 @@ execute_process(
   ${PYTHON_EXECUTABLE}
   ${ZEPHYR_BASE}/scripts/kconfig/kconfig.py
   --zephyr-base=${ZEPHYR_BASE}
+  --kconfig-cache=${KCONFIG_TREE_CACHE}
   ${input_configs_are_handwritten}
   ${KCONFIG_ROOT}
   ${DOTCONFIG}
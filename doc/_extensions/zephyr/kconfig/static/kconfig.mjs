@@ -6,9 +6,15 @@
 const DB_FILE = 'kconfig.json';
 const RESULTS_PER_PAGE_OPTIONS = [10, 25, 50];
 
+/* regular expression special characters */
+const REGEX_SPECIAL = /[.^$*+?{}[\]\\|()]/;
+
 /* search state */
 let db;
+let searchIndex;
 let searchOffset;
+let lastSearch = null;
+let lastMatches;
 let maxResults = RESULTS_PER_PAGE_OPTIONS[0];
 
 /* elements */
@@ -274,6 +280,54 @@ function renderKconfigEntry(entry) {
     return container;
 }
 
+/**
+ * Build the search index: the lowercased name and prompt of each database
+ * entry, computed once instead of on every search.
+ */
+function buildSearchIndex() {
+    searchIndex = db.map(entry => ({
+        entry: entry,
+        name: entry.name.toLowerCase(),
+        prompt: entry.prompt ? entry.prompt.toLowerCase() : "",
+    }));
+}
+
+/**
+ * Find the database entries matching a search string. Each space-separated
+ * regular expression in the search string must match either the name or the
+ * prompt of an entry.
+ *
+ * Search strings without regular expression special characters are matched
+ * with plain substring searches. If such a search string extends the previous
+ * one (e.g. while typing), only the previous matches are searched.
+ *
+ * @param {String} value Search string.
+ * @returns {Array} Matching database entries.
+ */
+function findMatches(value) {
+    const search = value.trim().toLowerCase();
+    const terms = search.split(/\s+/);
+
+    if (REGEX_SPECIAL.test(search)) {
+        const regexes = terms.map(term => new RegExp(term));
+        lastSearch = null;
+
+        return searchIndex.filter(item => regexes.every(regex =>
+            item.name.search(regex) >= 0 || item.prompt.search(regex) >= 0
+        )).map(item => item.entry);
+    }
+
+    const candidates = lastSearch !== null && search.startsWith(lastSearch) ?
+        lastMatches : searchIndex;
+
+    lastSearch = search;
+    lastMatches = candidates.filter(item => terms.every(term =>
+        item.name.includes(term) || item.prompt.includes(term)
+    ));
+
+    return lastMatches.map(item => item.entry);
+}
+
 /** Perform a search and display the results. */
 function doSearch() {
     /* replace current state (to handle back button) */
@@ -291,31 +345,9 @@ function doSearch() {
     }
 
     /* perform search */
-    const regexes = input.value.trim().split(/\s+/).map(
-        element => new RegExp(element.toLowerCase())
-    );
-    let count = 0;
-
-    const searchResults = db.filter(entry => {
-        let matches = 0;
-        const name = entry.name.toLowerCase();
-        const prompt = entry.prompt ? entry.prompt.toLowerCase() : "";
-
-        regexes.forEach(regex => {
-            if (name.search(regex) >= 0 || prompt.search(regex) >= 0) {
-                matches++;
-            }
-        });
-
-        if (matches === regexes.length) {
-            count++;
-            if (count > searchOffset && count <= (searchOffset + maxResults)) {
-                return true;
-            }
-        }
-
-        return false;
-    });
+    const matches = findMatches(input.value);
+    const count = matches.length;
+    const searchResults = matches.slice(searchOffset, searchOffset + maxResults);
 
     /* show results count and search tools */
     summaryText.nodeValue = `${count} options match your search.`;
@@ -484,6 +516,7 @@ function setupKconfigSearch() {
         .then(response => response.json())
         .then(json => {
             db = json;
+            buildSearchIndex();
 
             results.replaceChildren();
 
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark for the ISR table generation in gen_isr_tables.py
+
+Generates the tables for synthetic SoCs with a given number of IRQs, and
+measures how long the different stages take:
+
+  index:  indexing the kernel symbols
+  decode: reading the .intList section contents
+  build:  filling in the vector and SW ISR tables
+  write:  writing out the tables, with a code-based vector table
+
+Each IRQ count is run with two interrupt layouts:
+
+  flat:  all IRQs are first level interrupts, every fourth one direct
+  multi: a few first level interrupts, with the rest behind 2nd and 3rd level
+         aggregators of --irqs-per-aggregator IRQs each
+
+The kernel is a synthetic ELF file with only a symbol table. It has
+--symbols function symbols, with the ISRs last, and local ARM mapping symbols
+at the ISRs.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import gen_isr_tables
+
+STAGES = ("index", "decode", "build", "write")
+
+# Number of first level interrupts in the multi-level layout
+NUM_L1_IRQS = 32
+
+# Address of the first symbol in the benchmark
+SYM_BASE = 0x10000000
+
+# Symbol binding, type, and section index values for write_kernel()
+STB_LOCAL = 0
+STB_GLOBAL = 1
+STT_NOTYPE = 0
+STT_FUNC = 2
+STT_SECTION = 3
+SHN_ABS = 0xfff1
+
+
+def main():
+    args = parse_args()
+
+    # gen_isr_tables.py reads its command line arguments from a global
+    gen_isr_tables.args = argparse.Namespace(debug=False, big_endian=False)
+
+    print(f"{'layout':>8} {'irqs':>8} " +
+          " ".join(f"{stage + ' (s)':>12}" for stage in STAGES))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for nirqs in args.irqs:
+            for layout in ("flat", "multi"):
+                times = run_stages(layout, nirqs, args, tmp_dir)
+
+                print(f"{layout:>8} {nirqs:>8} " +
+                      " ".join(f"{times[stage]:>12.3f}" for stage in STAGES))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        allow_abbrev=False)
+
+    parser.add_argument("--irqs", type=int, nargs="+",
+                        default=[512, 1024, 2048],
+                        help="numbers of IRQs (default: 512, 1024 and 2048)")
+    parser.add_argument("--irqs-per-aggregator", type=int, default=64,
+                        help="IRQs per 2nd and 3rd level aggregator "
+                             "(default: 64)")
+    parser.add_argument("--symbols", type=int, default=20000,
+                        help="number of kernel symbols (default: 20000)")
+
+    return parser.parse_args()
+
+
+def make_config(layout, nirqs, args):
+    # Returns a (dictionary of CONFIG_* symbols, list of (irq, flags) tuples,
+    # number of vectors) tuple for 'layout'
+
+    syms = {"CONFIG_IRQ_VECTOR_TABLE_JUMP_BY_CODE": 1}
+
+    if layout == "flat":
+        return syms, [(irq, gen_isr_tables.ISR_FLAG_DIRECT if irq % 4 == 0
+                       else 0) for irq in range(nirqs)], nirqs
+
+    per_agg = args.irqs_per_aggregator
+    naggs = (nirqs - NUM_L1_IRQS) // per_agg
+    nl2 = naggs // 2
+    nl3 = naggs - nl2
+    if not (0 < per_agg < 256 and nl2 <= NUM_L1_IRQS and nl3 <= per_agg):
+        sys.exit(f"can't spread {nirqs} IRQs over aggregators of {per_agg}")
+
+    syms.update({
+        "CONFIG_MULTI_LEVEL_INTERRUPTS": 1,
+        "CONFIG_MAX_IRQ_PER_AGGREGATOR": per_agg,
+        "CONFIG_2ND_LEVEL_INTERRUPTS": 1,
+        "CONFIG_NUM_2ND_LEVEL_AGGREGATORS": nl2,
+        "CONFIG_2ND_LVL_ISR_TBL_OFFSET": NUM_L1_IRQS,
+        "CONFIG_3RD_LEVEL_INTERRUPTS": 1,
+        "CONFIG_NUM_3RD_LEVEL_AGGREGATORS": nl3,
+        "CONFIG_3RD_LVL_ISR_TBL_OFFSET": NUM_L1_IRQS + nl2 * per_agg,
+    })
+
+    # First level interrupts, the last ones being the 2nd level aggregators
+    irqs = [(irq, gen_isr_tables.ISR_FLAG_DIRECT if irq % 4 == 0 else 0)
+            for irq in range(NUM_L1_IRQS - nl2)]
+
+    for agg in range(nl2):
+        parent = NUM_L1_IRQS - 1 - agg
+        syms[f"CONFIG_2ND_LVL_INTR_{agg:02}_OFFSET"] = parent
+        irqs += [((irq2 << 8) | parent, 0) for irq2 in range(1, per_agg + 1)]
+
+    for agg in range(nl3):
+        parent = agg + 1
+        syms[f"CONFIG_3RD_LVL_INTR_{agg:02}_OFFSET"] = parent
+        irqs += [((irq3 << 16) | (parent << 8), 0)
+                 for irq3 in range(1, per_agg + 1)]
+
+    return syms, irqs, NUM_L1_IRQS + naggs * per_agg
+
+
+def write_kernel(path, abs_syms, funcs, mapping_addrs):
+    # Writes a little-endian 32-bit ELF file to 'path', with an empty .text
+    # section and a symbol table. 'abs_syms' and 'funcs' map names to values
+    # of absolute and function symbols. 'mapping_addrs' are the addresses of
+    # local "$t" symbols.
+
+    text_size = max(funcs.values(), default=SYM_BASE) - SYM_BASE + 16
+
+    # Local symbols come first
+    syms = [("", 0, 0, 0, 0)]
+    syms.append(("", SYM_BASE, (STB_LOCAL << 4) | STT_SECTION, 1, 0))
+    syms += [("$t", addr, (STB_LOCAL << 4) | STT_NOTYPE, 1, 0)
+             for addr in mapping_addrs]
+    first_global = len(syms)
+    syms += [(name, value, (STB_GLOBAL << 4) | STT_NOTYPE, SHN_ABS, 0)
+             for name, value in abs_syms.items()]
+    syms += [(name, value, (STB_GLOBAL << 4) | STT_FUNC, 1, 16)
+             for name, value in funcs.items()]
+
+    strtab = bytearray(b"\0")
+    name_offsets = {"": 0}
+    symtab = bytearray()
+    for name, value, info, shndx, size in syms:
+        if name not in name_offsets:
+            name_offsets[name] = len(strtab)
+            strtab += name.encode() + b"\0"
+        symtab += struct.pack("<IIIBBH", name_offsets[name], value, size,
+                              info, 0, shndx)
+
+    shstrtab = b"\0.text\0.symtab\0.strtab\0.shstrtab\0"
+
+    ehdr_size = 52
+    symtab_offset = ehdr_size
+    strtab_offset = symtab_offset + len(symtab)
+    shstrtab_offset = strtab_offset + len(strtab)
+    shoff = (shstrtab_offset + len(shstrtab) + 3) & ~3
+
+    # name, type, flags, addr, offset, size, link, info, addralign, entsize
+    shdrs = [
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        # .text, SHT_NOBITS, SHF_ALLOC | SHF_EXECINSTR
+        (1, 8, 6, SYM_BASE, shoff, text_size, 0, 0, 16, 0),
+        # .symtab, SHT_SYMTAB, linked to .strtab
+        (7, 2, 0, 0, symtab_offset, len(symtab), 3, first_global, 4, 16),
+        # .strtab and .shstrtab, SHT_STRTAB
+        (15, 3, 0, 0, strtab_offset, len(strtab), 0, 0, 1, 0),
+        (23, 3, 0, 0, shstrtab_offset, len(shstrtab), 0, 0, 1, 0),
+    ]
+
+    with open(path, "wb") as f:
+        # ELFCLASS32, ELFDATA2LSB, EV_CURRENT, ET_EXEC, EM_ARM
+        f.write(struct.pack("<16sHHIIIIIHHHHHH",
+                            b"\x7fELF\x01\x01\x01", 2, 40, 1, 0, 0, shoff,
+                            0, ehdr_size, 0, 0, 40, len(shdrs), 4))
+        f.write(symtab)
+        f.write(strtab)
+        f.write(shstrtab)
+        f.write(bytes(shoff - f.tell()))
+        for shdr in shdrs:
+            f.write(struct.pack("<10I", *shdr))
+
+
+def run_stages(layout, nirqs, args, tmp_dir):
+    # Generates the tables for 'nirqs' IRQs with 'layout'. Returns a dict
+    # mapping stage names to times.
+
+    times = {}
+
+    config, irqs, nvec = make_config(layout, nirqs, args)
+
+    # Unrelated kernel functions, followed by one ISR per IRQ
+    funcs = {f"sym_{i}": SYM_BASE + 16 * i for i in range(args.symbols)}
+    isr_base = SYM_BASE + 16 * args.symbols
+    isr_addrs = [isr_base + 16 * i for i in range(len(irqs))]
+    funcs.update((f"isr_{i}", addr) for i, addr in enumerate(isr_addrs))
+
+    kernel_path = os.path.join(tmp_dir, "zephyr.elf")
+    write_kernel(kernel_path, config, funcs, isr_addrs)
+
+    intlist_path = os.path.join(tmp_dir, "isrList.bin")
+    with open(intlist_path, "wb") as f:
+        f.write(struct.pack("<II", nvec, 0))
+        for i, (irq, flags) in enumerate(irqs):
+            param = 0 if flags & gen_isr_tables.ISR_FLAG_DIRECT else i + 1
+            f.write(struct.pack("<iiII", irq, flags, isr_base + 16 * i, param))
+
+    gen_isr_tables.args.sw_isr_table = True
+    gen_isr_tables.args.vector_table = True
+
+    t = time.perf_counter()
+    index = gen_isr_tables.get_elf_index(kernel_path)
+    syms = index.symbol_values()
+    times["index"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    intlist = gen_isr_tables.read_intlist(intlist_path, syms)
+    times["decode"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    vt, swt = gen_isr_tables.build_tables(syms, intlist)
+    times["build"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    with open(os.path.join(tmp_dir, "isr_tables.c"), "w") as fp:
+        gen_isr_tables.write_source_file(fp, vt, swt, intlist, syms, index)
+    times["write"] = time.perf_counter() - t
+
+    return times
+
+
+if __name__ == "__main__":
+    main()
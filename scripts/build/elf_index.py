@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Symbol and section index for the ELF files produced by the Zephyr build,
+shared by the scripts that run after linking.
+
+The ELF file is memory-mapped instead of read, and the symbol table is
+decoded directly instead of through pyelftools, which is much slower for the
+tens of thousands of symbols in a typical zephyr.elf. The symbols can be
+looked up by name and by address, and section contents are returned as
+memoryviews of the mapped file, without copying.
+
+The decoded symbols can optionally be saved next to the ELF file, keyed by a
+hash of its symbol table, so that later scripts working on the same ELF file
+don't need to decode them again.
+"""
+
+import bisect
+import collections
+import hashlib
+import mmap
+import pickle
+import struct
+import sys
+from packaging import version
+
+import elftools
+from elftools.elf.elffile import ELFFile
+from elftools.elf.constants import SH_FLAGS
+from elftools.elf.enums import (ENUM_ST_INFO_BIND, ENUM_ST_INFO_TYPE,
+                                ENUM_ST_SHNDX)
+
+if version.parse(elftools.__version__) < version.parse('0.24'):
+    sys.exit("pyelftools is out of date, need version 0.24 or later")
+
+# A symbol from the symbol table. 'type', 'bind' and 'shndx' use the same
+# names as pyelftools, e.g. 'STT_OBJECT', 'STB_GLOBAL' and 'SHN_ABS'. 'shndx'
+# is the section index for symbols defined in a section.
+Symbol = collections.namedtuple("Symbol", "name value size type bind shndx")
+
+# Bump this when the format of the saved index changes
+_CACHE_VERSION = 1
+
+
+def _decoding(enum):
+    # Maps the values in a pyelftools enum to their names
+
+    return {value: name for name, value in enum.items()
+            if name != "_default_"}
+
+_TYPES = _decoding(ENUM_ST_INFO_TYPE)
+_BINDS = _decoding(ENUM_ST_INFO_BIND)
+_SHNDXS = _decoding(ENUM_ST_SHNDX)
+
+
+class ElfIndex:
+    """
+    Index of the symbols and sections in an ELF file.
+
+    elf:
+      pyelftools ELFFile for the memory-mapped file, for everything not
+      covered by the index (e.g. DWARF information)
+
+    little_endian:
+      True if the ELF file is little-endian
+
+    elfclass:
+      32 or 64
+
+    symbols:
+      List of Symbols, in symbol table order
+    """
+    def __init__(self, filename, cache=False):
+        """
+        Memory-maps and indexes the ELF file 'filename'.
+
+        If 'cache' is True, the decoded symbols are loaded from, or saved to,
+        '<filename>.symidx'. The saved symbols are only used if the symbol
+        table hasn't changed.
+
+        Raises LookupError if the ELF file has no symbol table.
+        """
+        with open(filename, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        self.elf = ELFFile(self._map)
+        self.little_endian = self.elf.little_endian
+        self.elfclass = self.elf.elfclass
+
+        self.symbols = self._load_symbols(filename + ".symidx" if cache
+                                          else None)
+
+        # Maps symbol names to the last symbol with that name, like a dict
+        # built from the symbol table would
+        self._by_name = {sym.name: sym for sym in self.symbols}
+
+        # Symbols defined in sections, sorted by address, and their
+        # addresses. The sort is stable, so symbols with the same address stay
+        # in symbol table order.
+        self._by_addr = sorted((sym for sym in self.symbols
+                                if isinstance(sym.shndx, int)),
+                               key=lambda sym: sym.value)
+        self._addrs = [sym.value for sym in self._by_addr]
+
+        # Allocated sections with contents in the file, sorted by address,
+        # and their addresses
+        self._sections = sorted(
+            (section for section in self.elf.iter_sections()
+             if section["sh_flags"] & SH_FLAGS.SHF_ALLOC
+             and section["sh_type"] != "SHT_NOBITS"
+             and section["sh_size"]),
+            key=lambda section: section["sh_addr"])
+        self._section_addrs = [section["sh_addr"]
+                               for section in self._sections]
+
+    def symbol(self, name):
+        """
+        Returns the Symbol named 'name', or None if there is no such symbol.
+        If several symbols have the name, the last one is returned.
+        """
+        return self._by_name.get(name)
+
+    def symbol_values(self):
+        """
+        Returns a dictionary that maps symbol names to symbol values. If
+        several symbols have the same name, the value of the last one is
+        used.
+        """
+        return {name: sym.value for name, sym in self._by_name.items()}
+
+    def symbols_at(self, addr):
+        """
+        Returns a list of the symbols defined in a section with address
+        'addr', in symbol table order.
+        """
+        i = bisect.bisect_left(self._addrs, addr)
+        j = bisect.bisect_right(self._addrs, addr, i)
+        return self._by_addr[i:j]
+
+    def section_data(self, name):
+        """
+        Returns a memoryview of the contents of the section named 'name', or
+        None if there is no such section. SHT_NOBITS sections are empty.
+        """
+        section = self.elf.get_section_by_name(name)
+        if section is None:
+            return None
+
+        if section["sh_type"] == "SHT_NOBITS":
+            return self._view[0:0]
+
+        return self._section_view(section)
+
+    def read(self, addr, size):
+        """
+        Returns a memoryview of the 'size' bytes at address 'addr', or None if
+        they aren't all within the contents of a single allocated section.
+        """
+        i = bisect.bisect_right(self._section_addrs, addr) - 1
+        if i < 0:
+            return None
+
+        section = self._sections[i]
+        start = addr - section["sh_addr"]
+        if start + size > section["sh_size"]:
+            return None
+
+        offset = section["sh_offset"] + start
+        return self._view[offset:offset + size]
+
+    def _load_symbols(self, cache_file):
+        # Decodes the symbol table, or loads the symbols from 'cache_file' if
+        # it was saved from the same symbol table. Saves the symbols to
+        # 'cache_file' otherwise. No caching is done if 'cache_file' is None.
+
+        symtab = self.elf.get_section_by_name(".symtab")
+        if symtab is None or symtab["sh_type"] != "SHT_SYMTAB":
+            raise LookupError("Could not find symbol table")
+
+        strtab = self.elf.get_section(symtab["sh_link"])
+
+        symtab_data = self._section_view(symtab)
+        strtab_data = self._section_view(strtab)
+
+        if cache_file is not None:
+            key = hashlib.sha256()
+            key.update(b"%d %d %d" % (_CACHE_VERSION, self.elfclass,
+                                      self.little_endian))
+            key.update(symtab_data)
+            key.update(strtab_data)
+            key = key.hexdigest()
+
+            try:
+                with open(cache_file, "rb") as f:
+                    saved_key, rows = pickle.load(f)
+                if saved_key == key:
+                    return list(map(Symbol._make, rows))
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+                pass
+
+        symbols = self._decode_symbols(symtab, symtab_data, strtab_data)
+
+        if cache_file is not None:
+            # A missing or read-only directory just means no caching
+            try:
+                with open(cache_file, "wb") as f:
+                    pickle.dump((key, [tuple(sym) for sym in symbols]), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass
+
+        return symbols
+
+    def _decode_symbols(self, symtab, symtab_data, strtab_data):
+        # Returns a list of Symbols for the entries in 'symtab_data', with
+        # names from 'strtab_data'
+
+        fmt = "<" if self.little_endian else ">"
+        if self.elfclass == 32:
+            # st_name, st_value, st_size, st_info, st_other, st_shndx
+            fmt += "IIIBBH"
+        else:
+            # st_name, st_info, st_other, st_shndx, st_value, st_size
+            fmt += "IBBHQQ"
+
+        entsize = symtab["sh_entsize"] or struct.calcsize(fmt)
+        if entsize != struct.calcsize(fmt):
+            # Unexpected entry size. Unpack the entries one by one.
+            entries = (struct.unpack_from(fmt, symtab_data, offset)
+                       for offset in range(0, len(symtab_data), entsize))
+        else:
+            entries = struct.iter_unpack(fmt, symtab_data)
+
+        strtab = bytes(strtab_data)
+        names = {}
+
+        symbols = []
+        for entry in entries:
+            if self.elfclass == 32:
+                name_offset, value, size, info, _, shndx = entry
+            else:
+                name_offset, info, _, shndx, value, size = entry
+
+            name = names.get(name_offset)
+            if name is None:
+                end = strtab.find(b"\0", name_offset)
+                name = names[name_offset] = \
+                    strtab[name_offset:end].decode("utf-8", errors="replace")
+
+            symbols.append(Symbol(name, value, size,
+                                  _TYPES.get(info & 0xf, info & 0xf),
+                                  _BINDS.get(info >> 4, info >> 4),
+                                  _SHNDXS.get(shndx, shndx)))
+
+        return symbols
+
+    def _section_view(self, section):
+        # Returns a memoryview of the contents of 'section'
+
+        offset = section["sh_offset"]
+        return self._view[offset:offset + section["sh_size"]]
@@ -9,8 +9,8 @@ import sys
 from packaging import version
 
 import elftools
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
+
+from elf_index import ElfIndex
 
 if version.parse(elftools.__version__) < version.parse('0.24'):
     sys.exit("pyelftools is out of date, need version 0.24 or later")
@@ -116,7 +116,8 @@ class ZephyrElf:
     Represents information about devices in an elf file.
     """
     def __init__(self, kernel, edt, device_start_symbol):
-        self.elf = ELFFile(open(kernel, "rb"))
+        self.index = ElfIndex(kernel)
+        self.elf = self.index.elf
         self.edt = edt
         self.devices = []
         self.ld_consts = self._symbols_find_value(set([device_start_symbol, *Device.required_ld_consts, *DevicePM.required_ld_consts]))
@@ -147,33 +148,24 @@ class ZephyrElf:
         """
         Retrieve the raw bytes associated with a symbol from the elf file.
         """
-        addr = sym.entry.st_value
-        len = sym.entry.st_size
-        for section in self.elf.iter_sections():
-            start = section['sh_addr']
-            end = start + section['sh_size']
-
-            if (start <= addr) and (addr + len) <= end:
-                offset = addr - section['sh_addr']
-                return bytes(section.data()[offset:offset + len])
+        data = self.index.read(sym.value, sym.size)
+        if data is not None:
+            return bytes(data)
 
     def _symbols_find_value(self, names):
         symbols = {}
-        for section in self.elf.iter_sections():
-            if isinstance(section, SymbolTableSection):
-                for sym in section.iter_symbols():
-                    if sym.name in names:
-                        symbols[sym.name] = sym.entry.st_value
+        for name in names:
+            sym = self.index.symbol(name)
+            if sym is not None:
+                symbols[name] = sym.value
         return symbols
 
     def _object_find_named(self, prefix, cb):
-        for section in self.elf.iter_sections():
-            if isinstance(section, SymbolTableSection):
-                for sym in section.iter_symbols():
-                    if sym.entry.st_info.type != 'STT_OBJECT':
-                        continue
-                    if sym.name.startswith(prefix):
-                        cb(sym)
+        for sym in self.index.symbols:
+            if sym.type != 'STT_OBJECT':
+                continue
+            if sym.name.startswith(prefix):
+                cb(sym)
 
     def _link_devices(self, devices):
         # Compute the dependency graph induced from the full graph restricted to the
@@ -217,13 +209,13 @@ class ZephyrElf:
         # Find all PM structs
         pm_structs = {}
         def _on_pm(sym):
-            pm_structs[sym.entry.st_value] = DevicePM(self, sym)
+            pm_structs[sym.value] = DevicePM(self, sym)
         self._object_find_named('__pm_device_', _on_pm)
 
         # Find all ordinal arrays
         ordinal_arrays = {}
         def _on_ordinal(sym):
-            ordinal_arrays[sym.entry.st_value] = DeviceOrdinals(self, sym)
+            ordinal_arrays[sym.value] = DeviceOrdinals(self, sym)
         self._object_find_named('__devicehdl_', _on_ordinal)
 
         # Find all device structs
@@ -232,7 +224,7 @@ class ZephyrElf:
         self._object_find_named('__device_', _on_device)
 
         # Sort the device array by address for handle calculation
-        self.devices = sorted(self.devices, key = lambda k: k.sym.entry.st_value)
+        self.devices = sorted(self.devices, key = lambda k: k.sym.value)
 
         # Assign handles to the devices
         for idx, dev in enumerate(self.devices):
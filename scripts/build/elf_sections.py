@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Section header reader for the object files produced by the Zephyr build,
+shared by the scripts that look for specially named sections in them.
+
+Only the ELF and section headers and the section name string table are read,
+directly from the memory-mapped file, instead of creating pyelftools section
+objects for every section. The sections of each object file can optionally be
+saved in a cache file, keyed by path, modification time and size, so that
+only the object files that changed since the last run are read again.
+"""
+
+import collections
+import mmap
+import multiprocessing
+import os
+import struct
+
+from elftools.common.exceptions import ELFError
+
+from file_cache import load_cache, save_cache
+
+# A section in an object file. 'type' is the numeric sh_type.
+Section = collections.namedtuple("Section", "name type size")
+
+# Section types that pyelftools creates a SymbolTableSection for
+SYMTAB_TYPES = (
+    2,           # SHT_SYMTAB
+    11,          # SHT_DYNSYM
+    0x6ffffff3,  # SHT_SUNW_LDYNSYM
+)
+
+# Bump this when the format of the cache file changes
+CACHE_VERSION = 1
+
+# e_shoff, e_shentsize, e_shnum, e_shstrndx from the ELF header, for 32- and
+# 64-bit files
+_EHDR_FMTS = {1: "16xHHIIIIIHHHHHH", 2: "16xHHIQQQIHHHHHH"}
+
+# sh_name, sh_type, sh_flags, sh_addr, sh_offset, sh_size, sh_link, ...
+_SHDR_FMTS = {1: "IIIIIIIIII", 2: "IIQQQQIIQQ"}
+
+_SHN_XINDEX = 0xffff
+
+
+def read_sections(filename):
+    """
+    Returns a list of the Sections in the ELF file 'filename', in section
+    header table order, like ELFFile.iter_sections() would.
+
+    Raises ELFError if the file can't be parsed.
+    """
+    try:
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Can't be mapped
+                return _read_sections(b"")
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _read_sections(data)
+    except (IndexError, struct.error) as e:
+        raise ELFError(f"{filename}: truncated ELF file ({e})")
+    except ELFError as e:
+        raise ELFError(f"{filename}: {e}")
+
+
+def _read_sections(data):
+    # Returns the Sections from the ELF file contents 'data'
+
+    if data[:4] != b"\x7fELF":
+        raise ELFError("Magic number does not match")
+
+    elfclass = data[4]
+    if elfclass not in _EHDR_FMTS:
+        raise ELFError(f"Invalid EI_CLASS {elfclass}")
+
+    endian = {1: "<", 2: ">"}.get(data[5])
+    if endian is None:
+        raise ELFError(f"Invalid EI_DATA {data[5]}")
+
+    ehdr = struct.unpack_from(endian + _EHDR_FMTS[elfclass], data)
+    shoff, shentsize, shnum, shstrndx = ehdr[5], ehdr[10], ehdr[11], ehdr[12]
+
+    if shoff == 0:
+        return []
+
+    shdr_fmt = endian + _SHDR_FMTS[elfclass]
+
+    def shdr(index):
+        return struct.unpack_from(shdr_fmt, data, shoff + index*shentsize)
+
+    # Files with many sections store the real section count and section name
+    # string table index in the first section header
+    if shnum == 0:
+        shnum = shdr(0)[5]
+    if shstrndx == _SHN_XINDEX:
+        shstrndx = shdr(0)[6]
+
+    headers = [shdr(i) for i in range(shnum)]
+
+    strtab_offset = headers[shstrndx][4]
+
+    sections = []
+    for header in headers:
+        name_offset = strtab_offset + header[0]
+        name_end = data.find(b"\0", name_offset)
+        if name_end == -1:
+            raise ELFError("Unterminated section name")
+
+        sections.append(Section(
+            data[name_offset:name_end].decode("utf-8", errors="replace"),
+            header[1], header[5]))
+
+    return sections
+
+
+def scan_sections(filenames, cache_file=None, jobs=1):
+    """
+    Returns a dictionary that maps each file in 'filenames' to a list of its
+    Sections, as returned by read_sections().
+
+    If 'cache_file' is given, files that have the same modification time and
+    size as when the cache was saved are not read again, and the cache is
+    updated afterwards. If 'jobs' is larger than 1, the remaining files are
+    read by that many processes.
+
+    Raises ELFError if a file can't be parsed.
+    """
+    cached = load_cache(cache_file, CACHE_VERSION) if cache_file else {}
+    stats = {}
+    results = {}
+    to_scan = []
+
+    for filename in filenames:
+        if filename in stats:
+            continue
+
+        st = os.stat(filename)
+        stats[filename] = (st.st_mtime_ns, st.st_size)
+
+        entry = cached.get(filename)
+        if entry and tuple(entry[:2]) == stats[filename]:
+            results[filename] = [Section._make(section)
+                                 for section in entry[2]]
+        else:
+            to_scan.append(filename)
+
+    if jobs > 1 and len(to_scan) > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            scanned = pool.map(read_sections, to_scan, chunksize=16)
+    else:
+        scanned = map(read_sections, to_scan)
+
+    results.update(zip(to_scan, scanned))
+
+    if cache_file and (to_scan or len(cached) != len(stats)):
+        save_cache(cache_file, CACHE_VERSION,
+                   {filename: [*stats[filename], results[filename]]
+                    for filename in stats})
+
+    return results
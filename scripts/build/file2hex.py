@@ -10,12 +10,23 @@
 The list of hex characters can then be included to a source file. Optionally,
 the output can be compressed.
 
+The input is processed in fixed-size chunks, and compressed while it is being
+converted, so large files never need to be held in memory.
+
 """
 
 import argparse
-import codecs
+import filecmp
 import gzip
-import io
+import os
+import shutil
+import sys
+
+# Number of bytes on each output line
+BYTES_PER_LINE = 8
+
+# Number of bytes converted at a time. Must be a multiple of BYTES_PER_LINE.
+CHUNK_SIZE = 64 * 1024
 
 
 def parse_args():
@@ -26,6 +37,9 @@ def parse_args():
         formatter_class=argparse.RawDescriptionHelpFormatter, allow_abbrev=False)
 
     parser.add_argument("-f", "--file", required=True, help="Input file")
+    parser.add_argument("-o", "--output",
+                        help="""Output file. The file is only written if its
+                        contents change. Defaults to standard output.""")
     parser.add_argument("-g", "--gzip", action="store_true",
                         help="Compress the file using gzip before output")
     parser.add_argument("-t", "--gzip-mtime", type=int, default=0,
@@ -37,34 +51,79 @@ def parse_args():
     args = parser.parse_args()
 
 
-def get_nice_string(list_or_iterator):
-    return ", ".join("0x" + str(x) for x in list_or_iterator)
-
-
 def make_hex(chunk):
-    hexdata = codecs.encode(chunk, 'hex').decode("utf-8")
-    hexlist = map(''.join, zip(*[iter(hexdata)] * 2))
-    print(get_nice_string(hexlist) + ',')
+    # Returns the output lines for 'chunk', BYTES_PER_LINE bytes per line
+
+    hexdata = chunk.hex(" ")
+    # Each byte is two hex digits and a separator
+    width = 3 * BYTES_PER_LINE
+    return "".join("0x" + hexdata[i:i + width - 1].replace(" ", ", 0x") + ",\n"
+                   for i in range(0, len(hexdata), width))
+
+
+class HexWriter:
+    """
+    File-like object that converts the bytes written to it to output lines,
+    for passing to gzip.GzipFile
+    """
+
+    def __init__(self, out):
+        self._out = out
+        self._pending = bytearray()
+
+    def write(self, data):
+        self._pending += data
+        if len(self._pending) >= CHUNK_SIZE:
+            # Keep incomplete lines for later
+            n = len(self._pending) - len(self._pending) % BYTES_PER_LINE
+            self._out.write(make_hex(self._pending[:n]))
+            del self._pending[:n]
+        return len(data)
+
+    def flush(self):
+        # Lines are completed in close()
+        pass
+
+    def close(self):
+        if self._pending:
+            self._out.write(make_hex(self._pending))
+            self._pending.clear()
+
+
+def write_hex(out):
+    # Writes the converted input file to 'out'
+
+    with open(args.file, "rb") as fp:
+        if args.gzip:
+            writer = HexWriter(out)
+            with gzip.GzipFile(fileobj=writer, mode='w',
+                               mtime=args.gzip_mtime,
+                               compresslevel=9) as gz_obj:
+                shutil.copyfileobj(fp, gz_obj, CHUNK_SIZE)
+            writer.close()
+        else:
+            for chunk in iter(lambda: fp.read(CHUNK_SIZE), b''):
+                out.write(make_hex(chunk))
 
 
 def main():
     parse_args()
 
-    if args.gzip:
-        with io.BytesIO() as content:
-            with open(args.file, 'rb') as fg:
-                with gzip.GzipFile(fileobj=content, mode='w',
-                                   mtime=args.gzip_mtime,
-                                   compresslevel=9) as gz_obj:
-                    gz_obj.write(fg.read())
-
-            content.seek(0)
-            for chunk in iter(lambda: content.read(8), b''):
-                make_hex(chunk)
+    if args.output is None:
+        write_hex(sys.stdout)
+        return
+
+    # Write to a temporary file and only replace the output file if the
+    # contents changed, so that its timestamp only changes when needed
+    tmp_output = args.output + ".tmp"
+    with open(tmp_output, "w") as out:
+        write_hex(out)
+
+    if os.path.exists(args.output) and \
+       filecmp.cmp(tmp_output, args.output, shallow=False):
+        os.remove(tmp_output)
     else:
-        with open(args.file, "rb") as fp:
-            for chunk in iter(lambda: fp.read(8), b''):
-                make_hex(chunk)
+        os.replace(tmp_output, args.output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Cache files for build scripts that scan many input files, shared by
+parse_syscalls.py and elf_sections.py.
+
+A cache file is JSON, and maps input file paths to lists that start with
+the modification time and size of the file, followed by what was found in
+it. The scripts only scan the files that have changed since the cache was
+saved.
+"""
+
+import json
+import os
+import sys
+
+
+def load_cache(cache_file, version):
+    """
+    Returns the dictionary that maps file paths to lists from 'cache_file',
+    or an empty dictionary if it is missing, corrupt, or has a version other
+    than 'version'.
+    """
+    try:
+        with open(cache_file, "r") as fp:
+            cache = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict) or cache.get("version") != version:
+        return {}
+
+    return cache["files"]
+
+
+def save_cache(cache_file, version, files):
+    """
+    Saves 'files', a dictionary that maps file paths to lists, to
+    'cache_file' with the format version 'version'. Errors are reported, but
+    are not fatal, as the cache is only an optimization.
+    """
+    # Write to a temporary file first, so that an interrupted run never
+    # leaves a truncated cache behind
+    tmp_file = cache_file + ".tmp"
+    try:
+        with open(tmp_file, "w") as fp:
+            json.dump({"version": version, "files": files}, fp)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        sys.stderr.write("Could not write cache file %s: %s\n"
+                         % (cache_file, e))
@@ -32,16 +32,16 @@ app shared memory section, which is further divided, for each partition
 found, into data and BSS for each partition.
 """
 
-import sys
 import argparse
 import json
 import os
 import re
 from collections import OrderedDict
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
 import elftools.common.exceptions
 
+from elf_index import ElfIndex
+from elf_sections import scan_sections
+
 SZ = 'size'
 SRC = 'sources'
 LIB = 'libraries'
@@ -109,50 +109,56 @@ section_regex = re.compile(r'data_smem_([A-Za-z0-9_]*)_(data|bss)*')
 
 elf_part_size_regex = re.compile(r'z_data_smem_(.*)_part_size')
 
-def find_obj_file_partitions(filename, partitions):
-    with open(filename, 'rb') as f:
-        try:
-            full_lib = ELFFile(f)
-        except elftools.common.exceptions.ELFError as e:
-            exit(f"Error: {filename}: {e}")
+def find_obj_file_partitions(filename, sections, partitions):
+    for section in sections:
+        m = section_regex.match(section.name)
+        if not m:
+            continue
 
-        if not full_lib:
-            sys.exit("Error parsing file: " + filename)
+        partition_name = m.groups()[0]
+        if partition_name not in partitions:
+            partitions[partition_name] = {SZ: section.size}
 
-        sections = [x for x in full_lib.iter_sections()]
-        for section in sections:
-            m = section_regex.match(section.name)
-            if not m:
-                continue
+            if args.verbose:
+                partitions[partition_name][SRC] = filename
 
-            partition_name = m.groups()[0]
-            if partition_name not in partitions:
-                partitions[partition_name] = {SZ: section.header.sh_size}
+        else:
+            partitions[partition_name][SZ] += section.size
 
-                if args.verbose:
-                    partitions[partition_name][SRC] = filename
 
-            else:
-                partitions[partition_name][SZ] += section.header.sh_size
+    return partitions
 
 
-    return partitions
+def parse_obj_file_partitions(filenames, partitions):
+    # Read the section headers of all object files at once, so that unchanged
+    # files can be skipped using the cache and the rest read in parallel
+    try:
+        sections = scan_sections(filenames, args.cache_file, args.jobs)
+    except elftools.common.exceptions.ELFError as e:
+        exit(f"Error: {e}")
 
+    for filename in filenames:
+        find_obj_file_partitions(filename, sections[filename], partitions)
 
-def parse_obj_files(partitions):
+
+def find_obj_files():
     # Iterate over all object files to find partitions
+    filenames = []
     for dirpath, _, files in os.walk(args.directory):
         for filename in files:
             if re.match(r".*\.obj$", filename):
                 fullname = os.path.join(dirpath, filename)
                 fsize = os.path.getsize(fullname)
                 if fsize != 0:
-                    find_obj_file_partitions(fullname, partitions)
+                    filenames.append(fullname)
+
+    return filenames
 
 
-def parse_compile_command_file(partitions):
+def find_compile_command_obj_files():
     # Iterate over all entries to find object files.
     # Thereafter process each object file to find partitions
+    filenames = []
     object_pattern = re.compile(r'-o\s+(\S*)')
     with open(args.compile_commands_file, 'rb') as f:
         commands = json.load(f)
@@ -167,38 +173,35 @@ def parse_compile_command_file(partitions):
                 # the compile_commands.json file may be available, therefore
                 # only include existing files.
                 if os.path.exists(fullname):
-                    find_obj_file_partitions(fullname, partitions)
+                    filenames.append(fullname)
 
+    return filenames
 
-def parse_elf_file(partitions):
-    with open(args.elf, 'rb') as f:
-        try:
-            elffile = ELFFile(f)
-        except elftools.common.exceptions.ELFError as e:
-            exit(f"Error: {args.elf}: {e}")
 
-        symbol_tbls = [s for s in elffile.iter_sections()
-                       if isinstance(s, SymbolTableSection)]
+def parse_elf_file(partitions):
+    try:
+        index = ElfIndex(args.elf)
+    except (elftools.common.exceptions.ELFError, LookupError) as e:
+        exit(f"Error: {args.elf}: {e}")
 
-        for section in symbol_tbls:
-            for symbol in section.iter_symbols():
-                if symbol['st_shndx'] != "SHN_ABS":
-                    continue
+    for symbol in index.symbols:
+        if symbol.shndx != "SHN_ABS":
+            continue
 
-                x = elf_part_size_regex.match(symbol.name)
-                if not x:
-                    continue
+        x = elf_part_size_regex.match(symbol.name)
+        if not x:
+            continue
 
-                partition_name = x.groups()[0]
-                size = symbol['st_value']
-                if partition_name not in partitions:
-                    partitions[partition_name] = {SZ: size}
+        partition_name = x.groups()[0]
+        size = symbol.value
+        if partition_name not in partitions:
+            partitions[partition_name] = {SZ: size}
 
-                    if args.verbose:
-                        partitions[partition_name][SRC] = args.elf
+            if args.verbose:
+                partitions[partition_name][SRC] = args.elf
 
-                else:
-                    partitions[partition_name][SZ] += size
+        else:
+            partitions[partition_name][SZ] += size
 
 
 def generate_final_linker(linker_file, partitions, lnkr_sect=""):
@@ -243,6 +246,11 @@ def parse_args():
                         help="Output ld file")
     parser.add_argument("-v", "--verbose", action="count", default=0,
                         help="Verbose Output")
+    parser.add_argument("--cache-file", required=False,
+                        help="File for caching the sections of the object "
+                             "files between runs")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of processes for reading object files")
     parser.add_argument("-l", "--library", nargs=2, action="append", default=[],
                         metavar=("LIBRARY", "PARTITION"),
                         help="Include globals for a particular library or object filename into a designated partition")
@@ -258,14 +266,18 @@ def main():
     parse_args()
     partitions = {}
 
+    if args.compile_commands_file is None and args.elf is None:
+        return
+
+    obj_files = []
     if args.directory is not None:
-        parse_obj_files(partitions)
+        obj_files += find_obj_files()
     if args.compile_commands_file is not None:
-        parse_compile_command_file(partitions)
-    elif args.elf is not None:
+        obj_files += find_compile_command_obj_files()
+    parse_obj_file_partitions(obj_files, partitions)
+
+    if args.compile_commands_file is None:
         parse_elf_file(partitions)
-    else:
-        return
 
     for lib, ptn in args.library:
         if ptn not in partitions:
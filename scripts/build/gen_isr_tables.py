@@ -10,8 +10,8 @@ import argparse
 import struct
 import sys
 import os
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
+
+from elf_index import ElfIndex
 
 ISR_FLAG_DIRECT = (1 << 0)
 
@@ -80,23 +80,24 @@ def read_intlist(intlist_path, syms):
 
     header_sz = struct.calcsize(intlist_header_fmt)
     header = struct.unpack_from(intlist_header_fmt, intdata, 0)
-    intdata = intdata[header_sz:]
 
     debug(str(header))
 
     intlist["num_vectors"]    = header[0]
     intlist["offset"]         = header[1]
 
-    intlist["interrupts"] = [i for i in
-            struct.iter_unpack(intlist_entry_fmt, intdata)]
+    # Decode all entries at once, without copying the data after the header
+    intlist["interrupts"] = list(struct.iter_unpack(
+            intlist_entry_fmt, memoryview(intdata)[header_sz:]))
 
-    debug("Configured interrupt routing")
-    debug("handler    irq flags param")
-    debug("--------------------------")
+    if args.debug:
+        debug("Configured interrupt routing")
+        debug("handler    irq flags param")
+        debug("--------------------------")
 
-    for irq in intlist["interrupts"]:
-        debug("{0:<10} {1:<3} {2:<3}   {3}".format(
-            hex(irq[2]), irq[0], irq[1], hex(irq[3])))
+        for irq in intlist["interrupts"]:
+            debug("{0:<10} {1:<3} {2:<3}   {3}".format(
+                hex(irq[2]), irq[0], irq[1], hex(irq[3])))
 
     return intlist
 
@@ -131,13 +132,17 @@ source_assembly_header = """
 #endif
 """
 
-def get_symbol_from_addr(syms, addr):
-    for key, value in syms.items():
-        if addr == value:
-            return key
+def get_symbol_from_addr(index, addr):
+    """Returns the name of the first symbol defined at 'addr' in the kernel
+    ElfIndex 'index', or None if there is none. Section symbols and ARM
+    mapping symbols ($a, $t, $d, ...) don't name functions and are skipped.
+    """
+    for sym in index.symbols_at(addr):
+        if sym.name and sym.type != "STT_SECTION" and sym.name[0] != "$":
+            return sym.name
     return None
 
-def write_code_irq_vector_table(fp, vt, nv, syms):
+def write_code_irq_vector_table(fp, vt, nv, index):
     fp.write(source_assembly_header)
 
     fp.write("void __irq_vector_table __attribute__((naked)) _irq_vector_table(void) {\n")
@@ -145,7 +150,7 @@ def write_code_irq_vector_table(fp, vt, nv, syms):
         func = vt[i]
 
         if isinstance(func, int):
-            func_as_string = get_symbol_from_addr(syms, func)
+            func_as_string = get_symbol_from_addr(index, func)
         else:
             func_as_string = func
 
@@ -175,7 +180,7 @@ source_header = """
 typedef void (* ISR)(const void *);
 """
 
-def write_source_file(fp, vt, swt, intlist, syms):
+def write_source_file(fp, vt, swt, intlist, syms, index):
     fp.write(source_header)
 
     nv = intlist["num_vectors"]
@@ -184,7 +189,7 @@ def write_source_file(fp, vt, swt, intlist, syms):
         if "CONFIG_IRQ_VECTOR_TABLE_JUMP_BY_ADDRESS" in syms:
             write_address_irq_vector_table(fp, vt, nv)
         elif "CONFIG_IRQ_VECTOR_TABLE_JUMP_BY_CODE" in syms:
-            write_code_irq_vector_table(fp, vt, nv, syms)
+            write_code_irq_vector_table(fp, vt, nv, index)
         else:
             error("CONFIG_IRQ_VECTOR_TABLE_JUMP_BY_{ADDRESS,CODE} not set")
 
@@ -214,13 +219,11 @@ def write_source_file(fp, vt, swt, intlist, syms):
         fp.write("\t{{(const void *){0:#x}, (ISR){1}}},\n".format(param, func_as_string))
     fp.write("};\n")
 
-def get_symbols(obj):
-    for section in obj.iter_sections():
-        if isinstance(section, SymbolTableSection):
-            return {sym.name: sym.entry.st_value
-                    for sym in section.iter_symbols()}
-
-    error("Could not find symbol table")
+def get_elf_index(kernel):
+    try:
+        return ElfIndex(kernel)
+    except LookupError as e:
+        error(str(e))
 
 def getindex(irq, irq_aggregator_pos):
     try:
@@ -230,13 +233,10 @@ def getindex(irq, irq_aggregator_pos):
               format(irq, irq_aggregator_pos) +
               " Recheck interrupt configuration.")
 
-def main():
-    parse_args()
-
-    with open(args.kernel, "rb") as fp:
-        kernel = ELFFile(fp)
-        syms = get_symbols(kernel)
-
+def build_tables(syms, intlist):
+    """Returns the (vector table, SW ISR table) tuple for the interrupts in
+    'intlist'. Tables that are not generated are None.
+    """
     if "CONFIG_MULTI_LEVEL_INTERRUPTS" in syms:
         max_irq_per = syms["CONFIG_MAX_IRQ_PER_AGGREGATOR"]
 
@@ -258,7 +258,6 @@ def main():
 
                 debug('3rd level offsets: {}'.format(list_3rd_lvl_offsets))
 
-    intlist = read_intlist(args.intlist, syms)
     nvec = intlist["num_vectors"]
     offset = intlist["offset"]
 
@@ -352,8 +351,18 @@ def main():
 
             swt[table_index] = (param, func)
 
+    return vt, swt
+
+def main():
+    parse_args()
+
+    index = get_elf_index(args.kernel)
+    syms = index.symbol_values()
+    intlist = read_intlist(args.intlist, syms)
+    vt, swt = build_tables(syms, intlist)
+
     with open(args.output_source, "w") as fp:
-        write_source_file(fp, vt, swt, intlist, syms)
+        write_source_file(fp, vt, swt, intlist, syms, index)
 
 if __name__ == "__main__":
     main()
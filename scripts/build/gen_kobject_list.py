@@ -60,14 +60,15 @@ import json
 from packaging import version
 
 import elftools
-from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
+from elftools.dwarf.enums import ENUM_DW_FORM
 
-if version.parse(elftools.__version__) < version.parse('0.24'):
-    sys.exit("pyelftools is out of date, need version 0.24 or later")
+if version.parse(elftools.__version__) < version.parse('0.27'):
+    sys.exit("pyelftools is out of date, need version 0.27 or later")
 
 from collections import OrderedDict
 
+from elf_index import ElfIndex
+
 # Keys in this dictionary are structs which should be recognized as kernel
 # objects. Values are a tuple:
 #
@@ -478,6 +479,296 @@ def analyze_typedef(die):
     type_env[die.offset] = type_env[type_offset]
 
 
+# --- fast DIE index ---
+#
+# Having pyelftools parse every DIE is by far the slowest part of this script,
+# and nearly all DIEs (function bodies, parameters, inlined subroutines, ...)
+# are irrelevant to it. Instead, .debug_info is first scanned directly, using
+# only the abbreviation tables, to find the offsets of the type DIEs we analyze
+# and the type of each variable. Only those type DIEs, and the variables whose
+# type turns out to contain kernel objects, are then parsed by pyelftools.
+
+# DIE tags analyzed in step 1 of find_kobjects()
+TYPE_TAGS = {"DW_TAG_structure_type", "DW_TAG_const_type",
+             "DW_TAG_array_type", "DW_TAG_typedef"}
+
+# DIE tags whose subtrees can't contain types or variables we're interested in.
+# Variables inside inlined subroutines only refer to the abstract instance
+# with DW_AT_abstract_origin and have no name. These subtrees are skipped
+# when the DIE has a DW_AT_sibling attribute.
+SKIP_TAGS = {"DW_TAG_inlined_subroutine", "DW_TAG_call_site",
+             "DW_TAG_GNU_call_site", "DW_TAG_enumeration_type",
+             "DW_TAG_subroutine_type"}
+
+# Attribute value sizes for the forms with a fixed size
+FORM_SIZES = {
+    "DW_FORM_flag_present": 0, "DW_FORM_implicit_const": 0,
+    "DW_FORM_data1": 1, "DW_FORM_ref1": 1, "DW_FORM_flag": 1,
+    "DW_FORM_strx1": 1, "DW_FORM_addrx1": 1,
+    "DW_FORM_data2": 2, "DW_FORM_ref2": 2, "DW_FORM_strx2": 2,
+    "DW_FORM_addrx2": 2,
+    "DW_FORM_strx3": 3, "DW_FORM_addrx3": 3,
+    "DW_FORM_data4": 4, "DW_FORM_ref4": 4, "DW_FORM_strx4": 4,
+    "DW_FORM_addrx4": 4, "DW_FORM_ref_sup4": 4,
+    "DW_FORM_data8": 8, "DW_FORM_ref8": 8, "DW_FORM_ref_sig8": 8,
+    "DW_FORM_ref_sup8": 8,
+    "DW_FORM_data16": 16,
+}
+
+# Forms whose values are section offsets, with a size given by the DWARF
+# format (32- or 64-bit) of the CU
+OFFSET_FORMS = {"DW_FORM_strp", "DW_FORM_line_strp", "DW_FORM_sec_offset",
+                "DW_FORM_strp_sup", "DW_FORM_GNU_strp_alt",
+                "DW_FORM_GNU_ref_alt"}
+
+# Forms whose values are LEB128-encoded. Signed and unsigned values are
+# skipped the same way.
+LEB128_FORMS = {"DW_FORM_udata", "DW_FORM_sdata", "DW_FORM_ref_udata",
+                "DW_FORM_strx", "DW_FORM_addrx", "DW_FORM_loclistx",
+                "DW_FORM_rnglistx", "DW_FORM_GNU_addr_index",
+                "DW_FORM_GNU_str_index"}
+
+# Forms of CU-relative references, which can be read from the index
+REF_FORMS = {"DW_FORM_ref1", "DW_FORM_ref2", "DW_FORM_ref4", "DW_FORM_ref8",
+             "DW_FORM_ref_udata"}
+
+FORM_CODES = {code: name for name, code in ENUM_DW_FORM.items()}
+
+
+class DIEIndex:
+    """
+    Scans the DIEs of the compilation unit 'cu' in 'data', the contents of
+    .debug_info.
+
+    types:
+      Offsets of the DIEs with tags in TYPE_TAGS, in the order they appear.
+
+    variables:
+      (offset, type offset) tuples for the DW_TAG_variable DIEs that might
+      be kernel objects. The type offset is computed as in
+      die_get_type_offset(). It is None if it can't be found without parsing
+      the DIE with pyelftools, e.g. for variables with DW_AT_specification.
+    """
+    def __init__(self, cu, data, little_endian):
+        self.cu = cu
+        self.types = []
+        self.variables = []
+
+        self._data = data
+        self._byteorder = "little" if little_endian else "big"
+        self._address_size = cu["address_size"]
+        self._offset_size = 4 if cu.dwarf_format() == 32 else 8
+        self._abbrevs = cu.get_abbrev_table()
+
+        # Maps abbreviation codes to (tag, steps) tuples, where 'steps' is
+        # returned by _steps(), or by _split_steps() for DW_TAG_variable and
+        # SKIP_TAGS DIEs
+        self._plans = {}
+
+        # Maps the abbreviation codes of DW_TAG_variable DIEs to True if they
+        # have DW_AT_specification
+        self._has_spec = {}
+
+        self._scan()
+
+    def _scan(self):
+        data = self._data
+        cu = self.cu
+        plans = self._plans
+        skip = self._skip
+        types = self.types
+        variables = self.variables
+
+        pos = cu.cu_die_offset
+        end = cu.cu_offset + cu.size
+
+        while pos < end:
+            offset = pos
+
+            # Abbreviation code (ULEB128). Zero for the null DIEs that
+            # terminate lists of children.
+            code = data[pos]
+            pos += 1
+            if code & 0x80:
+                code &= 0x7f
+                shift = 7
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    code |= (byte & 0x7f) << shift
+                    if not byte & 0x80:
+                        break
+                    shift += 7
+
+            if not code:
+                continue
+
+            plan = plans.get(code)
+            if plan is None:
+                plan = plans[code] = self._plan(code)
+
+            tag, steps = plan
+
+            if tag is None:
+                # Uninteresting DIE
+                pos = skip(steps, pos)
+                continue
+
+            if tag in TYPE_TAGS:
+                types.append(offset)
+                pos = skip(steps, pos)
+                continue
+
+            # DW_TAG_variable, or a DIE from SKIP_TAGS. 'steps' is split
+            # up around the attribute we're after.
+            before, form, after = steps
+            pos = skip(before, pos)
+            if form is None:
+                ref = None
+            else:
+                ref, pos = self._read_ref(form, pos)
+            pos = skip(after, pos)
+
+            if tag == "DW_TAG_variable":
+                if form in REF_FORMS:
+                    variables.append((offset, ref + cu.cu_offset))
+                elif form is not None or self._has_spec[code]:
+                    variables.append((offset, None))
+            elif form in REF_FORMS:
+                # Jump over the children of a DIE from SKIP_TAGS
+                pos = ref + cu.cu_offset
+
+    def _plan(self, code):
+        # Returns a (tag, steps) tuple for the DIEs with abbreviation code
+        # 'code'. 'tag' is None for DIEs that are just skipped.
+
+        abbrev = self._abbrevs.get_abbrev(code)
+        tag = abbrev["tag"]
+        specs = list(abbrev.iter_attr_specs())
+
+        if tag == "DW_TAG_variable":
+            self._has_spec[code] = any(name == "DW_AT_specification"
+                                       for name, _ in specs)
+            return tag, self._split_steps(specs, "DW_AT_type")
+
+        if tag in SKIP_TAGS and abbrev.has_children():
+            return tag, self._split_steps(specs, "DW_AT_sibling")
+
+        if tag not in TYPE_TAGS:
+            tag = None
+
+        return tag, self._steps(specs)
+
+    def _split_steps(self, specs, attr):
+        # Returns a (before, form, after) tuple, where 'before' and 'after'
+        # skip the attributes before and after 'attr', and 'form' is the form
+        # of 'attr'. 'form' is None if the DIE has no 'attr' attribute.
+
+        for i, (name, form) in enumerate(specs):
+            if name == attr:
+                return (self._steps(specs[:i]), form,
+                        self._steps(specs[i + 1:]))
+
+        return self._steps(specs), None, []
+
+    def _steps(self, specs):
+        # Returns a list of steps for skipping the values of the attributes in
+        # 'specs'. Each step is either a number of bytes to skip, or the form
+        # of a variable-length value. Consecutive fixed sizes are merged.
+
+        steps = []
+        for _, form in specs:
+            size = self._form_size(form)
+            if size is None:
+                steps.append(form)
+            elif steps and isinstance(steps[-1], int):
+                steps[-1] += size
+            elif size:
+                steps.append(size)
+
+        return steps
+
+    def _form_size(self, form):
+        # Returns the size of values of form 'form', or None if they have a
+        # variable size
+
+        if form in FORM_SIZES:
+            return FORM_SIZES[form]
+        if form in OFFSET_FORMS:
+            return self._offset_size
+        if form == "DW_FORM_addr":
+            return self._address_size
+        if form == "DW_FORM_ref_addr":
+            if self.cu["version"] == 2:
+                return self._address_size
+            return self._offset_size
+        return None
+
+    def _skip(self, steps, pos):
+        # Skips over the attribute values described by 'steps', starting at
+        # 'pos'. Returns the position after them.
+
+        data = self._data
+        for step in steps:
+            if step.__class__ is int:
+                pos += step
+            elif step in LEB128_FORMS:
+                while data[pos] & 0x80:
+                    pos += 1
+                pos += 1
+            elif step == "DW_FORM_string":
+                pos = data.index(b"\0", pos) + 1
+            elif step == "DW_FORM_exprloc" or step == "DW_FORM_block":
+                length, pos = self._read_uleb(pos)
+                pos += length
+            elif step == "DW_FORM_block1":
+                pos += 1 + data[pos]
+            elif step == "DW_FORM_block2":
+                pos += 2 + self._read_int(pos, 2)
+            elif step == "DW_FORM_block4":
+                pos += 4 + self._read_int(pos, 4)
+            elif step == "DW_FORM_indirect":
+                code, pos = self._read_uleb(pos)
+                form = FORM_CODES[code]
+                size = self._form_size(form)
+                if size is None:
+                    pos = self._skip((form,), pos)
+                else:
+                    pos += size
+            else:
+                raise ValueError("unknown DWARF form %s in CU at 0x%x"
+                                 % (step, self.cu.cu_offset))
+        return pos
+
+    def _read_ref(self, form, pos):
+        # Reads a reference of form 'form' at 'pos'. Returns a (value, new
+        # position) tuple. The value is None for forms not in REF_FORMS.
+
+        if form == "DW_FORM_ref_udata":
+            return self._read_uleb(pos)
+
+        if form in REF_FORMS:
+            size = FORM_SIZES[form]
+            return self._read_int(pos, size), pos + size
+
+        return None, self._skip((form,), pos)
+
+    def _read_int(self, pos, size):
+        return int.from_bytes(self._data[pos:pos + size], self._byteorder)
+
+    def _read_uleb(self, pos):
+        data = self._data
+        value = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return value, pos
+            shift += 7
+
+
 def unpack_pointer(elf, data, offset):
     endian_code = "<" if elf.little_endian else ">"
     if elf.elfclass == 32:
@@ -491,31 +782,27 @@ def unpack_pointer(elf, data, offset):
                          data[offset:offset + size])[0]
 
 
-def addr_deref(elf, addr):
-    for section in elf.iter_sections():
-        start = section['sh_addr']
-        end = start + section['sh_size']
-
-        if start <= addr < end:
-            data = section.data()
-            offset = addr - start
-            return unpack_pointer(elf, data, offset)
+def addr_deref(index, addr):
+    data = index.read(addr, 4 if index.elfclass == 32 else 8)
+    if data is None:
+        return 0
 
-    return 0
+    return unpack_pointer(index, data, 0)
 
 
-def device_get_api_addr(elf, addr):
+def device_get_api_addr(index, addr):
     # See include/device.h for a description of struct device
-    offset = 8 if elf.elfclass == 32 else 16
-    return addr_deref(elf, addr + offset)
+    offset = 8 if index.elfclass == 32 else 16
+    return addr_deref(index, addr + offset)
 
 
-def find_kobjects(elf, syms):
+def find_kobjects(index, syms):
     global thread_counter
     global sys_mutex_counter
     global futex_counter
     global stack_counter
 
+    elf = index.elf
     if not elf.has_dwarf_info():
         sys.exit("ELF file has no DWARF information")
 
@@ -534,11 +821,20 @@ def find_kobjects(elf, syms):
 
     di = elf.get_dwarf_info()
 
-    variables = []
+    # Read .debug_info the same way as pyelftools, which takes care of
+    # compressed sections and relocations
+    stream = di.debug_info_sec.stream
+    stream.seek(0)
+    debug_info = stream.read()
+
+    die_indexes = [DIEIndex(CU, debug_info, di.config.little_endian)
+               for CU in di.iter_CUs()]
 
     # Step 1: collect all type information.
-    for CU in di.iter_CUs():
-        for die in CU.iter_DIEs():
+    for die_index in die_indexes:
+        for offset in die_index.types:
+            die = die_index.cu.get_DIE_from_refaddr(offset)
+
             # Unions are disregarded, kernel objects should never be union
             # members since the memory is not dedicated to that object and
             # could be something else
@@ -550,8 +846,6 @@ def find_kobjects(elf, syms):
                 analyze_die_array(die)
             elif die.tag == "DW_TAG_typedef":
                 analyze_typedef(die)
-            elif die.tag == "DW_TAG_variable":
-                variables.append(die)
 
     # Step 2: filter type_env to only contain kernel objects, or structs
     # and arrays of kernel objects
@@ -567,6 +861,15 @@ def find_kobjects(elf, syms):
     # all variables
     all_objs = {}
 
+    variables = []
+    for die_index in die_indexes:
+        for offset, type_offset in die_index.variables:
+            if type_offset is not None and type_offset not in type_env:
+                # Can't be a kernel object. Don't bother parsing the DIE.
+                continue
+
+            variables.append(die_index.cu.get_DIE_from_refaddr(offset))
+
     for die in variables:
         name = die_get_name(die)
         if not name:
@@ -679,7 +982,7 @@ def find_kobjects(elf, syms):
 
         # Device struct. Need to get the address of its API struct,
         # if it has one.
-        apiaddr = device_get_api_addr(elf, addr)
+        apiaddr = device_get_api_addr(index, addr)
         if apiaddr not in all_objs:
             if apiaddr == 0:
                 debug("device instance at 0x%x has no associated subsystem"
@@ -704,15 +1007,6 @@ def find_kobjects(elf, syms):
     # 3. Sorting memory address looks good.
     return OrderedDict(sorted(ret.items()))
 
-def get_symbols(elf):
-    for section in elf.iter_sections():
-        if isinstance(section, SymbolTableSection):
-            return {sym.name: sym.entry.st_value
-                    for sym in section.iter_symbols()}
-
-    raise LookupError("Could not find symbol table")
-
-
 # -- GPERF generation logic
 
 header = """%compare-lengths
@@ -1021,10 +1315,10 @@ def main():
 
     if args.gperf_output:
         assert args.kernel, "--kernel ELF required for --gperf-output"
-        elf = ELFFile(open(args.kernel, "rb"))
-        syms = get_symbols(elf)
+        index = ElfIndex(args.kernel)
+        syms = index.symbol_values()
         max_threads = syms["CONFIG_MAX_THREAD_BYTES"] * 8
-        objs = find_kobjects(elf, syms)
+        objs = find_kobjects(index, syms)
         if not objs:
             sys.stderr.write("WARNING: zero kobject found in %s\n"
                              % args.kernel)
@@ -1035,7 +1329,7 @@ def main():
                      .format(thread_counter, -(-thread_counter // 8)))
 
         with open(args.gperf_output, "w") as fp:
-            write_gperf_table(fp, syms, objs, elf.little_endian,
+            write_gperf_table(fp, syms, objs, index.little_endian,
                               syms["_static_kernel_objects_begin"],
                               syms["_static_kernel_objects_end"])
 
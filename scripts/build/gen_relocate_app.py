@@ -52,7 +52,8 @@ from typing import NewType
 from typing import Tuple
 
 from elftools.elf.elffile import ELFFile
-from elftools.elf.sections import SymbolTableSection
+
+from elf_sections import Section, SYMTAB_TYPES, read_sections, scan_sections
 
 MemoryRegion = NewType('MemoryRegion', str)
 
@@ -218,48 +219,56 @@ def region_is_default_ram(region_name: str) -> bool:
     return region_name == args.default_ram_region
 
 
-def find_sections(filename: str) -> 'dict[SectionKind, list[OutputSection]]':
+def find_sections(filename: str, sections: 'list[Section] | None' = None
+                  ) -> 'dict[SectionKind, list[OutputSection]]':
     """
     Locate relocatable sections in the given object file.
 
     The output value maps categories of sections to the list of actual sections
-    located in the object file that fit in that category.
+    located in the object file that fit in that category. 'sections' are the
+    sections of the object file as returned by elf_sections.read_sections(),
+    which are read from the file if not given.
     """
     obj_file_path = Path(filename)
 
-    with open(obj_file_path, 'rb') as obj_file_desc:
-        full_lib = ELFFile(obj_file_desc)
-        if not full_lib:
-            sys.exit("Error parsing file: " + filename)
-
-        sections = [x for x in full_lib.iter_sections()]
-        out = defaultdict(list)
+    if sections is None:
+        sections = read_sections(filename)
 
-        for section in sections:
-            section_kind = SectionKind.for_section_named(section.name)
-            if section_kind is None:
-                continue
+    out = defaultdict(list)
 
-            out[section_kind].append(
-                OutputSection(obj_file_path.name, section.name)
-            )
+    for section in sections:
+        section_kind = SectionKind.for_section_named(section.name)
+        if section_kind is None:
+            continue
 
-            # Common variables will be placed in the .bss section
-            # only after linking in the final executable. This "if" finds
-            # common symbols and warns the user of the problem.
-            # The solution to which is simply assigning a 0 to
-            # bss variable and it will go to the required place.
-            if isinstance(section, SymbolTableSection):
-                def is_common_symbol(s):
-                    return s.entry["st_shndx"] == "SHN_COMMON"
+        out[section_kind].append(
+            OutputSection(obj_file_path.name, section.name)
+        )
 
-                for symbol in filter(is_common_symbol, section.iter_symbols()):
-                    warnings.warn("Common variable found. Move "+
-                                  symbol.name + " to bss by assigning it to 0/NULL")
+        # Common variables will be placed in the .bss section
+        # only after linking in the final executable. This "if" finds
+        # common symbols and warns the user of the problem.
+        # The solution to which is simply assigning a 0 to
+        # bss variable and it will go to the required place.
+        if section.type in SYMTAB_TYPES:
+            warn_common_symbols(obj_file_path, section.name)
 
     return out
 
 
+def warn_common_symbols(obj_file_path: Path, section_name: str):
+    with open(obj_file_path, 'rb') as obj_file_desc:
+        full_lib = ELFFile(obj_file_desc)
+        section = full_lib.get_section_by_name(section_name)
+
+        def is_common_symbol(s):
+            return s.entry["st_shndx"] == "SHN_COMMON"
+
+        for symbol in filter(is_common_symbol, section.iter_symbols()):
+            warnings.warn("Common variable found. Move "+
+                          symbol.name + " to bss by assigning it to 0/NULL")
+
+
 def assign_to_correct_mem_region(
     memory_region: str,
     full_list_of_sections: 'dict[SectionKind, list[OutputSection]]'
@@ -469,6 +478,11 @@ def parse_args():
                         help="Name of default RAM memory region for system")
     parser.add_argument("-v", "--verbose", action="count", default=0,
                         help="Verbose Output")
+    parser.add_argument("--cache-file", required=False,
+                        help="File for caching the sections of the object "
+                             "files between runs")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of processes for reading object files")
     args = parser.parse_args()
 
 
@@ -565,17 +579,33 @@ def main():
     # Create/or truncate file contents if it already exists
     # raw = open(linker_file, "w")
 
+    # Find the obj files for all memory types, and read their section headers
+    # at once, so that unchanged files can be skipped using the cache and the
+    # rest read in parallel
+    obj_filenames = {}
+    for files in rel_dict.values():
+        for filename in files:
+            if filename not in obj_filenames:
+                obj_filenames[filename] = get_obj_filename(searchpath, filename)
+
+    obj_sections = scan_sections(
+        [obj_filename for obj_filename in obj_filenames.values()
+         # the obj file wasn't found. Probably not compiled.
+         if obj_filename],
+        args.cache_file, args.jobs)
+
     # for each memory_type, create text/rodata/data/bss sections for all obj files
     for memory_type, files in rel_dict.items():
         full_list_of_sections: 'dict[SectionKind, list[OutputSection]]' = defaultdict(list)
 
         for filename in files:
-            obj_filename = get_obj_filename(searchpath, filename)
+            obj_filename = obj_filenames[filename]
             # the obj file wasn't found. Probably not compiled.
             if not obj_filename:
                 continue
 
-            file_sections = find_sections(obj_filename)
+            file_sections = find_sections(obj_filename,
+                                          obj_sections[obj_filename])
             # Merge sections from file into collection of sections for all files
             for category, sections in file_sections.items():
                 full_list_of_sections[category].extend(sections)
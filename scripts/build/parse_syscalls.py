@@ -22,6 +22,11 @@ If the output JSON file already exists, its contents are checked against
 what information this script would have outputted; if the result is that the
 file would be unchanged, it is not modified to prevent unnecessary
 incremental builds.
+
+With --cache-file, the results for each scanned file are saved together with
+the file's modification time and size, and only files that changed since the
+previous run are read and scanned again. --jobs scans files in parallel, which
+mostly helps when there is no cache yet.
 """
 
 import sys
@@ -29,6 +34,9 @@ import re
 import argparse
 import os
 import json
+import multiprocessing
+
+from file_cache import load_cache, save_cache
 
 regex_flags = re.MULTILINE | re.VERBOSE
 
@@ -49,18 +57,53 @@ struct\s+                       # struct keyword is next
 [{]                             # Open curly bracket
 '''
 
-def tagged_struct_update(target_list, tag, contents):
-    regex = re.compile(tagged_struct_decl_template % tag, regex_flags)
-    items = [mo.groups()[0].strip() for mo in regex.finditer(contents)]
-    target_list.extend(items)
+tagged_struct_regexes = {
+    tag: re.compile(tagged_struct_decl_template % tag, regex_flags)
+    for tag in struct_tags
+}
 
+# Bump this when the format of the cache file changes
+CACHE_VERSION = 1
 
-def analyze_headers(multiple_directories):
-    syscall_ret = []
-    tagged_ret = {}
 
-    for tag in struct_tags:
-        tagged_ret[tag] = []
+def scan_file(path):
+    # Returns a (syscalls, tagged) tuple for the file at 'path'. 'syscalls' is
+    # a list of the regex groups for each system call declaration, and
+    # 'tagged' maps tags to the names of the structs tagged with them.
+
+    with open(path, "r", encoding="utf-8") as fp:
+        try:
+            contents = fp.read()
+        except Exception:
+            sys.stderr.write("Error decoding %s\n" % path)
+            raise
+
+    syscalls = []
+    tagged = {}
+
+    # The regexes can only match if the file contains the literal strings,
+    # which most files don't. Checking for those first is much faster.
+    try:
+        if "__syscall" in contents:
+            syscalls = [mo.groups() for mo in syscall_regex.finditer(contents)]
+
+        for tag, regex in tagged_struct_regexes.items():
+            if tag in contents:
+                items = [mo.groups()[0].strip()
+                         for mo in regex.finditer(contents)]
+                if items:
+                    tagged[tag] = items
+    except Exception:
+        sys.stderr.write("While parsing %s\n" % os.path.basename(path))
+        raise
+
+    return syscalls, tagged
+
+
+def find_files(multiple_directories):
+    # Returns the paths of the files to scan, in a stable order
+
+    paths = []
 
     for base_path in multiple_directories:
         for root, dirs, files in os.walk(base_path, topdown=True):
@@ -76,23 +119,54 @@ def analyze_headers(multiple_directories):
                                                    'common.h'))):
                     continue
 
-                with open(path, "r", encoding="utf-8") as fp:
-                    try:
-                        contents = fp.read()
-                    except Exception:
-                        sys.stderr.write("Error decoding %s\n" % path)
-                        raise
+                paths.append(path)
+
+    return paths
+
 
-                try:
-                    syscall_result = [(mo.groups(), fn)
-                                      for mo in syscall_regex.finditer(contents)]
-                    for tag in struct_tags:
-                        tagged_struct_update(tagged_ret[tag], tag, contents)
-                except Exception:
-                    sys.stderr.write("While parsing %s\n" % fn)
-                    raise
+def analyze_headers(multiple_directories, cache_file=None, jobs=1):
+    syscall_ret = []
+    tagged_ret = {}
+
+    for tag in struct_tags:
+        tagged_ret[tag] = []
+
+    paths = find_files(multiple_directories)
+
+    cached = load_cache(cache_file, CACHE_VERSION) if cache_file else {}
+    stats = {}
+    results = {}
+    to_scan = []
+
+    for path in paths:
+        st = os.stat(path)
+        stats[path] = (st.st_mtime_ns, st.st_size)
 
-                syscall_ret.extend(syscall_result)
+        entry = cached.get(path)
+        if entry and tuple(entry[:2]) == stats[path]:
+            results[path] = (entry[2], entry[3])
+        else:
+            to_scan.append(path)
+
+    if jobs > 1 and len(to_scan) > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            scanned = pool.map(scan_file, to_scan, chunksize=32)
+    else:
+        scanned = map(scan_file, to_scan)
+
+    results.update(zip(to_scan, scanned))
+
+    for path in paths:
+        syscalls, tagged = results[path]
+
+        fn = os.path.basename(path)
+        syscall_ret.extend((tuple(groups), fn) for groups in syscalls)
+        for tag, items in tagged.items():
+            tagged_ret[tag].extend(items)
+
+    if cache_file and (to_scan or len(cached) != len(paths)):
+        save_cache(cache_file, CACHE_VERSION,
+                   {path: [*stats[path], *results[path]] for path in paths})
 
     return syscall_ret, tagged_ret
 
@@ -126,6 +200,13 @@ def parse_args():
     parser.add_argument(
         "-t", "--tag-struct-file", required=True,
         help="Write tagged struct name information as json to file")
+    parser.add_argument(
+        "--cache-file",
+        help="Cache the results for each scanned file in this file, and only "
+             "scan files that changed since the previous run")
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Number of processes used to scan files (default: 1)")
 
     args = parser.parse_args()
 
@@ -133,7 +214,8 @@ def parse_args():
 def main():
     parse_args()
 
-    syscalls, tagged = analyze_headers(args.include)
+    syscalls, tagged = analyze_headers(args.include, args.cache_file,
+                                       args.jobs)
 
     # Only write json files if they don't exist or have changes since
     # they will force an incremental rebuild.
@@ -15,12 +15,21 @@ comparison
 We are exclusively working with 4-byte pointer values. This script adjusts
 the generated code so that we work with pointers directly and not strings.
 This saves a considerable amount of space.
+
+With --gperf, this script runs gperf itself, and can keep its outputs in a
+cache directory to avoid running it again on an identical object list, e.g.
+in a later link pass. With --builtin-hash, a perfect hash table with the same
+interface is generated directly from the gperf input file, without gperf.
 """
 
 import sys
 import argparse
+import codecs
+import hashlib
 import os
 import re
+import shutil
+import subprocess
 from packaging import version
 
 # --- debug stuff ---
@@ -77,6 +86,50 @@ def reformat_str(match_obj):
     return "(char *)0x%02x%02x%02x%02x%02x%02x%02x%02x" % tuple(addr_vals)
 
 
+# Substitutions done on each line, as (pattern, replacement) pairs. They are
+# combined into a single regular expression below, so that each line is only
+# scanned once.
+substitutions = [
+    # Replace length lookups with constant len since we're always
+    # looking at pointers
+    (r'lengthtable\[key\]', 'sizeof(void *)'),
+
+    # Empty wordlist entries to have NULLs instead of ""
+    (r'[{]["]["][}]', '{}'),
+
+    # Suppress a compiler warning since this table is no longer necessary
+    (r'static unsigned char lengthtable',
+     'static unsigned char __unused lengthtable'),
+
+    # drop all use of register keyword, let compiler figure that out,
+    # we have to do this since we change stuff to take the address of some
+    # parameters
+    (r'register', ''),
+
+    # Hashing the address of the string
+    (r'hash [(]str, len[)]', 'hash((const char *)&str, len)'),
+
+    # Take the strings with the binary information for the pointer values,
+    # and just turn them into pointers
+    (r'["](?:[^"\\]|\\.)*["]', reformat_str),
+]
+
+substitution_regex = re.compile(
+    "|".join("(%s)" % pattern for pattern, _ in substitutions))
+
+version_regex = re.compile("gperf version (.*) [*][/]$")
+
+# Just compare pointers directly instead of using memcmp
+memcmp_regex = re.compile("if [(][*]str")
+
+
+def substitute(match_obj):
+    _, replacement = substitutions[match_obj.lastindex - 1]
+    if callable(replacement):
+        return replacement(match_obj)
+    return replacement
+
+
 def process_line(line, fp):
     if line.startswith("#"):
         fp.write(line)
@@ -84,11 +137,11 @@ def process_line(line, fp):
 
     # Set the lookup function to static inline so it gets rolled into
     # z_object_find(), nothing else will use it
-    if re.search(args.pattern + " [*]$", line):
+    if lookup_regex.search(line):
         fp.write("static inline " + line)
         return
 
-    m = re.search("gperf version (.*) [*][/]$", line)
+    m = version_regex.search(line)
     if m:
         v = version.parse(m.groups()[0])
         v_lo = version.parse("3.0")
@@ -97,36 +150,300 @@ def process_line(line, fp):
             warn("gperf %s is not tested, versions %s through %s supported" %
                  (v, v_lo, v_hi))
 
-    # Replace length lookups with constant len since we're always
-    # looking at pointers
-    line = re.sub(r'lengthtable\[key\]', r'sizeof(void *)', line)
+    if memcmp_regex.search(line):
+        fp.write("            if (str == s)\n")
+        return
 
-    # Empty wordlist entries to have NULLs instead of ""
-    line = re.sub(r'[{]["]["][}]', r'{}', line)
+    fp.write(substitution_regex.sub(substitute, line))
 
-    # Suppress a compiler warning since this table is no longer necessary
-    line = re.sub(r'static unsigned char lengthtable',
-                  r'static unsigned char __unused lengthtable', line)
 
-    # drop all use of register keyword, let compiler figure that out,
-    # we have to do this since we change stuff to take the address of some
-    # parameters
-    line = re.sub(r'register', r'', line)
+# -- Running gperf --
 
-    # Hashing the address of the string
-    line = re.sub(r"hash [(]str, len[)]",
-                  r"hash((const char *)&str, len)", line)
+# Arguments gperf is run with by --gperf
+GPERF_ARGS = ["--multiple-iterations", "10"]
 
-    # Just compare pointers directly instead of using memcmp
-    if re.search("if [(][*]str", line):
-        fp.write("            if (str == s)\n")
-        return
+# Number of gperf outputs kept in the --cache-dir directory
+CACHE_ENTRIES = 8
 
-    # Take the strings with the binary information for the pointer values,
-    # and just turn them into pointers
-    line = re.sub(r'["].*["]', reformat_str, line)
 
-    fp.write(line)
+def run_gperf(keyword_file, output_file):
+    # Runs gperf on 'keyword_file', writing the C code to 'output_file'. If a
+    # cache directory is given, the output is reused when gperf has already
+    # been run on an identical keyword file, e.g. in an earlier link pass.
+
+    gperf = shutil.which(args.gperf) or args.gperf
+
+    with open(keyword_file, "rb") as fp:
+        keywords = fp.read()
+
+    cache_file = None
+    if args.cache_dir:
+        key = hashlib.sha256()
+        # A different gperf could generate different code
+        try:
+            st = os.stat(gperf)
+        except OSError as e:
+            error("gperf not found: %s" % e)
+        key.update(("%s %d %d %s\n" % (gperf, st.st_mtime_ns, st.st_size,
+                                       GPERF_ARGS)).encode())
+        key.update(keywords)
+        cache_file = os.path.join(args.cache_dir, key.hexdigest() + ".c")
+
+        if os.path.exists(cache_file):
+            debug("reusing gperf output " + cache_file)
+            shutil.copyfile(cache_file, output_file)
+            # Mark it as recently used
+            os.utime(cache_file)
+            return
+
+    debug("running " + gperf)
+    try:
+        subprocess.run([gperf, "--output-file", output_file, *GPERF_ARGS,
+                        keyword_file], check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        error("running gperf failed: %s" % e)
+
+    if cache_file:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        shutil.copyfile(output_file, cache_file)
+
+        # Only keep the most recently used entries
+        entries = sorted((os.path.join(args.cache_dir, name)
+                          for name in os.listdir(args.cache_dir)),
+                         key=os.path.getmtime, reverse=True)
+        for entry in entries[CACHE_ENTRIES:]:
+            os.remove(entry)
+
+
+# -- Generating the hash table without gperf --
+
+# The generated lookup function hashes the pointer value, folded to 32 bits,
+# with a "hash and displace" scheme: the key is first hashed to a bucket, and
+# then hashed to a table slot together with a per-bucket displacement value,
+# chosen so that no two keys end up in the same slot.
+#
+# The size of the generated tables only depends on the number of keys, and
+# not on their values. The kernel objects are at different addresses in the
+# prebuilt and final link passes, and the hash table must not change size
+# between them. If no displacements work, a different seed for the bucket
+# hash is tried instead of growing the table.
+
+BUCKET_MULTIPLIER = 0x9e3779b1
+SLOT_MULTIPLIER = 0x85ebca6b
+
+# Number of bucket hash seeds tried before giving up
+MAX_SEEDS = 64
+
+
+def mix(x, multiplier):
+    # Same as the mix() in the generated C code
+
+    h = (x * multiplier) & 0xffffffff
+    return h ^ (h >> 16)
+
+
+def parse_keyword_file(keyword_file):
+    # Parses the gperf input generated by gen_kobject_list.py. Returns a
+    # (directives, declarations, keywords, code) tuple, where 'directives'
+    # maps the %define names to values, 'declarations' holds the text of the
+    # declarations section (including the %{ %} block), 'keywords' is a list
+    # of (key bytes, rest of the struct initializer) tuples, and 'code' is the
+    # code after the keywords.
+
+    with open(keyword_file, "r") as fp:
+        lines = fp.read().splitlines(keepends=True)
+
+    directives = {}
+    declarations = []
+    keywords = []
+    code = []
+
+    section = 0
+    in_code_block = False
+    for line in lines:
+        if line.rstrip("\n") == "%%" and section < 2:
+            section += 1
+        elif section == 0:
+            if line.startswith("%{"):
+                in_code_block = True
+            elif line.startswith("%}"):
+                in_code_block = False
+            elif in_code_block or not line.startswith("%"):
+                declarations.append(line)
+            elif line.startswith("%define "):
+                _, name, value = line.split(None, 2)
+                directives[name] = value.strip()
+        elif section == 1:
+            m = keyword_regex.match(line)
+            if not m:
+                error("unrecognized keyword line: " + line)
+            keywords.append((codecs.escape_decode(m.group(1))[0],
+                             m.group(2)))
+        else:
+            code.append(line)
+
+    return directives, "".join(declarations), keywords, "".join(code)
+
+
+keyword_regex = re.compile(r'"((?:[^"\\]|\\.)*)",\s*(.*)$')
+
+
+def table_sizes(n):
+    # Returns a (table size, number of buckets) tuple for 'n' keys
+
+    num_buckets = 1
+    while num_buckets < n // 2:
+        num_buckets *= 2
+
+    return max(1, n + n // 4), num_buckets
+
+
+def bucket_hash(x, seed, num_buckets):
+    # Same as the bucket hash in the generated C code
+
+    return mix(x ^ seed, BUCKET_MULTIPLIER) & (num_buckets - 1)
+
+
+def slot_hash(x, displacement, size):
+    # Same as the slot hash in the generated C code
+
+    return mix(x ^ displacement, SLOT_MULTIPLIER) % size
+
+
+def find_perfect_hash(keys):
+    # Returns a (bucket hash seed, displacements) tuple for hashing the
+    # 32-bit values in 'keys' without collisions, into a table with the size
+    # from table_sizes()
+
+    size, num_buckets = table_sizes(len(keys))
+
+    for seed in range(MAX_SEEDS):
+        buckets = [[] for _ in range(num_buckets)]
+        for x in keys:
+            buckets[bucket_hash(x, seed, num_buckets)].append(x)
+
+        displacements = [0] * num_buckets
+        taken = set()
+
+        # Place the largest buckets first, while there is the most room
+        for bucket in sorted(range(num_buckets),
+                             key=lambda b: len(buckets[b]), reverse=True):
+            xs = buckets[bucket]
+            if not xs:
+                continue
+
+            for d in range(0x10000):
+                slots = {slot_hash(x, d, size) for x in xs}
+                if len(slots) == len(xs) and taken.isdisjoint(slots):
+                    displacements[bucket] = d
+                    taken |= slots
+                    break
+            else:
+                # No displacement works for this bucket
+                break
+        else:
+            return seed, displacements
+
+        debug("no perfect hash with seed %d, retrying" % seed)
+
+    error("no perfect hash found for %d keys, use gperf instead" % len(keys))
+
+
+def write_builtin_hash(keyword_file, fp):
+    # Writes a perfect hash table for the keywords in 'keyword_file' to 'fp'.
+    # The generated code has the same interface as the gperf output after
+    # post-processing.
+
+    directives, declarations, keywords, code = parse_keyword_file(keyword_file)
+
+    lookup_name = directives.get("lookup-function-name", "in_word_set")
+    struct_decl = args.pattern
+
+    key_len = len(keywords[0][0]) if keywords else 4
+    if any(len(key) != key_len for key, _ in keywords):
+        error("keys of different lengths")
+
+    # Same byte order as reformat_str()
+    addrs = [int.from_bytes(key, "little") for key, _ in keywords]
+    keys = [(addr ^ (addr >> 32)) & 0xffffffff for addr in addrs]
+    if len(set(keys)) != len(keys):
+        error("duplicate keys, use gperf instead")
+
+    size, num_buckets = table_sizes(len(keys))
+    seed, displacements = find_perfect_hash(keys)
+
+    slots = [None] * size
+    for addr, x, (_, rest) in zip(addrs, keys, keywords):
+        d = displacements[bucket_hash(x, seed, num_buckets)]
+        slots[slot_hash(x, d, size)] = (addr, rest)
+
+    fold = ""
+    if key_len > 4:
+        fold = " ^ (uint32_t)((uint64_t)addr >> 32)"
+
+    fp.write("""\
+/* Perfect hash table generated by process_gperf.py */
+%s
+#define TOTAL_KEYWORDS %d
+#define MIN_WORD_LENGTH %d
+#define MAX_WORD_LENGTH %d
+#define MIN_HASH_VALUE 0
+#define MAX_HASH_VALUE %d
+
+static const uint16_t displacements[] =
+  {
+""" % (declarations, len(keywords), key_len, key_len, size - 1))
+
+    for i in range(0, len(displacements), 8):
+        fp.write("    " + " ".join("%d," % d for d in displacements[i:i + 8])
+                 + "\n")
+
+    fp.write("""\
+  };
+
+static inline uint32_t mix(uint32_t x, uint32_t multiplier)
+{
+  uint32_t h = x * multiplier;
+
+  return h ^ (h >> 16);
+}
+
+static inline unsigned int hash(const char *str)
+{
+  uintptr_t addr = (uintptr_t)str;
+  uint32_t x = (uint32_t)addr%s;
+
+  return mix(x ^ displacements[mix(x ^ %dU, 0x%xU) & %dU], 0x%xU) %% %dU;
+}
+
+static %s wordlist[] =
+  {
+""" % (fold, seed, BUCKET_MULTIPLIER, num_buckets - 1, SLOT_MULTIPLIER, size,
+       struct_decl))
+
+    for slot in slots:
+        if slot is None:
+            fp.write("    {},\n")
+        else:
+            addr, rest = slot
+            fp.write("    {(char *)0x%016x, %s},\n" % (addr, rest))
+
+    fp.write("""\
+  };
+
+static inline %s *
+%s (const char *str, size_t len)
+{
+  if (len == sizeof(void *))
+    {
+      unsigned int key = hash(str);
+
+      if (str == wordlist[key].name)
+        return &wordlist[key];
+    }
+  return 0;
+}
+%s""" % (struct_decl, lookup_name, code))
 
 
 def parse_args():
@@ -138,22 +455,55 @@ def parse_args():
         allow_abbrev=False)
 
     parser.add_argument("-i", "--input", required=True,
-                        help="Input C file from gperf")
+                        help="Input C file from gperf, or the gperf input "
+                             "file with --gperf and --builtin-hash")
     parser.add_argument("-o", "--output", required=True,
                         help="Output C file with processing done")
     parser.add_argument("-p", "--pattern", required=True,
             help="Search pattern for objects")
     parser.add_argument("-v", "--verbose", action="store_true",
                         help="Print extra debugging information")
+
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--gperf",
+                       help="Run this gperf executable on the input file, "
+                            "instead of taking its output as input")
+    group.add_argument("--builtin-hash", action="store_true",
+                       help="Generate the hash table for the input file "
+                            "directly, without gperf")
+
+    parser.add_argument("--gperf-output",
+                        help="With --gperf, file to write the gperf output "
+                             "to before it is processed")
+    parser.add_argument("--cache-dir",
+                        help="With --gperf, directory for keeping gperf "
+                             "outputs, which are reused if gperf is run on "
+                             "an identical input file again")
     args = parser.parse_args()
+    if args.gperf and not args.gperf_output:
+        parser.error("--gperf requires --gperf-output")
     if "VERBOSE" in os.environ:
         args.verbose = 1
 
 def main():
+    global lookup_regex
+
     parse_args()
 
-    with open(args.input, "r") as in_fp, open(args.output, "w") as out_fp:
-        for line in in_fp.readlines():
+    lookup_regex = re.compile(args.pattern + " [*]$")
+
+    if args.builtin_hash:
+        with open(args.output, "w") as out_fp:
+            write_builtin_hash(args.input, out_fp)
+        return
+
+    gperf_output = args.input
+    if args.gperf:
+        gperf_output = args.gperf_output
+        run_gperf(args.input, gperf_output)
+
+    with open(gperf_output, "r") as in_fp, open(args.output, "w") as out_fp:
+        for line in in_fp:
             process_line(line, out_fp)
 
 
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2026 The Zephyr Project Contributors
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Benchmark for the devicetree tooling.
+
+Generates synthetic devicetrees with the given numbers of nodes, and
+measures how long the different stages of gen_defines.py take for each of
+them:
+
+  parse:  parsing the .dts file with dtlib
+  edt:    creating the edtlib.EDT (with lazy=True, so without the below)
+  props:  computing the properties, registers, interrupts, etc. of all nodes
+  graph:  building the dependency graph and computing the ordinals
+  header: generating devicetree_generated.h with gen_defines.py
+
+The time per node should stay roughly constant as the devicetree grows.
+--check-scaling makes the script fail if it doesn't, which can be used to
+catch super-linear regressions.
+
+The generated devicetrees look like large multi-cluster SoCs: a number of
+buses, each with its own interrupt and GPIO controllers and many devices
+that reference them through 'interrupts' and 'gpios'.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python-devicetree',
+                                'src'))
+
+from devicetree import dtlib, edtlib
+
+import gen_defines
+
+STAGES = ("parse", "edt", "props", "graph", "header")
+
+# Number of devices on each bus
+DEVICES_PER_BUS = 62
+
+BINDINGS = {
+    "bench-intc.yaml": """\
+description: Benchmark interrupt controller
+compatible: "bench,intc"
+properties:
+  reg:
+    type: array
+interrupt-cells:
+  - irq
+  - priority
+""",
+    "bench-gpio.yaml": """\
+description: Benchmark GPIO controller
+compatible: "bench,gpio"
+properties:
+  reg:
+    type: array
+  interrupts:
+    type: array
+gpio-cells:
+  - pin
+  - flags
+""",
+    "bench-bus.yaml": """\
+description: Benchmark bus
+compatible: "bench,bus"
+bus: bench
+properties:
+  reg:
+    type: array
+""",
+    "bench-device.yaml": """\
+description: Benchmark device
+compatible: "bench,device"
+on-bus: bench
+properties:
+  reg:
+    type: array
+  interrupts:
+    type: array
+  gpios:
+    type: phandle-array
+  mode:
+    type: string
+    enum:
+      - fast
+      - slow
+  label:
+    type: string
+""",
+}
+
+
+def main():
+    args = parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bindings_dir = os.path.join(tmp_dir, "bindings")
+        write_bindings(bindings_dir)
+
+        print(f"{'nodes':>8} " +
+              " ".join(f"{stage + ' (s)':>12}" for stage in STAGES) +
+              f" {'us/node':>10}")
+
+        for n_nodes in args.sizes:
+            dts_path = os.path.join(tmp_dir, f"bench-{n_nodes}.dts")
+            with open(dts_path, "w", encoding="utf-8") as f:
+                f.write(gen_dts(n_nodes))
+
+            times, actual_nodes = run_stages(dts_path, bindings_dir, tmp_dir)
+            results.append((actual_nodes, times))
+
+            total = sum(times.values())
+            print(f"{actual_nodes:>8} " +
+                  " ".join(f"{times[stage]:>12.3f}" for stage in STAGES) +
+                  f" {1e6*total/actual_nodes:>10.1f}")
+
+    if args.check_scaling is not None:
+        check_scaling(results, args.check_scaling)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        allow_abbrev=False, description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000],
+                        help="approximate numbers of nodes in the generated "
+                             "devicetrees (default: 1000 10000)")
+    parser.add_argument("--check-scaling", type=float, metavar="FACTOR",
+                        help="exit with an error if, for any stage, the time "
+                             "per node for the largest devicetree is more "
+                             "than FACTOR times the time per node for the "
+                             "smallest one")
+
+    return parser.parse_args()
+
+
+def write_bindings(bindings_dir):
+    # Writes the bindings used by the generated devicetrees to 'bindings_dir'
+
+    os.makedirs(bindings_dir)
+    for name, contents in BINDINGS.items():
+        with open(os.path.join(bindings_dir, name), "w",
+                  encoding="utf-8") as f:
+            f.write(contents)
+
+
+def gen_dts(n_nodes):
+    # Returns the source for a devicetree with about 'n_nodes' nodes
+
+    n_buses = max(1, n_nodes // (DEVICES_PER_BUS + 3))
+
+    s = """\
+/dts-v1/;
+
+/ {
+	#address-cells = <1>;
+	#size-cells = <1>;
+
+	soc {
+		compatible = "simple-bus";
+		#address-cells = <1>;
+		#size-cells = <1>;
+		ranges;
+"""
+
+    for bus in range(n_buses):
+        base = 0x10000000 + bus * 0x100000
+
+        s += f"""
+		intc{bus}: interrupt-controller@{base:x} {{
+			compatible = "bench,intc";
+			reg = <{base:#x} 0x1000>;
+			interrupt-controller;
+			#interrupt-cells = <2>;
+		}};
+
+		gpio{bus}: gpio@{base + 0x1000:x} {{
+			compatible = "bench,gpio";
+			reg = <{base + 0x1000:#x} 0x1000>;
+			interrupt-parent = <&intc{bus}>;
+			interrupts = <0 1>;
+			gpio-controller;
+			#gpio-cells = <2>;
+		}};
+
+		bus{bus}: bus@{base + 0x2000:x} {{
+			compatible = "bench,bus";
+			reg = <{base + 0x2000:#x} 0x1000>;
+			#address-cells = <1>;
+			#size-cells = <0>;
+			interrupt-parent = <&intc{bus}>;
+"""
+
+        for dev in range(DEVICES_PER_BUS):
+            # Also reference the GPIO controller of the previous bus, to get
+            # dependencies between clusters
+            other = (bus - 1) % n_buses
+            s += f"""
+			dev{bus}_{dev}: device@{dev:x} {{
+				compatible = "bench,device";
+				reg = <{dev:#x}>;
+				interrupts = <{dev + 1} 2>;
+				gpios = <&gpio{bus} {dev % 32} 0>, <&gpio{other} {dev % 32} 1>;
+				mode = "{'fast' if dev % 2 else 'slow'}";
+				label = "DEV_{bus}_{dev}";
+				status = "{'okay' if dev % 3 else 'disabled'}";
+			}};
+"""
+
+        s += """
+		};
+"""
+
+    s += """
+	};
+};
+"""
+
+    return s
+
+
+def run_stages(dts_path, bindings_dir, out_dir):
+    # Runs the benchmarked stages on 'dts_path'. Returns a (dict mapping stage
+    # names to times, number of nodes) tuple.
+
+    times = {}
+
+    t = time.perf_counter()
+    dtlib.DT(dts_path)
+    times["parse"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    edt = edtlib.EDT(dts_path, [bindings_dir], lazy=True)
+    times["edt"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for node in edt.nodes:
+        node.props
+        node.regs
+        node.ranges
+        node.interrupts
+        node.pinctrls
+    times["props"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    edt.scc_order
+    edt.dep_ord2node
+    times["graph"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    gen_defines.write_outputs(edt,
+                              os.path.join(out_dir, "devicetree_generated.h"),
+                              os.path.join(out_dir, "zephyr.dts"),
+                              None)
+    times["header"] = time.perf_counter() - t
+
+    return times, len(edt.nodes)
+
+
+def check_scaling(results, max_factor):
+    # Exits with an error if the time per node grows by more than
+    # 'max_factor' between the smallest and the largest devicetree in
+    # 'results', for any stage
+
+    (min_nodes, min_times), (max_nodes, max_times) = \
+        min(results, key=lambda res: res[0]), max(results, key=lambda res: res[0])
+
+    errors = []
+    for stage in STAGES:
+        min_per_node = min_times[stage] / min_nodes
+        max_per_node = max_times[stage] / max_nodes
+        if max_per_node > max_factor * min_per_node:
+            errors.append(f"{stage}: {1e6*min_per_node:.1f} us/node with "
+                          f"{min_nodes} nodes, but {1e6*max_per_node:.1f} "
+                          f"us/node with {max_nodes} nodes")
+
+    if errors:
+        sys.exit("super-linear scaling detected:\n" + "\n".join(errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@
 
 import argparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import logging
 import os
 import pathlib
@@ -38,6 +40,12 @@ from devicetree import edtlib
 FOREACH_PROP_ELEM_TYPES = set(['string', 'array', 'uint8-array', 'string-array',
                                'phandles', 'phandle-array'])
 
+# Names of the files written to each output directory in --batch mode. These
+# match the names used by the build system.
+BATCH_HEADER_NAME = "devicetree_generated.h"
+BATCH_DTS_NAME = "zephyr.dts"
+BATCH_EDT_PICKLE_NAME = "edt.pickle"
+
 class LogFormatter(logging.Formatter):
     '''A log formatter that prints the level name in lower case,
     for compatibility with earlier versions of edtlib.'''
@@ -50,9 +58,6 @@ class LogFormatter(logging.Formatter):
         return super().format(record)
 
 def main():
-    global header_file
-    global flash_area_num
-
     args = parse_args()
 
     setup_edtlib_logging()
@@ -61,23 +66,62 @@ def main():
     for prefixes_file in args.vendor_prefixes:
         vendor_prefixes.update(edtlib.load_vendor_prefixes_txt(prefixes_file))
 
+    if args.batch:
+        run_batch(args, vendor_prefixes)
+        return
+
+    binding_cache = load_binding_cache(args)
+
     try:
-        edt = edtlib.EDT(args.dts, args.bindings_dirs,
-                         # Suppress this warning if it's suppressed in dtc
-                         warn_reg_unit_address_mismatch=
-                             "-Wno-simple_bus_reg" not in args.dtc_flags,
-                         default_prop_types=True,
-                         infer_binding_for_paths=["/zephyr,user"],
-                         werror=args.edtlib_Werror,
-                         vendor_prefixes=vendor_prefixes)
+        edt = load_edt(args.dts, args, vendor_prefixes, binding_cache)
     except edtlib.EDTError as e:
         sys.exit(f"devicetree error: {e}")
 
+    write_outputs(edt, args.header_out, args.dts_out, args.edt_pickle_out)
+
+    if args.binding_cache:
+        binding_cache.save(args.binding_cache)
+
+
+def load_binding_cache(args):
+    # Returns the edtlib.BindingCache to use. If --binding-cache was given,
+    # the cache saved by an earlier run is reused, so that bindings don't
+    # have to be loaded again when only the devicetree (e.g. an overlay)
+    # has changed. edtlib throws away anything that is out of date.
+
+    if args.binding_cache:
+        return edtlib.BindingCache.load(args.binding_cache)
+    return edtlib.BindingCache()
+
+
+def load_edt(dts, args, vendor_prefixes, binding_cache=None):
+    # Returns an edtlib.EDT for 'dts', configured from the command-line
+    # arguments. 'binding_cache' is an optional edtlib.BindingCache to share
+    # bindings with other EDT objects (used in batch mode).
+
+    return edtlib.EDT(dts, args.bindings_dirs,
+                      # Suppress this warning if it's suppressed in dtc
+                      warn_reg_unit_address_mismatch=
+                          "-Wno-simple_bus_reg" not in args.dtc_flags,
+                      default_prop_types=True,
+                      infer_binding_for_paths=["/zephyr,user"],
+                      werror=args.edtlib_Werror,
+                      vendor_prefixes=vendor_prefixes,
+                      binding_cache=binding_cache)
+
+
+def write_outputs(edt, header_out, dts_out, edt_pickle_out):
+    # Writes the merged DTS source, the generated header, and (if
+    # 'edt_pickle_out' is not None) the pickled EDT for 'edt'.
+
+    global header_lines
+    global flash_area_num
+    global instance_nos
+
     flash_area_num = 0
 
     # Save merged DTS source, as a debugging aid
-    with open(args.dts_out, "w", encoding="utf-8") as f:
-        print(edt.dts_source, file=f)
+    write_if_changed(dts_out, edt.dts_source + "\n")
 
     # The raw index into edt.compat2nodes[compat] is used for node
     # instance numbering within a compatible.
@@ -98,58 +142,160 @@ def main():
         edt.compat2nodes[compat] = sorted(
             nodes, key=lambda node: 0 if node.status == "okay" else 1)
 
-    # Create the generated header.
-    with open(args.header_out, "w", encoding="utf-8") as header_file:
-        write_top_comment(edt)
+    # Maps (compatible, node) tuples to instance numbers, so that they don't
+    # have to be looked up with list.index(), which is slow for compatibles
+    # with many nodes
+    instance_nos = {(compat, node): i
+                    for compat, nodes in edt.compat2nodes.items()
+                    for i, node in enumerate(nodes)}
+
+    # Create the generated header. The out_*() functions append lines to
+    # 'header_lines', which is written out in one go at the end.
+    header_lines = []
 
-        write_utils()
+    write_top_comment(edt)
 
-        # populate all z_path_id first so any children references will
-        # work correctly.
-        for node in sorted(edt.nodes, key=lambda node: node.dep_ordinal):
-            node.z_path_id = node_z_path_id(node)
+    write_utils()
 
-        # Check to see if we have duplicate "zephyr,memory-region" property values.
-        regions = dict()
-        for node in sorted(edt.nodes, key=lambda node: node.dep_ordinal):
-            if 'zephyr,memory-region' in node.props:
-                region = node.props['zephyr,memory-region'].val
-                if region in regions:
-                    sys.exit(f"ERROR: Duplicate 'zephyr,memory-region' ({region}) properties "
-                             f"between {regions[region].path} and {node.path}")
-                regions[region] = node
+    nodes_by_ordinal = sorted(edt.nodes, key=lambda node: node.dep_ordinal)
 
-        for node in sorted(edt.nodes, key=lambda node: node.dep_ordinal):
-            write_node_comment(node)
+    # populate all z_path_id first so any children references will
+    # work correctly.
+    for node in nodes_by_ordinal:
+        node.z_path_id = node_z_path_id(node)
 
-            out_comment("Node's full path:")
-            out_dt_define(f"{node.z_path_id}_PATH", f'"{escape(node.path)}"')
+    # Check to see if we have duplicate "zephyr,memory-region" property values.
+    regions = dict()
+    for node in nodes_by_ordinal:
+        if 'zephyr,memory-region' in node.props:
+            region = node.props['zephyr,memory-region'].val
+            if region in regions:
+                sys.exit(f"ERROR: Duplicate 'zephyr,memory-region' ({region}) properties "
+                         f"between {regions[region].path} and {node.path}")
+            regions[region] = node
 
-            out_comment("Node's name with unit-address:")
-            out_dt_define(f"{node.z_path_id}_FULL_NAME",
-                          f'"{escape(node.name)}"')
+    for node in nodes_by_ordinal:
+        write_node_comment(node)
 
-            if node.parent is not None:
-                out_comment(f"Node parent ({node.parent.path}) identifier:")
-                out_dt_define(f"{node.z_path_id}_PARENT",
-                              f"DT_{node.parent.z_path_id}")
+        out_comment("Node's full path:")
+        out_dt_define(f"{node.z_path_id}_PATH", f'"{escape(node.path)}"')
 
-                out_comment(f"Node's index in its parent's list of children:")
-                out_dt_define(f"{node.z_path_id}_CHILD_IDX",
-                              node.parent.child_index(node))
+        out_comment("Node's name with unit-address:")
+        out_dt_define(f"{node.z_path_id}_FULL_NAME",
+                      f'"{escape(node.name)}"')
 
-            write_children(node)
-            write_dep_info(node)
-            write_idents_and_existence(node)
-            write_bus(node)
-            write_special_props(node)
-            write_vanilla_props(node)
+        if node.parent is not None:
+            out_comment(f"Node parent ({node.parent.path}) identifier:")
+            out_dt_define(f"{node.z_path_id}_PARENT",
+                          f"DT_{node.parent.z_path_id}")
 
-        write_chosen(edt)
-        write_global_macros(edt)
+            out_comment(f"Node's index in its parent's list of children:")
+            out_dt_define(f"{node.z_path_id}_CHILD_IDX",
+                          node.parent.child_index(node))
 
-    if args.edt_pickle_out:
-        write_pickled_edt(edt, args.edt_pickle_out)
+        write_children(node)
+        write_dep_info(node)
+        write_idents_and_existence(node)
+        write_bus(node)
+        write_special_props(node)
+        write_vanilla_props(node)
+
+    write_chosen(edt)
+    write_global_macros(edt)
+
+    write_if_changed(header_out, "\n".join(header_lines) + "\n")
+
+    if edt_pickle_out:
+        write_pickled_edt(edt, edt_pickle_out)
+
+
+def run_batch(args, vendor_prefixes):
+    # Generates the outputs for every (DTS file, output directory) pair
+    # listed in the --batch file. All devicetrees share one
+    # edtlib.BindingCache per process, so that binding files are only
+    # searched for and parsed once, no matter how many boards are processed.
+    #
+    # Errors in one devicetree are reported and the remaining ones are still
+    # processed. The script exits with an error if any of them failed.
+
+    jobs = read_batch_file(args.batch)
+
+    if args.batch_jobs > 1 and len(jobs) > 1:
+        # Each worker process has its own cache, so --binding-cache is only
+        # read here, not updated
+        with ProcessPoolExecutor(max_workers=args.batch_jobs,
+                                 initializer=init_batch_worker,
+                                 initargs=(args, vendor_prefixes)) as pool:
+            errors = list(pool.map(run_batch_job, jobs))
+    else:
+        init_batch_worker(args, vendor_prefixes)
+        errors = [run_batch_job(job) for job in jobs]
+
+        if args.binding_cache:
+            batch_state[2].save(args.binding_cache)
+
+    errors = [error for error in errors if error is not None]
+    if errors:
+        sys.exit("\n".join(errors))
+
+
+def read_batch_file(batch_file):
+    # Parses the --batch file. Returns a list of (DTS path, output directory)
+    # tuples, one per non-empty, non-comment line.
+
+    jobs = []
+    with open(batch_file, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            fields = line.split()
+            if len(fields) != 2:
+                sys.exit(f"{batch_file}:{lineno}: expected "
+                         f"'<dts> <output directory>', got '{line}'")
+            jobs.append(tuple(fields))
+
+    return jobs
+
+
+def init_batch_worker(args, vendor_prefixes):
+    # Sets up the per-process state used by run_batch_job(). This runs once
+    # in each worker process when a process pool is used.
+
+    global batch_state
+
+    if not logging.getLogger('edtlib').handlers:
+        # Worker processes that weren't forked from the main process
+        # don't inherit its logging setup
+        setup_edtlib_logging()
+
+    batch_state = (args, vendor_prefixes, load_binding_cache(args))
+
+
+def run_batch_job(job):
+    # Generates the outputs for one (DTS path, output directory) tuple from
+    # the --batch file. Returns an error message, or None on success.
+
+    dts, out_dir = job
+    args, vendor_prefixes, binding_cache = batch_state
+
+    try:
+        edt = load_edt(dts, args, vendor_prefixes, binding_cache)
+
+        os.makedirs(out_dir, exist_ok=True)
+        write_outputs(edt,
+                      os.path.join(out_dir, BATCH_HEADER_NAME),
+                      os.path.join(out_dir, BATCH_DTS_NAME),
+                      os.path.join(out_dir, BATCH_EDT_PICKLE_NAME))
+    except edtlib.EDTError as e:
+        return f"devicetree error in {dts}: {e}"
+    except (Exception, SystemExit) as e:
+        # write_outputs() reports errors with sys.exit() and err(). Don't let
+        # them stop the other devicetrees from being processed.
+        return f"{dts}: {e}"
+
+    return None
 
 
 def setup_edtlib_logging():
@@ -186,16 +332,16 @@ def parse_args():
     # Returns parsed command-line arguments
 
     parser = argparse.ArgumentParser(allow_abbrev=False)
-    parser.add_argument("--dts", required=True, help="DTS file")
+    parser.add_argument("--dts", help="DTS file")
     parser.add_argument("--dtc-flags",
                         help="'dtc' devicetree compiler flags, some of which "
                              "might be respected here")
     parser.add_argument("--bindings-dirs", nargs='+', required=True,
                         help="directory with bindings in YAML format, "
                         "we allow multiple")
-    parser.add_argument("--header-out", required=True,
+    parser.add_argument("--header-out",
                         help="path to write header to")
-    parser.add_argument("--dts-out", required=True,
+    parser.add_argument("--dts-out",
                         help="path to write merged DTS source code to (e.g. "
                              "as a debugging aid)")
     parser.add_argument("--edt-pickle-out",
@@ -207,8 +353,46 @@ def parse_args():
                         help="if set, edtlib-specific warnings become errors. "
                              "(this does not apply to warnings shared "
                              "with dtc.)")
+    parser.add_argument("--binding-cache", metavar="FILE",
+                        help="file for caching bindings between runs. "
+                             "Bindings are loaded from it if they are up to "
+                             "date, and it is updated afterwards. This makes "
+                             "reruns after devicetree (e.g. overlay) changes "
+                             "faster.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="generate outputs for many devicetrees at once. "
+                             "Each line of FILE has a DTS file and an output "
+                             "directory, separated by whitespace. "
+                             f"{BATCH_HEADER_NAME}, {BATCH_DTS_NAME} and "
+                             f"{BATCH_EDT_PICKLE_NAME} are written to the "
+                             "output directory. Bindings are only loaded "
+                             "once. Empty lines and lines starting with '#' "
+                             "are ignored. --dts, --header-out, --dts-out "
+                             "and --edt-pickle-out may not be given.")
+    parser.add_argument("--batch-jobs", type=int, default=1, metavar="N",
+                        help="number of processes to use with --batch "
+                             "(default: 1)")
+
+    args = parser.parse_args()
+
+    single_args = ("dts", "header_out", "dts_out", "edt_pickle_out")
+    if args.batch:
+        given = [arg for arg in single_args if getattr(args, arg)]
+        if given:
+            parser.error("--batch can't be combined with " +
+                         ", ".join("--" + arg.replace("_", "-")
+                                   for arg in given))
+    else:
+        missing = [arg for arg in single_args[:3] if not getattr(args, arg)]
+        if missing:
+            parser.error("the following arguments are required: " +
+                         ", ".join("--" + arg.replace("_", "-")
+                                   for arg in missing))
 
-    return parser.parse_args()
+    if args.batch_jobs < 1:
+        parser.error("--batch-jobs must be at least 1")
+
+    return args
 
 
 def write_top_comment(edt):
@@ -311,7 +495,7 @@ def write_idents_and_existence(node):
     idents = [f"N_ALIAS_{str2ident(alias)}" for alias in node.aliases]
     # Instances
     for compat in node.compats:
-        instance_no = node.edt.compat2nodes[compat].index(node)
+        instance_no = instance_nos[(compat, node)]
         idents.append(f"N_INST_{instance_no}_{str2ident(compat)}")
     # Node labels
     idents.extend(f"N_NODELABEL_{str2ident(label)}" for label in node.labels)
@@ -530,37 +714,40 @@ def write_children(node):
 
     out_comment("Helper macros for child nodes of this node.")
 
+    # Node identifiers of all children and of the enabled children
+    child_ids = [f"DT_{child.z_path_id}" for child in node.children.values()]
+    okay_ids = [f"DT_{child.z_path_id}" for child in node.children.values()
+                if child.status == "okay"]
+
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD(fn)",
-            " ".join(f"fn(DT_{child.z_path_id})" for child in
-                node.children.values()))
+            " ".join(f"fn({child_id})" for child_id in child_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_SEP(fn, sep)",
-            " DT_DEBRACKET_INTERNAL sep ".join(f"fn(DT_{child.z_path_id})"
-            for child in node.children.values()))
+            " DT_DEBRACKET_INTERNAL sep ".join(f"fn({child_id})"
+            for child_id in child_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_VARGS(fn, ...)",
-            " ".join(f"fn(DT_{child.z_path_id}, __VA_ARGS__)"
-            for child in node.children.values()))
+            " ".join(f"fn({child_id}, __VA_ARGS__)"
+            for child_id in child_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_SEP_VARGS(fn, sep, ...)",
-            " DT_DEBRACKET_INTERNAL sep ".join(f"fn(DT_{child.z_path_id}, __VA_ARGS__)"
-            for child in node.children.values()))
+            " DT_DEBRACKET_INTERNAL sep ".join(f"fn({child_id}, __VA_ARGS__)"
+            for child_id in child_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_STATUS_OKAY(fn)",
-            " ".join(f"fn(DT_{child.z_path_id})"
-            for child in node.children.values() if child.status == "okay"))
+            " ".join(f"fn({child_id})" for child_id in okay_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_STATUS_OKAY_SEP(fn, sep)",
-            " DT_DEBRACKET_INTERNAL sep ".join(f"fn(DT_{child.z_path_id})"
-            for child in node.children.values() if child.status == "okay"))
+            " DT_DEBRACKET_INTERNAL sep ".join(f"fn({child_id})"
+            for child_id in okay_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_STATUS_OKAY_VARGS(fn, ...)",
-            " ".join(f"fn(DT_{child.z_path_id}, __VA_ARGS__)"
-            for child in node.children.values() if child.status == "okay"))
+            " ".join(f"fn({child_id}, __VA_ARGS__)"
+            for child_id in okay_ids))
 
     out_dt_define(f"{node.z_path_id}_FOREACH_CHILD_STATUS_OKAY_SEP_VARGS(fn, sep, ...)",
-            " DT_DEBRACKET_INTERNAL sep ".join(f"fn(DT_{child.z_path_id}, __VA_ARGS__)"
-            for child in node.children.values() if child.status == "okay"))
+            " DT_DEBRACKET_INTERNAL sep ".join(f"fn({child_id}, __VA_ARGS__)"
+            for child_id in okay_ids))
 
 
 def write_status(node):
@@ -928,10 +1115,10 @@ def write_global_macros(edt):
         # conversion in the preprocessor helps to keep the macro
         # expansions simpler. That hopefully eases debugging.
         for_each_macros[f"DT_FOREACH_OKAY_INST_{ident}(fn)"] = \
-            " ".join(f"fn({edt.compat2nodes[compat].index(node)})"
+            " ".join(f"fn({instance_nos[(compat, node)]})"
                      for node in okay_nodes)
         for_each_macros[f"DT_FOREACH_OKAY_INST_VARGS_{ident}(fn, ...)"] = \
-            " ".join(f"fn({edt.compat2nodes[compat].index(node)}, __VA_ARGS__)"
+            " ".join(f"fn({instance_nos[(compat, node)]}, __VA_ARGS__)"
                      for node in okay_nodes)
 
     for compat, nodes in edt.compat2nodes.items():
@@ -963,10 +1150,18 @@ def write_global_macros(edt):
             out_define(
                 f"DT_COMPAT_{str2ident(compat)}_BUS_{str2ident(bus)}", 1)
 
+@lru_cache(maxsize=None)
 def str2ident(s):
     # Converts 's' to a form suitable for (part of) an identifier
+    #
+    # The same strings (compatibles, property names, path components, ...)
+    # are converted many times while generating the header, so results are
+    # cached.
 
-    return re.sub('[-,.@/+]', '_', s.lower())
+    return _NOT_IDENT_CHARS_SUB('_', s.lower())
+
+
+_NOT_IDENT_CHARS_SUB = re.compile('[-,.@/+]').sub
 
 
 def list2init(l):
@@ -1004,7 +1199,7 @@ def out_define(macro, val, width=None, deprecation_msg=None):
     else:
         s = f"#define {macro}{warn} {val}"
 
-    print(s, file=header_file)
+    header_lines.append(s)
 
 
 def out_comment(s, blank_before=True):
@@ -1013,7 +1208,7 @@ def out_comment(s, blank_before=True):
     # before the comment.
 
     if blank_before:
-        print(file=header_file)
+        header_lines.append("")
 
     if "\n" in s:
         # Format multi-line comments like
@@ -1030,12 +1225,12 @@ def out_comment(s, blank_before=True):
             # Vim if space error checking is on, which is annoying.
             res.append(" *" if not line.strip() else " * " + line)
         res.append(" */")
-        print("\n".join(res), file=header_file)
+        header_lines.extend(res)
     else:
         # Format single-line comments like
         #
         #   /* foo bar */
-        print("/* " + s + " */", file=header_file)
+        header_lines.append("/* " + s + " */")
 
 
 def escape(s):
@@ -1052,6 +1247,26 @@ def quote_str(s):
     return f'"{escape(s)}"'
 
 
+def write_if_changed(path, contents):
+    # Writes 'contents' (a string) to the file at 'path', unless the file
+    # already has exactly those contents.
+    #
+    # Leaving an unchanged file alone keeps its modification time, so that
+    # e.g. an unchanged generated header doesn't trigger a rebuild of every
+    # source file that includes it.
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == contents:
+                return
+    except OSError:
+        # Missing or unreadable; (re)create it below
+        pass
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(contents)
+
+
 def write_pickled_edt(edt, out_file):
     # Writes the edt object in pickle format to out_file.
 
@@ -763,6 +763,10 @@ class DT:
 
         self._force = force
 
+        # Maps labels to nodes while resolving references after parsing. See
+        # _ref2node().
+        self._ref_label2node: Optional[Dict[str, Node]] = None
+
         if filename is not None:
             self._parse_file(filename, include_path)
         else:
@@ -1030,8 +1034,18 @@ class DT:
         self._parse_memreserves()
         self._parse_dt()
 
+        # The tree doesn't change while references are resolved, so label
+        # references can be looked up in a table instead of by searching the
+        # tree each time, which would be quadratic
+        self._ref_label2node = {}
+        for node in self.node_iter():
+            for label in node.labels:
+                self._ref_label2node.setdefault(label, node)
+
         self._register_phandles()
         self._fixup_props()
+        self._ref_label2node = None
+
         self._register_aliases()
         self._remove_unreferenced()
         self._register_labels()
@@ -1733,6 +1747,11 @@ class DT:
 
         # Label reference (&foo).
 
+        if self._ref_label2node is not None:
+            if s in self._ref_label2node:
+                return self._ref_label2node[s]
+            _err(f"undefined node label '{s}'")
+
         # label2node hasn't been filled in yet, and using it would get messy
         # when nodes are deleted
         for node in self.node_iter():
@@ -22,7 +22,8 @@ which has all the information related to the node.
 
 The top-level entry points for the library are the EDT and Binding classes.
 See their constructor docstrings for details. There is also a
-bindings_from_paths() helper function.
+bindings_from_paths() helper function, and a BindingCache class for sharing
+parsed bindings between EDT objects.
 """
 
 # NOTE: tests/test_edtlib.py is the test suite for this library.
@@ -69,8 +70,10 @@ bindings_from_paths() helper function.
 
 from collections import defaultdict
 from copy import deepcopy
+import hashlib
 import logging
 import os
+import pickle
 import re
 
 import yaml
@@ -156,7 +159,9 @@ class EDT:
                  support_fixed_partitions_on_any_bus=True,
                  infer_binding_for_paths=None,
                  vendor_prefixes=None,
-                 werror=False):
+                 werror=False,
+                 binding_cache=None,
+                 lazy=False):
         """EDT constructor.
 
         dts:
@@ -195,6 +200,25 @@ class EDT:
           If True, some edtlib specific warnings become errors. This currently
           errors out if 'dts' has any deprecated properties set, or an unknown
           vendor prefix is used.
+
+        binding_cache (default: None):
+          A BindingCache object. If given, the list of binding files in
+          'bindings_dirs' and the parsed bindings are taken from (and added
+          to) it instead of being read from disk again. Pass the same
+          BindingCache when creating several EDT objects with the same
+          'bindings_dirs'.
+
+        lazy (default: False):
+          If True, the 'props', 'regs', 'ranges', 'interrupts' and 'pinctrls'
+          attributes of each Node, and everything related to the dependency
+          graph ('dep_ordinal', 'depends_on', 'required_by', 'scc_order' and
+          'dep_ord2node'), are computed the first time they are accessed
+          instead of up front. This makes creating the EDT much faster for
+          tools that only look at a few nodes.
+
+          Errors and warnings about nodes are then only reported for the
+          parts that are computed. Call validate() to compute everything and
+          run all checks, as is done when 'lazy' is False.
         """
         self._warn_reg_unit_address_mismatch = warn_reg_unit_address_mismatch
         self._default_prop_types = default_prop_types
@@ -202,6 +226,7 @@ class EDT:
         self._infer_binding_for_paths = set(infer_binding_for_paths or [])
         self._werror = bool(werror)
         self._vendor_prefixes = vendor_prefixes or {}
+        self._lazy = lazy
 
         self.dts_path = dts
         self.bindings_dirs = bindings_dirs
@@ -212,13 +237,56 @@ class EDT:
             raise EDTError(e) from e
         _check_dt(self._dt)
 
-        self._init_compat2binding()
+        self._init_compat2binding(binding_cache or BindingCache())
         self._init_nodes()
-        self._init_graph()
+        if not lazy:
+            self._init_graph()
         self._init_luts()
 
         self._check()
 
+    def __getattr__(self, name):
+        # Computes the attributes that are left out when 'lazy' is True,
+        # the first time they are accessed. Only called for attributes that
+        # don't exist yet.
+
+        if name not in ("_graph", "dep_ord2node"):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        try:
+            if name == "_graph":
+                self._init_graph()
+            else:
+                self._init_dep_ord2node()
+        except Exception:
+            # Don't leave a partially initialized attribute behind
+            self.__dict__.pop(name, None)
+            raise
+
+        return object.__getattribute__(self, name)
+
+    def validate(self):
+        """
+        Computes everything that is computed on demand when the EDT was
+        created with lazy=True, and runs all checks that are skipped in that
+        case. Raises EDTError or logs warnings for any problems found, like
+        the constructor does when 'lazy' is False.
+
+        This is a no-op for EDT objects created with lazy=False.
+        """
+        if not self._lazy:
+            return
+
+        for node in self.nodes:
+            for name in _LAZY_NODE_ATTRS:
+                getattr(node, name)
+
+        # Builds the dependency graph and assigns ordinals
+        self._init_dep_ord2node()
+
+        self._check_nodes()
+
     def get_node(self, path):
         """
         Returns the Node at the DT path or alias 'path'. Raises EDTError if the
@@ -277,40 +345,46 @@ class EDT:
         # The algorithm supports detecting dependency loops.
         #
         # Actually computing the SCC order is lazily deferred to the
-        # first time the scc_order property is read.
+        # first time the scc_order property is read. With lazy=True, the
+        # graph itself is only built when first needed, by __getattr__().
 
-        self._graph = Graph()
+        # Built separately and only assigned once complete, so that an error
+        # in a node leaves no partial graph behind
+        graph = Graph()
 
         for node in self.nodes:
             # A Node always depends on its parent.
             for child in node.children.values():
-                self._graph.add_edge(child, node)
+                graph.add_edge(child, node)
 
             # A Node depends on any Nodes present in 'phandle',
             # 'phandles', or 'phandle-array' property values.
             for prop in node.props.values():
                 if prop.type == 'phandle':
-                    self._graph.add_edge(node, prop.val)
+                    graph.add_edge(node, prop.val)
                 elif prop.type == 'phandles':
                     for phandle_node in prop.val:
-                        self._graph.add_edge(node, phandle_node)
+                        graph.add_edge(node, phandle_node)
                 elif prop.type == 'phandle-array':
                     for cd in prop.val:
                         if cd is None:
                             continue
-                        self._graph.add_edge(node, cd.controller)
+                        graph.add_edge(node, cd.controller)
 
             # A Node depends on whatever supports the interrupts it
             # generates.
             for intr in node.interrupts:
-                self._graph.add_edge(node, intr.controller)
+                graph.add_edge(node, intr.controller)
+
+        self._graph = graph
 
-    def _init_compat2binding(self):
+    def _init_compat2binding(self, binding_cache):
         # Creates self._compat2binding, a dictionary that maps
         # (<compatible>, <bus>) tuples (both strings) to Binding objects.
         #
         # The Binding objects are created from YAML files discovered
-        # in self.bindings_dirs as needed.
+        # in self.bindings_dirs as needed, and are shared with other EDT
+        # instances through 'binding_cache'.
         #
         # For example, self._compat2binding["company,dev", "can"]
         # contains the Binding for the 'company,dev' device, when it
@@ -329,37 +403,19 @@ class EDT:
             "|".join(re.escape(compat) for compat in dt_compats)
         ).search
 
-        self._binding_paths = _binding_paths(self.bindings_dirs)
-        self._binding_fname2path = {os.path.basename(path): path
-                                    for path in self._binding_paths}
+        self._binding_paths, self._binding_fname2path = \
+            binding_cache._index(self.bindings_dirs)
 
         self._compat2binding = {}
         for binding_path in self._binding_paths:
-            with open(binding_path, encoding="utf-8") as f:
-                contents = f.read()
-
-            # As an optimization, skip parsing files that don't contain any of
-            # the .dts 'compatible' strings, which should be reasonably safe
-            if not dt_compats_search(contents):
-                continue
-
-            # Load the binding and check that it actually matches one of the
-            # compatibles. Might get false positives above due to comments and
-            # stuff.
-
-            try:
-                # Parsed PyYAML output (Python lists/dictionaries/strings/etc.,
-                # representing the file)
-                raw = yaml.load(contents, Loader=_BindingLoader)
-            except yaml.YAMLError as e:
-                _err(
-                        f"'{binding_path}' appears in binding directories "
-                        f"but isn't valid YAML: {e}")
+            compatible = binding_cache._compatible(binding_path,
+                                                   dt_compats_search)
+            if compatible is None or compatible not in dt_compats:
+                # Empty file, binding fragment, spurious file, or not a
+                # compatible we care about.
                 continue
 
-            # Convert the raw data to a Binding object, erroring out
-            # if necessary.
-            binding = self._binding(raw, binding_path, dt_compats)
+            binding = binding_cache._binding(binding_path, self.bindings_dirs)
 
             # Register the binding in self._compat2binding, along with
             # any child bindings that have their own compatibles.
@@ -368,28 +424,6 @@ class EDT:
                     self._register_binding(binding)
                 binding = binding.child_binding
 
-    def _binding(self, raw, binding_path, dt_compats):
-        # Convert a 'raw' binding from YAML to a Binding object and return it.
-        #
-        # Error out if the raw data looks like an invalid binding.
-        #
-        # Return None if the file doesn't contain a binding or the
-        # binding's compatible isn't in dt_compats.
-
-        # Get the 'compatible:' string.
-        if raw is None or "compatible" not in raw:
-            # Empty file, binding fragment, spurious file, etc.
-            return None
-
-        compatible = raw["compatible"]
-
-        if compatible not in dt_compats:
-            # Not a compatible we care about.
-            return None
-
-        # Initialize and return the Binding object.
-        return Binding(binding_path, self._binding_fname2path, raw=raw)
-
     def _register_binding(self, binding):
         # Do not allow two different bindings to have the same
         # 'compatible:'/'on-bus:' combo
@@ -426,12 +460,21 @@ class EDT:
                 node.compats = []
             node.bus_node = node._bus_node(self._fixed_partitions_no_bus)
             node._init_binding()
-            node._init_regs()
-            node._init_ranges()
 
             self.nodes.append(node)
             self._node2enode[dt_node] = node
 
+            if self._lazy:
+                # Everything else is computed on demand, by
+                # Node.__getattr__()
+                continue
+
+            node._init_regs()
+            node._init_ranges()
+
+        if self._lazy:
+            return
+
         for node in self.nodes:
             # These depend on all Node objects having been created, because
             # they (either always or sometimes) reference other nodes, so we
@@ -441,19 +484,12 @@ class EDT:
             node._init_interrupts()
             node._init_pinctrls()
 
-        if self._warn_reg_unit_address_mismatch:
-            # This warning matches the simple_bus_reg warning in dtc
-            for node in self.nodes:
-                if node.regs and node.regs[0].addr != node.unit_addr:
-                    _LOG.warning("unit address and first address in 'reg' "
-                                 f"(0x{node.regs[0].addr:x}) don't match for "
-                                 f"{node.path}")
+        self._check_nodes()
 
     def _init_luts(self):
         # Initialize node lookup tables (LUTs).
 
         self.label2node = {}
-        self.dep_ord2node = {}
         self.compat2nodes = defaultdict(list)
         self.compat2okay = defaultdict(list)
         self.compat2vendor = defaultdict(str)
@@ -498,6 +534,15 @@ class EDT:
                             f"has unknown vendor prefix '{vendor}'")
 
 
+        if not self._lazy:
+            self._init_dep_ord2node()
+
+    def _init_dep_ord2node(self):
+        # Initializes self.dep_ord2node. Done separately from _init_luts()
+        # since it requires the dependency graph.
+
+        self.dep_ord2node = {}
+
         for nodeset in self.scc_order:
             node = nodeset[0]
             self.dep_ord2node[node.dep_ordinal] = node
@@ -524,6 +569,18 @@ class EDT:
                         'in lowercase: ' +
                         ', '.join(repr(x) for x in spec.enum))
 
+    def _check_nodes(self):
+        # Checks and warnings that involve the properties of every node.
+        # Postponed until validate() when 'lazy' is True.
+
+        if self._warn_reg_unit_address_mismatch:
+            # This warning matches the simple_bus_reg warning in dtc
+            for node in self.nodes:
+                if node.regs and node.regs[0].addr != node.unit_addr:
+                    _LOG.warning("unit address and first address in 'reg' "
+                                 f"(0x{node.regs[0].addr:x}) don't match for "
+                                 f"{node.path}")
+
         # Validate the contents of compatible properties.
         for node in self.nodes:
             if 'compatible' not in node.props:
@@ -531,7 +588,7 @@ class EDT:
 
             compatibles = node.props['compatible'].val
 
-            # _check() runs after _init_compat2binding() has called
+            # _check_nodes() runs after _init_compat2binding() has called
             # _dt_compats(), which already converted every compatible
             # property to a list of strings. So we know 'compatibles'
             # is a list, but add an assert for future-proofing.
@@ -676,6 +733,10 @@ class Node:
       A list of ControllerAndData objects for the GPIOs hogged by the node. The
       list is empty if the node does not hog any GPIOs. Only relevant for GPIO hog
       nodes.
+
+    If the EDT was created with lazy=True, 'props', 'regs', 'ranges',
+    'interrupts', 'pinctrls' and 'dep_ordinal' are computed when they are
+    first accessed, and can raise EDTError at that point.
     """
     @property
     def name(self):
@@ -878,6 +939,39 @@ class Node:
             binding = "no binding"
         return f"<Node {self.path} in '{self.edt.dts_path}', {binding}>"
 
+    def __getattr__(self, name):
+        # Computes the attributes that are left out when the EDT is created
+        # with lazy=True, the first time they are accessed. Only called for
+        # attributes that don't exist yet.
+
+        if name not in _LAZY_NODE_ATTRS and name != "dep_ordinal":
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        try:
+            if name == "props":
+                self._init_props(
+                    default_prop_types=self.edt._default_prop_types,
+                    err_on_deprecated=self.edt._werror)
+            elif name == "regs":
+                self._init_regs()
+            elif name == "ranges":
+                self._init_ranges()
+            elif name == "interrupts":
+                self._init_interrupts()
+            elif name == "pinctrls":
+                self._init_pinctrls()
+            else:
+                # dep_ordinal is assigned to all nodes when the dependency
+                # order is computed
+                self.edt.scc_order
+        except Exception:
+            # Don't leave a partially initialized attribute behind
+            self.__dict__.pop(name, None)
+            raise
+
+        return object.__getattribute__(self, name)
+
     def _init_binding(self):
         # Initializes Node.matching_compat, Node._binding, and
         # Node.binding_path.
@@ -2102,6 +2196,197 @@ def bindings_from_paths(yaml_paths, ignore_errors=False):
 
     return ret
 
+class BindingCache:
+    """
+    Caches binding files so that they can be shared between EDT objects.
+
+    Creating an EDT searches the bindings directories for binding files and
+    parses the ones that match a compatible in the devicetree. Tools that
+    create many EDT objects with the same bindings directories (for example,
+    to generate headers for many boards at once) can pass the same
+    BindingCache to each EDT constructor, so that every directory is only
+    searched once and every binding file is only read and parsed once.
+
+    A BindingCache can also be saved to a file with save() and loaded in a
+    later process with BindingCache.load(). This lets tools that run
+    repeatedly on slightly different devicetrees (like gen_defines.py while
+    overlays are being edited) skip loading bindings again.
+
+    The Binding objects in the cache are shared by all EDT objects that use
+    it, and must not be modified.
+    """
+
+    def __init__(self):
+        # Maps tuples of bindings directories to (binding paths, fname2path)
+        # tuples, like EDT._binding_paths and EDT._binding_fname2path
+        self._dirs2index = {}
+
+        # Maps binding paths to (modification time, size) tuples, recorded
+        # when the bindings directories were searched. Used to check if a
+        # loaded cache is up to date.
+        self._path2stamp = {}
+
+        # Maps binding paths to the contents of the file, as a string
+        self._path2contents = {}
+
+        # Maps binding paths to the 'compatible:' in the file (None if
+        # there is none), for files that have been parsed
+        self._path2compat = {}
+
+        # Maps binding paths to parsed YAML which has not been turned into a
+        # Binding yet. Binding() modifies the data it is given, so entries
+        # are removed when used.
+        self._path2raw = {}
+
+        # Maps (bindings directories, binding path) tuples to Binding objects
+        self._key2binding = {}
+
+    def __repr__(self):
+        return (f"<BindingCache, {len(self._path2contents)} files read, "
+                f"{len(self._key2binding)} bindings>")
+
+    def save(self, path):
+        """
+        Saves the cache to the file at 'path', so that it can be loaded with
+        BindingCache.load().
+        """
+        with open(path, "wb") as f:
+            # See the comment in gen_defines.py's write_pickled_edt() about
+            # the protocol version
+            pickle.dump(_cache_key(), f, protocol=4)
+            pickle.dump(self, f, protocol=4)
+
+    @staticmethod
+    def load(path):
+        """
+        Returns a BindingCache loaded from the file at 'path', written
+        earlier by save().
+
+        Binding files are not read again, but the bindings directories are
+        searched again, and the files in them are checked for changes.
+        Everything cached for a set of bindings directories where a binding
+        file has been added, removed or modified is thrown away.
+
+        If 'path' doesn't exist or can't be loaded, or was saved by a
+        different version of this library, an empty BindingCache is
+        returned.
+        """
+        try:
+            with open(path, "rb") as f:
+                if pickle.load(f) != _cache_key():
+                    return BindingCache()
+                cache = pickle.load(f)
+        except Exception:
+            # Missing, truncated, or from an incompatible version of this
+            # library
+            return BindingCache()
+
+        if not isinstance(cache, BindingCache):
+            return BindingCache()
+
+        cache._drop_stale()
+        return cache
+
+    def _drop_stale(self):
+        # Removes everything that depends on binding files that have been
+        # added, removed or modified since they were cached
+
+        changed = {path for path, stamp in self._path2stamp.items()
+                   if _file_stamp(path) != stamp}
+
+        for key, (paths, _) in list(self._dirs2index.items()):
+            if changed.isdisjoint(paths) and paths == _binding_paths(key):
+                continue
+
+            # Bindings can include any file in the bindings directories, so
+            # drop all of them
+            del self._dirs2index[key]
+            for binding_key in list(self._key2binding):
+                if binding_key[0] == key:
+                    del self._key2binding[binding_key]
+
+        for path in changed:
+            del self._path2stamp[path]
+            self._path2contents.pop(path, None)
+            self._path2compat.pop(path, None)
+            self._path2raw.pop(path, None)
+
+    def _index(self, bindings_dirs):
+        # Returns a (binding paths, fname2path) tuple for 'bindings_dirs'
+
+        key = tuple(bindings_dirs)
+        if key not in self._dirs2index:
+            paths = _binding_paths(bindings_dirs)
+            for path in paths:
+                if path not in self._path2stamp:
+                    self._path2stamp[path] = _file_stamp(path)
+            self._dirs2index[key] = \
+                (paths, {os.path.basename(path): path for path in paths})
+
+        return self._dirs2index[key]
+
+    def _contents(self, path):
+        # Returns the contents of the binding file at 'path'
+
+        if path not in self._path2contents:
+            with open(path, encoding="utf-8") as f:
+                self._path2contents[path] = f.read()
+
+        return self._path2contents[path]
+
+    def _compatible(self, path, dt_compats_search):
+        # Returns the 'compatible:' string in the binding file at 'path', or
+        # None if it has none.
+        #
+        # As an optimization, files that have not been parsed yet and don't
+        # contain any string matched by 'dt_compats_search' are not parsed,
+        # and None is returned for them. This should be reasonably safe.
+        # There might be false positives due to comments and stuff, which is
+        # why the file is parsed before its compatible is returned.
+
+        if path in self._path2compat:
+            return self._path2compat[path]
+
+        contents = self._contents(path)
+        if not dt_compats_search(contents):
+            return None
+
+        raw = self._load(path)
+        if raw is None or "compatible" not in raw:
+            compatible = None
+        else:
+            compatible = raw["compatible"]
+
+        self._path2raw[path] = raw
+        self._path2compat[path] = compatible
+        return compatible
+
+    def _binding(self, path, bindings_dirs):
+        # Returns the Binding for the file at 'path', which must have been
+        # found in 'bindings_dirs'
+
+        key = (tuple(bindings_dirs), path)
+        if key not in self._key2binding:
+            raw = self._path2raw.pop(path, None)
+            if raw is None:
+                raw = self._load(path)
+
+            self._key2binding[key] = \
+                Binding(path, self._index(bindings_dirs)[1], raw=raw)
+
+        return self._key2binding[key]
+
+    def _load(self, path):
+        # Parses the binding file at 'path' and returns the PyYAML output
+        # (Python lists/dictionaries/strings/etc., representing the file)
+
+        try:
+            return yaml.load(self._contents(path), Loader=_BindingLoader)
+        except yaml.YAMLError as e:
+            _err(f"'{path}' appears in binding directories "
+                 f"but isn't valid YAML: {e}")
+
+
 class PropertySpec:
     """
     Represents a "property specification", i.e. the description of a
@@ -2163,6 +2448,20 @@ class PropertySpec:
         self.name = name
         self._raw = self.binding.raw["properties"][name]
 
+        # The tokenizability of 'enum:' is computed here rather than on
+        # demand, so that PropertySpec objects are never modified after
+        # construction. That keeps EDT objects that share bindings through
+        # a BindingCache (and their pickled form) independent of each other.
+        if self.type != 'string' or self.enum is None:
+            self._enum_tokenizable = self._enum_upper_tokenizable = False
+        else:
+            as_tokens = [re.sub(_NOT_ALPHANUM_OR_UNDERSCORE, '_', value)
+                         for value in self.enum]
+            self._enum_tokenizable = len(as_tokens) == len(set(as_tokens))
+            self._enum_upper_tokenizable = \
+                (self._enum_tokenizable and
+                 len(as_tokens) == len(set(x.upper() for x in as_tokens)))
+
     def __repr__(self):
         return f"<PropertySpec {self.name} type '{self.type}'>"
 
@@ -2189,30 +2488,11 @@ class PropertySpec:
     @property
     def enum_tokenizable(self):
         "See the class docstring"
-        if not hasattr(self, '_enum_tokenizable'):
-            if self.type != 'string' or self.enum is None:
-                self._enum_tokenizable = False
-            else:
-                # Saving _as_tokens here lets us reuse it in
-                # enum_upper_tokenizable.
-                self._as_tokens = [re.sub(_NOT_ALPHANUM_OR_UNDERSCORE,
-                                          '_', value)
-                                   for value in self.enum]
-                self._enum_tokenizable = (len(self._as_tokens) ==
-                                          len(set(self._as_tokens)))
-
         return self._enum_tokenizable
 
     @property
     def enum_upper_tokenizable(self):
         "See the class docstring"
-        if not hasattr(self, '_enum_upper_tokenizable'):
-            if not self.enum_tokenizable:
-                self._enum_upper_tokenizable = False
-            else:
-                self._enum_upper_tokenizable = \
-                    (len(self._as_tokens) ==
-                     len(set(x.upper() for x in self._as_tokens)))
         return self._enum_upper_tokenizable
 
     @property
@@ -2300,6 +2580,34 @@ def _binding_paths(bindings_dirs):
     return binding_paths
 
 
+def _file_stamp(path):
+    # Returns a (modification time, size) tuple for the file at 'path', or
+    # None if it can't be accessed. Used by BindingCache to detect changes.
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _cache_key():
+    # Returns the key saved with a BindingCache, which must match for the
+    # cache to be loaded. The hash of this file invalidates the cache for
+    # any changes to edtlib, as pickled Binding objects depend on its
+    # internals.
+
+    global _cache_key_val
+
+    if _cache_key_val is None:
+        with open(__file__, "rb") as f:
+            _cache_key_val = hashlib.sha256(f.read()).digest()
+    return _cache_key_val
+
+
+_cache_key_val = None
+
+
 def _binding_inc_error(msg):
     # Helper for reporting errors in the !include implementation
 
@@ -2998,6 +3306,11 @@ _LOG = logging.getLogger(__name__)
 # Regular expression for non-alphanumeric-or-underscore characters.
 _NOT_ALPHANUM_OR_UNDERSCORE = re.compile(r'\W', re.ASCII)
 
+# Node attributes that are computed on first access when an EDT is created
+# with lazy=True. See Node.__getattr__().
+# 'dep_ordinal' is also computed on demand, as part of the dependency graph.
+_LAZY_NODE_ATTRS = ("props", "regs", "ranges", "interrupts", "pinctrls")
+
 
 def str_as_token(val):
     """Return a canonical representation of a string as a C token.
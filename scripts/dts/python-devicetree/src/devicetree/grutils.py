@@ -68,6 +68,9 @@ class Graph:
         # based on dependencies.
 
         self.__stack = []
+        # Set of the nodes in self.__stack, for constant-time membership
+        # tests
+        self.__on_stack = set()
         self.__scc_order = []
         self.__index = 0
         self.__tarjan_index = {}
@@ -101,18 +104,20 @@ class Graph:
         self.__tarjan_index[v] = self.__tarjan_low_link[v] = self.__index
         self.__index += 1
         self.__stack.append(v)
+        self.__on_stack.add(v)
         source = v
         for target in sorted(self.__edge_map[source], key=node_key):
             if self.__tarjan_index[target] is None:
                 self._tarjan_root(target)
                 self.__tarjan_low_link[v] = min(self.__tarjan_low_link[v], self.__tarjan_low_link[target])
-            elif target in self.__stack:
+            elif target in self.__on_stack:
                 self.__tarjan_low_link[v] = min(self.__tarjan_low_link[v], self.__tarjan_low_link[target])
 
         if self.__tarjan_low_link[v] == self.__tarjan_index[v]:
             scc = []
             while True:
                 scc.append(self.__stack.pop())
+                self.__on_stack.remove(scc[-1])
                 if v == scc[-1]:
                     break
             self.__scc_order.append(scc)
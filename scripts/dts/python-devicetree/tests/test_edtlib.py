@@ -5,6 +5,7 @@ import contextlib
 import io
 from logging import WARNING
 import os
+import pickle
 from pathlib import Path
 
 import pytest
@@ -526,6 +527,180 @@ def test_multi_bindings():
     assert str(edt.get_node("/in-dir-2").binding_path) == \
         hpath("test-bindings-2/multidir.yaml")
 
+def test_binding_cache():
+    '''Test sharing bindings between EDT objects with a BindingCache'''
+    with from_here():
+        cache = edtlib.BindingCache()
+
+        edt = edtlib.EDT("test.dts", ["test-bindings"])
+        edt_cached_1 = edtlib.EDT("test.dts", ["test-bindings"],
+                                  binding_cache=cache)
+        edt_cached_2 = edtlib.EDT("test.dts", ["test-bindings"],
+                                  binding_cache=cache)
+        edt_multidir = edtlib.EDT("test-multidir.dts",
+                                  ["test-bindings", "test-bindings-2"],
+                                  binding_cache=cache)
+
+    # The cached EDT objects should be indistinguishable from the uncached
+    # one, also after a pickling round trip
+    def summary(edt):
+        return [(node.path, node.binding_path, node.dep_ordinal,
+                 str(node.props))
+                for node in edt.nodes]
+
+    assert summary(edt_cached_1) == summary(edt)
+    assert summary(edt_cached_2) == summary(edt)
+    assert summary(pickle.loads(pickle.dumps(edt_cached_2))) == summary(edt)
+
+    # Bindings should be shared between EDT objects with the same bindings
+    # directories
+    prop_1 = edt_cached_1.get_node("/test-deprecated").props["oldprop"]
+    prop_2 = edt_cached_2.get_node("/test-deprecated").props["oldprop"]
+    assert prop_1.spec.binding is prop_2.spec.binding
+
+    assert str(edt_multidir.get_node("/in-dir-2").binding_path) == \
+        hpath("test-bindings-2/multidir.yaml")
+
+def test_binding_cache_save_load(tmp_path):
+    '''Test saving and loading a BindingCache, and that stale bindings
+    are dropped when loading'''
+
+    bindings_dir = tmp_path / 'bindings'
+    bindings_dir.mkdir()
+    binding_file = bindings_dir / 'foo.yaml'
+    binding_file.write_text('''\
+description: foo
+compatible: "foo"
+properties:
+  prop:
+    type: int
+''')
+
+    dts_file = tmp_path / 'test.dts'
+    dts_file.write_text('''\
+/dts-v1/;
+/ {
+	foo {
+		compatible = "foo";
+		prop = <1>;
+	};
+};
+''')
+
+    cache_file = tmp_path / 'cache.pickle'
+    # Loading a missing cache gives an empty cache
+    cache = edtlib.BindingCache.load(cache_file)
+    edt = edtlib.EDT(dts_file, [bindings_dir], binding_cache=cache)
+    assert edt.get_node('/foo').props['prop'].spec.type == 'int'
+    cache.save(cache_file)
+
+    # An up-to-date cache is used without reading the binding file again
+    cache = edtlib.BindingCache.load(cache_file)
+    assert len(cache._key2binding) == 1
+    edt = edtlib.EDT(dts_file, [bindings_dir], binding_cache=cache)
+    assert edt.get_node('/foo').props['prop'].spec.type == 'int'
+
+    # A modified binding file invalidates the cache
+    binding_file.write_text('''\
+description: foo
+compatible: "foo"
+properties:
+  prop:
+    type: array
+''')
+    cache = edtlib.BindingCache.load(cache_file)
+    assert not cache._key2binding
+    edt = edtlib.EDT(dts_file, [bindings_dir], binding_cache=cache)
+    assert edt.get_node('/foo').props['prop'].spec.type == 'array'
+    cache.save(cache_file)
+
+    # So does a new binding file
+    (bindings_dir / 'bar.yaml').write_text('description: bar\n')
+    cache = edtlib.BindingCache.load(cache_file)
+    assert not cache._key2binding
+
+    # A cache saved by a different version of edtlib is thrown away
+    cache = edtlib.BindingCache()
+    edtlib.EDT(dts_file, [bindings_dir], binding_cache=cache)
+    cache.save(cache_file)
+    assert edtlib.BindingCache.load(cache_file)._key2binding
+    with open(cache_file, 'wb') as f:
+        pickle.dump(b'other version', f)
+        pickle.dump(cache, f)
+    assert not edtlib.BindingCache.load(cache_file)._key2binding
+
+    # A corrupt cache file gives an empty cache
+    cache_file.write_bytes(b'garbage')
+    assert not edtlib.BindingCache.load(cache_file)._key2binding
+
+def test_lazy(tmp_path):
+    '''Test EDT(lazy=True)'''
+    with from_here():
+        edt = edtlib.EDT("test.dts", ["test-bindings"])
+        lazy_edt = edtlib.EDT("test.dts", ["test-bindings"], lazy=True)
+
+    # Nothing has been computed for the nodes yet
+    lazy_node = lazy_edt.get_node("/interrupt-parent-test/node")
+    assert "props" not in vars(lazy_node)
+    assert "interrupts" not in vars(lazy_node)
+
+    # Lazily computed values are the same as eagerly computed ones
+    for node in edt.nodes:
+        lazy_node = lazy_edt.get_node(node.path)
+        for attr in ("props", "regs", "ranges", "interrupts", "pinctrls",
+                     "dep_ordinal", "depends_on", "required_by"):
+            assert str(getattr(lazy_node, attr)) == str(getattr(node, attr))
+    assert str(lazy_edt.scc_order) == str(edt.scc_order)
+    assert str(lazy_edt.dep_ord2node) == str(edt.dep_ord2node)
+
+    with pytest.raises(AttributeError):
+        lazy_node.no_such_attribute
+
+    # Errors in nodes are only reported when the affected attribute is
+    # accessed, or on validate()
+    dts_file = tmp_path / "error.dts"
+    dts_file.write_text("""
+/dts-v1/;
+
+/ {
+	#address-cells = <1>;
+	#size-cells = <2>;
+
+	sub {
+		reg = <3>;
+	};
+};
+""")
+    lazy_edt = edtlib.EDT(dts_file, [], lazy=True)
+    sub = lazy_edt.get_node("/sub")
+    with pytest.raises(edtlib.EDTError):
+        sub.regs
+    # The failed attribute is not left half-initialized
+    with pytest.raises(edtlib.EDTError):
+        sub.regs
+
+    with pytest.raises(edtlib.EDTError):
+        edtlib.EDT(dts_file, [], lazy=True).validate()
+
+    # Same for the dependency graph, which can't be built from a node
+    # with errors
+    dts_file.write_text("""
+/dts-v1/;
+
+/ {
+	sub {
+		interrupts = <3>;
+	};
+};
+""")
+    lazy_edt = edtlib.EDT(dts_file, [], lazy=True)
+    for _ in range(2):
+        with pytest.raises(edtlib.EDTError):
+            lazy_edt.scc_order
+    for _ in range(2):
+        with pytest.raises(edtlib.EDTError):
+            lazy_edt.dep_ord2node
+
 def test_dependencies():
     ''''Test dependency relations'''
     with from_here():
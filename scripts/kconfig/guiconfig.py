@@ -86,6 +86,7 @@ from kconfiglib import Symbol, Choice, MENU, COMMENT, MenuNode, \
                        standard_sc_expr_str, \
                        TRI_TO_STR, TYPE_TO_STR, \
                        standard_kconfig, standard_config_filename
+from kconfigsearch import SearchIndex
 
 
 # If True, use GIF image data embedded in this file instead of separate GIF
@@ -1859,12 +1860,7 @@ def _update_jump_to_matches(msglabel, search_string):
     _jump_to_tree.selection_set(())
 
     try:
-        # We could use re.IGNORECASE here instead of lower(), but this is
-        # faster for regexes like '.*debug$' (though the '.*' is redundant
-        # there). Those probably have bad interactions with re.search(), which
-        # matches anywhere in the string.
-        regex_searches = [re.compile(regex).search
-                          for regex in search_string.lower().split()]
+        _jump_to_matches = _search_index().search(search_string)
     except re.error as e:
         msg = "Bad regular expression"
         # re.error.msg was added in Python 3.5
@@ -1875,39 +1871,6 @@ def _update_jump_to_matches(msglabel, search_string):
         _jump_to_tree.set_children("")
         return
 
-    _jump_to_matches = []
-    add_match = _jump_to_matches.append
-
-    for node in _sorted_sc_nodes():
-        # Symbol/choice
-        sc = node.item
-
-        for search in regex_searches:
-            # Both the name and the prompt might be missing, since
-            # we're searching both symbols and choices
-
-            # Does the regex match either the symbol name or the
-            # prompt (if any)?
-            if not (sc.name and search(sc.name.lower()) or
-                    node.prompt and search(node.prompt[0].lower())):
-
-                # Give up on the first regex that doesn't match, to
-                # speed things up a bit when multiple regexes are
-                # entered
-                break
-
-        else:
-            add_match(node)
-
-    # Search menus and comments
-
-    for node in _sorted_menu_comment_nodes():
-        for search in regex_searches:
-            if not search(node.prompt[0].lower()):
-                break
-        else:
-            add_match(node)
-
     msglabel["text"] = "" if _jump_to_matches else "No matches"
 
     _update_jump_to_display()
@@ -1948,44 +1911,16 @@ def _jump_to(node):
     _select(_tree, id(node))
 
 
-# Obscure Python: We never pass a value for cached_nodes, and it keeps pointing
+# Obscure Python: We never pass a value for cached_index, and it keeps pointing
 # to the same list. This avoids a global.
-def _sorted_sc_nodes(cached_nodes=[]):
-    # Returns a sorted list of symbol and choice nodes to search. The symbol
-    # nodes appear first, sorted by name, and then the choice nodes, sorted by
-    # prompt and (secondarily) name.
-
-    if not cached_nodes:
-        # Add symbol nodes
-        for sym in sorted(_kconf.unique_defined_syms,
-                          key=lambda sym: sym.name):
-            # += is in-place for lists
-            cached_nodes += sym.nodes
-
-        # Add choice nodes
-
-        choices = sorted(_kconf.unique_choices,
-                         key=lambda choice: choice.name or "")
-
-        cached_nodes += sorted(
-            [node for choice in choices for node in choice.nodes],
-            key=lambda node: node.prompt[0] if node.prompt else "")
-
-    return cached_nodes
-
-
-def _sorted_menu_comment_nodes(cached_nodes=[]):
-    # Returns a list of menu and comment nodes to search, sorted by prompt,
-    # with the menus first
-
-    if not cached_nodes:
-        def prompt_text(mc):
-            return mc.prompt[0]
+def _search_index(cached_index=[]):
+    # Returns the SearchIndex used by the jump-to dialog, creating it the first
+    # time
 
-        cached_nodes += sorted(_kconf.menus, key=prompt_text)
-        cached_nodes += sorted(_kconf.comments, key=prompt_text)
+    if not cached_index:
+        cached_index.append(SearchIndex(_kconf))
 
-    return cached_nodes
+    return cached_index[0]
 
 
 def _load_parents(node):
@@ -10,6 +10,7 @@
 # Also does various checks (most via Kconfiglib warnings).
 
 import argparse
+import json
 import os
 import sys
 import textwrap
@@ -28,7 +29,8 @@ def main():
 
     print("Parsing " + args.kconfig_file)
     kconf = Kconfig(args.kconfig_file, warn_to_stderr=False,
-                    suppress_traceback=True)
+                    suppress_traceback=True, cache_file=args.kconfig_cache,
+                    prefetch=args.kconfig_prefetch)
 
     if args.handwritten_input_configs:
         # Warn for assignments to undefined symbols, but only for handwritten
@@ -68,13 +70,15 @@ def main():
     if kconf.syms['WARN_EXPERIMENTAL'].tri_value == 2:
         check_experimental(kconf)
 
-    # Hack: Force all symbols to be evaluated, to catch warnings generated
-    # during evaluation. Wait till the end to write the actual output files, so
-    # that we don't generate any output if there are warnings-turned-errors.
+    # Compare the symbol values against the configuration from the previous
+    # run, before it gets overwritten. This evaluates all symbols, which also
+    # catches warnings generated during evaluation. Wait till the end to write
+    # the actual output files, so that we don't generate any output if there
+    # are warnings-turned-errors.
     #
-    # Kconfiglib caches calculated symbol values internally, so this is still
-    # fast.
-    kconf.write_config(os.devnull)
+    # Kconfiglib caches calculated symbol values internally, so the symbols
+    # aren't evaluated again when writing the output files.
+    diff = kconf.config_diff(args.config_out)
 
     if kconf.warnings:
         # Put a blank line between warnings to make them easier to read
@@ -89,13 +93,17 @@ def main():
         # warning for now.
         err("Aborting due to Kconfig warnings")
 
-    # Write the merged configuration and the C header
+    # Write the merged configuration and the C header. They are only written
+    # if they have changed, so that nothing gets rebuilt needlessly.
     print(kconf.write_config(args.config_out))
     print(kconf.write_autoconf(args.header_out))
 
     # Write the list of parsed Kconfig files to a file
     write_kconfig_filenames(kconf, args.kconfig_list_out)
 
+    if args.config_diff_out:
+        write_config_diff(kconf, diff, args.config_diff_out)
+
 
 def check_no_promptless_assign(kconf):
     # Checks that no promptless symbols are assigned
@@ -243,10 +251,37 @@ def write_kconfig_filenames(kconf, kconfig_list_path):
     # removed. This file is used by CMake to look for changed Kconfig files. It
     # needs to be deterministic.
 
-    with open(kconfig_list_path, 'w') as out:
-        for path in sorted({os.path.realpath(os.path.join(kconf.srctree, path))
-                            for path in kconf.kconfig_filenames}):
-            print(path, file=out)
+    write_if_changed(kconfig_list_path,
+                     "".join(path + "\n" for path in sorted(
+                         {os.path.realpath(os.path.join(kconf.srctree, path))
+                          for path in kconf.kconfig_filenames})))
+
+
+def write_config_diff(kconf, diff, diff_path):
+    # Writes the changes in symbol values compared to the previous run, as
+    # returned by Kconfig.config_diff(), to 'diff_path' as JSON. Symbols that
+    # got no value (e.g. n bool symbols) have null values.
+
+    write_if_changed(diff_path, json.dumps(
+        [{"name": kconf.config_prefix + name, "old": old_val, "new": new_val}
+         for name, old_val, new_val in diff],
+        indent=2) + "\n")
+
+
+def write_if_changed(path, contents):
+    # Writes 'contents' to 'path', unless 'path' already has that contents.
+    # This leaves the modification time alone for unchanged files, which
+    # avoids triggering CMake reruns and rebuilds.
+
+    try:
+        with open(path) as f:
+            if f.read() == contents:
+                return
+    except OSError:
+        pass
+
+    with open(path, 'w') as f:
+        f.write(contents)
 
 
 def parse_args():
@@ -260,6 +295,19 @@ def parse_args():
                              "assigned")
     parser.add_argument("--zephyr-base",
                         help="Path to current Zephyr installation")
+    parser.add_argument("--kconfig-cache",
+                        help="Cache file for the parsed Kconfig tree. The "
+                             "Kconfig files are only parsed if the cache is "
+                             "missing or out of date.")
+    parser.add_argument("--config-diff-out",
+                        help="Write the symbols whose values changed compared "
+                             "to the previous contents of CONFIG_OUT to this "
+                             "file, as JSON")
+    parser.add_argument("--kconfig-prefetch",
+                        action="store_true",
+                        help="Read Kconfig files ahead of the parser with "
+                             "multiple threads. Helps on slow (e.g. network) "
+                             "filesystems.")
     parser.add_argument("kconfig_file",
                         help="Top-level Kconfig file")
     parser.add_argument("config_out",
@@ -507,6 +507,20 @@ Functions can access the current parsing location as kconf.filename/linenr.
 Accessing other fields of the Kconfig object is not safe. See the warning
 below.
 
+While parsing, the result of a function call is reused for later calls to the
+same function with the same arguments, instead of calling the function again.
+Functions whose result can change between such calls, e.g. because they have
+side effects or use the parsing location, need to be listed by name in an
+optional global 'impure_functions' collection in the module:
+
+  impure_functions = {"my-other-fn"}
+
+$(shell) results are reused in the same way, as commands in Kconfig files are
+expected to give the same output when run repeatedly during a parse (adding
+"shell" to 'impure_functions' turns this off). The predefined $(info),
+$(warning-if), $(error-if), $(filename), and $(lineno) functions are never
+reused.
+
 Keep in mind that for a variable defined like 'foo = $(fn)', 'fn' will be
 called only when 'foo' is expanded. If 'fn' uses the parsing location and the
 intent is to use the location of the assignment, you want 'foo := $(fn)'
@@ -544,13 +558,17 @@ Send bug reports, suggestions, and questions to ulfalizer a.t Google's email
 service, or open a ticket on the GitHub page.
 """
 import errno
+import gc
+import hashlib
 import importlib
 import os
+import pickle
 import re
 import sys
 
 # Get rid of some attribute lookups. These are obvious in context.
 from glob import iglob
+from io import StringIO
 from os.path import dirname, exists, expandvars, islink, join, realpath
 
 
@@ -764,6 +782,35 @@ class Kconfig(object):
       will get added to Kconfig.warnings. See the various Kconfig.warn*
       variables.
 
+    evaluation_count:
+      The number of times the value of a symbol or the selection of a choice
+      has been calculated. Values are cached, and only recalculated after
+      being invalidated by changes to values they (possibly) depend on.
+
+      This and 'invalidation_count' can be used to see how much work some
+      operation does, e.g. a Symbol.set_value() followed by write_config().
+      They can be reset to 0 as needed.
+
+    invalidation_count:
+      The number of times the cached values of a symbol or choice have been
+      invalidated. See 'evaluation_count'.
+
+    expansion_count:
+      The number of preprocessor variable references and function calls
+      ($(foo), $(foo,arg)) expanded while parsing.
+
+    function_call_count:
+      The number of times a preprocessor function (e.g. $(shell) or a
+      user-defined function) has actually been called. Results are reused
+      for calls with the same arguments during parsing, which are not
+      counted here. See the module docstring.
+
+      When the Kconfig tree is loaded from a cache, this counts the calls
+      made to check that the cache is still valid.
+
+    shell_count:
+      The number of commands run via $(shell). See 'function_call_count'.
+
     missing_syms:
       A list with (name, value) tuples for all assignments to undefined symbols
       within the most recently loaded .config file(s). 'name' is the symbol
@@ -811,8 +858,11 @@ class Kconfig(object):
       See the module docstring.
     """
     __slots__ = (
+        "_cache_inputs",
         "_encoding",
+        "_fn_cache",
         "_functions",
+        "_impure_fns",
         "_set_match",
         "_srctree_prefix",
         "_unset_match",
@@ -825,7 +875,11 @@ class Kconfig(object):
         "defconfig_list",
         "defined_syms",
         "env_vars",
+        "evaluation_count",
+        "expansion_count",
+        "function_call_count",
         "header_header",
+        "invalidation_count",
         "kconfig_filenames",
         "m",
         "menus",
@@ -833,6 +887,7 @@ class Kconfig(object):
         "modules",
         "n",
         "named_choices",
+        "shell_count",
         "srctree",
         "syms",
         "top_node",
@@ -849,6 +904,7 @@ class Kconfig(object):
 
         # Parsing-related
         "_parsing_kconfigs",
+        "_prefetcher",
         "_readline",
         "filename",
         "linenr",
@@ -865,7 +921,8 @@ class Kconfig(object):
     #
 
     def __init__(self, filename="Kconfig", warn=True, warn_to_stderr=True,
-                 encoding="utf-8", suppress_traceback=False):
+                 encoding="utf-8", suppress_traceback=False, cache_file=None,
+                 prefetch=False):
         """
         Creates a new Kconfig object by parsing Kconfig files.
         Note that Kconfig files are not the same as .config files (which store
@@ -942,9 +999,62 @@ class Kconfig(object):
 
           Other exceptions besides EnvironmentError and KconfigError are still
           propagated when suppress_traceback is True.
+
+        cache_file (default: None):
+          Path to a file for caching the parsed Kconfig tree, or None to always
+          parse the Kconfig files.
+
+          If 'cache_file' holds a cache that is still valid, the menu tree,
+          symbols, and choices are loaded from it instead of parsing the
+          Kconfig files. Otherwise, the Kconfig files are parsed and the result
+          is written to 'cache_file'. Errors writing the cache are ignored.
+
+          The cache is valid if the same 'filename', 'warn', and 'encoding'
+          arguments are used, if none of the Kconfig files (see
+          Kconfig.kconfig_filenames) have changed contents, if 'source' globs
+          match the same files, if all environment variables referenced during
+          parsing have the same values, and if all $(shell) and user-defined
+          preprocessor function calls return the same values. The functions
+          are called again to check the last part.
+
+          Warnings generated during parsing are stored in the cache, and
+          printed again if 'warn_to_stderr' is True. Output from $(info) is not
+          repeated.
+
+          This requires Python 3.8 or later.
+
+        prefetch (default: False):
+          If True, Kconfig files are read ahead of the parser by a pool of
+          threads, which follow the 'source' statements in the files they
+          read. The parsing itself is still done in order, so the result is
+          the same. This helps when reading files is slow, e.g. on network
+          filesystems with a cold cache.
+
+          'source' statements that reference preprocessor variables or
+          functions (as opposed to environment variables) can't be followed
+          ahead of time. Such files are read when the parser gets to them.
+
+          This requires Python 3.
         """
+        if sys.version_info < (3, 8):
+            # The cache needs Pickler.reducer_override()
+            cache_file = None
+
+        if _IS_PY2:
+            # The prefetcher needs concurrent.futures
+            prefetch = False
+
         try:
-            self._init(filename, warn, warn_to_stderr, encoding)
+            if cache_file is None or \
+               not self._load_cache(cache_file, filename, warn, warn_to_stderr,
+                                    encoding):
+                # Only record the inputs to parsing when they're needed for
+                # the cache
+                self._cache_inputs = None if cache_file is None else {}
+                self._init(filename, warn, warn_to_stderr, encoding,
+                           prefetch)
+                if cache_file is not None:
+                    self._write_cache(cache_file, filename, warn, encoding)
         except (EnvironmentError, KconfigError) as e:
             if suppress_traceback:
                 cmd = sys.argv[0]  # Empty string if missing
@@ -956,7 +1066,7 @@ class Kconfig(object):
                 sys.exit(cmd + str(e).strip())
             raise
 
-    def _init(self, filename, warn, warn_to_stderr, encoding):
+    def _init(self, filename, warn, warn_to_stderr, encoding, prefetch):
         # See __init__()
 
         self._encoding = encoding
@@ -976,6 +1086,9 @@ class Kconfig(object):
 
         self.warnings = []
 
+        self.evaluation_count = self.invalidation_count = 0
+        self.expansion_count = self.function_call_count = self.shell_count = 0
+
         self.config_prefix = os.getenv("CONFIG_", "CONFIG_")
         # Regular expressions for parsing .config files
         self._set_match = _re_match(self.config_prefix + r"([^=]+)=(.*)")
@@ -1016,24 +1129,7 @@ class Kconfig(object):
         # Maps preprocessor variables names to Variable instances
         self.variables = {}
 
-        # Predefined preprocessor functions, with min/max number of arguments
-        self._functions = {
-            "info":       (_info_fn,       1, 1),
-            "error-if":   (_error_if_fn,   2, 2),
-            "filename":   (_filename_fn,   0, 0),
-            "lineno":     (_lineno_fn,     0, 0),
-            "shell":      (_shell_fn,      1, 1),
-            "warning-if": (_warning_if_fn, 2, 2),
-        }
-
-        # Add any user-defined preprocessor functions
-        try:
-            self._functions.update(
-                importlib.import_module(
-                    os.getenv("KCONFIG_FUNCTIONS", "kconfigfunctions")
-                ).functions)
-        except ImportError:
-            pass
+        self._init_functions()
 
         # This determines whether previously unseen symbols are registered.
         # They shouldn't be if we parse expressions after parsing, as part of
@@ -1075,18 +1171,28 @@ class Kconfig(object):
         # unget operation.
         self._reuse_tokens = False
 
-        # Open the top-level Kconfig file. Store the readline() method directly
-        # as a small optimization.
-        self._readline = self._open(join(self.srctree, filename), "r").readline
+        self._prefetcher = _KconfigPrefetcher(self._srctree_prefix, encoding) \
+            if prefetch else None
 
         try:
-            # Parse the Kconfig files. Returns the last node, which we
-            # terminate with '.next = None'.
-            self._parse_block(None, self.top_node, self.top_node).next = None
-            self.top_node.list = self.top_node.next
-            self.top_node.next = None
-        except UnicodeDecodeError as e:
-            _decoding_error(e, self.filename)
+            # Open the top-level Kconfig file. Store the readline() method
+            # directly as a small optimization.
+            self._readline = \
+                self._open_kconfig(join(self.srctree, filename)).readline
+
+            try:
+                # Parse the Kconfig files. Returns the last node, which we
+                # terminate with '.next = None'.
+                self._parse_block(None, self.top_node, self.top_node).next = \
+                    None
+                self.top_node.list = self.top_node.next
+                self.top_node.next = None
+            except UnicodeDecodeError as e:
+                _decoding_error(e, self.filename)
+        finally:
+            if self._prefetcher:
+                self._prefetcher.shutdown()
+                self._prefetcher = None
 
         # Close the top-level Kconfig file. __self__ fetches the 'file' object
         # for the method.
@@ -1123,6 +1229,38 @@ class Kconfig(object):
         # awkward during dependency loop detection
         self._add_choice_deps()
 
+    def _init_functions(self):
+        # Sets up self._functions. Also used when loading the Kconfig tree from
+        # a cache, to call the functions while checking the cache.
+
+        # Predefined preprocessor functions, with min/max number of arguments
+        self._functions = {
+            "info":       (_info_fn,       1, 1),
+            "error-if":   (_error_if_fn,   2, 2),
+            "filename":   (_filename_fn,   0, 0),
+            "lineno":     (_lineno_fn,     0, 0),
+            "shell":      (_shell_fn,      1, 1),
+            "warning-if": (_warning_if_fn, 2, 2),
+        }
+
+        # Names of functions whose results can't be reused for later calls
+        # with the same arguments. See _fn_val().
+        self._impure_fns = set(_IMPURE_FN_NAMES)
+
+        # Results of calls to other functions while parsing, indexed by the
+        # function name and arguments
+        self._fn_cache = {}
+
+        # Add any user-defined preprocessor functions
+        try:
+            module = importlib.import_module(
+                os.getenv("KCONFIG_FUNCTIONS", "kconfigfunctions"))
+        except ImportError:
+            pass
+        else:
+            self._functions.update(module.functions)
+            self._impure_fns.update(getattr(module, "impure_functions", ()))
+
     @property
     def mainmenu_text(self):
         """
@@ -1793,8 +1931,73 @@ class Kconfig(object):
         if not exists(path):
             os.mkdir(path, 0o755)
 
-        # Load old values from auto.conf, if any
-        self._load_old_vals(path)
+        # Load old values from auto.conf, if any, and flag symbols that no
+        # longer exist, in case something still depends on them
+        for name in self._load_old_vals(join(path, "auto.conf")):
+            _touch_dep_file(path, name)
+
+        for sym in self._changed_syms():
+            # 'sym' has a new value. Flag it.
+            _touch_dep_file(path, sym.name)
+
+        # Remember the current values as the "new old" values.
+        #
+        # This call could go anywhere after the call to _load_old_vals(), but
+        # putting it last means _sync_deps() can be safely rerun if it fails
+        # before this point.
+        self._write_old_vals(path)
+
+    def config_diff(self, filename):
+        """
+        Compares the current symbol values against the symbol values in the
+        configuration file 'filename', which would usually be a configuration
+        file written by write_config() (or an auto.conf written by
+        sync_deps()) in an earlier run. This can be used to find out what
+        changed before writing out the new configuration.
+
+        Only changes that affect the output of write_autoconf() are reported,
+        using the same logic as sync_deps(). A symbol that is missing from
+        'filename' is treated as having the value n (or no value, for
+        non-bool/tristate symbols).
+
+        All symbols are evaluated, so this also generates any warnings related
+        to symbol values.
+
+        See the Kconfig.__init__() docstring for raised exceptions
+        (OSError/IOError). A missing 'filename' is not an error, and gives
+        the same result as an empty file.
+
+        filename:
+          Path to the old configuration file.
+
+        Returns a list of (name, old value, new value) tuples, one for each
+        changed symbol, in the order used by write_autoconf(). Symbol names do
+        not include the Kconfig.config_prefix prefix. Values are strings, as
+        with Symbol.str_value, with None meaning that the symbol is not
+        written to the header (e.g. because it has the value n or unmet
+        dependencies). Symbols that appear in 'filename' but no longer exist
+        come last, with their old value as it appears in 'filename', and None
+        as the new value.
+        """
+        removed = self._load_old_vals(filename)
+
+        diff = []
+        for sym in self._changed_syms():
+            new_val = sym.str_value
+            if not sym._write_to_conf or \
+               (sym.orig_type in _BOOL_TRISTATE and new_val == "n"):
+                new_val = None
+            diff.append((sym.name, sym._old_val, new_val))
+
+        for name, old_val in removed:
+            diff.append((name, old_val, None))
+
+        return diff
+
+    def _changed_syms(self):
+        # Generates the symbols whose current value would give a different
+        # line in autoconf.h compared to the old value in Symbol._old_val (see
+        # _load_old_vals()). Helper for sync_deps() and config_diff().
 
         for sym in self.unique_defined_syms:
             # _write_to_conf is determined when the value is calculated. This
@@ -1827,19 +2030,15 @@ class Kconfig(object):
                 # auto.conf). No change.
                 continue
 
-            # 'sym' has a new value. Flag it.
-            _touch_dep_file(path, sym.name)
+            yield sym
 
-        # Remember the current values as the "new old" values.
+    def _load_old_vals(self, filename):
+        # Loads old symbol values from the configuration file 'filename'
+        # (e.g. auto.conf) into a dedicated Symbol._old_val field. Mirrors
+        # load_config(). Only CONFIG_FOO=... assignments are looked at.
         #
-        # This call could go anywhere after the call to _load_old_vals(), but
-        # putting it last means _sync_deps() can be safely rerun if it fails
-        # before this point.
-        self._write_old_vals(path)
-
-    def _load_old_vals(self, path):
-        # Loads old symbol values from auto.conf into a dedicated
-        # Symbol._old_val field. Mirrors load_config().
+        # Returns a list of (name, value) tuples for assignments to symbols
+        # that no longer exist.
         #
         # The extra field could be avoided with some trickery involving dumping
         # symbol values and restoring them later, but this is simpler and
@@ -1848,12 +2047,14 @@ class Kconfig(object):
         for sym in self.unique_defined_syms:
             sym._old_val = None
 
+        removed = []
+
         try:
-            auto_conf = self._open(join(path, "auto.conf"), "r")
+            auto_conf = self._open(filename, "r")
         except EnvironmentError as e:
             if e.errno == errno.ENOENT:
                 # No old values
-                return
+                return removed
             raise
 
         with auto_conf as f:
@@ -1876,9 +2077,9 @@ class Kconfig(object):
 
                     self.syms[name]._old_val = val
                 else:
-                    # Flag that the symbol no longer exists, in
-                    # case something still depends on it
-                    _touch_dep_file(path, name)
+                    removed.append((name, val))
+
+        return removed
 
     def _write_old_vals(self, path):
         # Helper for writing auto.conf. Basically just a simplified
@@ -2004,6 +2205,110 @@ class Kconfig(object):
         finally:
             self._warn_assign_no_prompt = True
 
+    def snapshot(self):
+        """
+        Returns a snapshot of the current symbol and choice values, which can
+        be passed to Kconfig.restore() later to go back to them. This makes it
+        possible to evaluate many configurations with a single parsed Kconfig
+        tree.
+
+        The snapshot includes user values as well as the calculated values
+        cached within symbols and choices, so that values don't have to be
+        recalculated after a restore. Kconfig.missing_syms and
+        Kconfig.warnings are included as well.
+
+        The snapshot is only valid for this Kconfig instance. It should be
+        treated as an opaque object.
+        """
+        return (
+            [(sym.user_value, sym._cached_str_val, sym._cached_tri_val,
+              sym._cached_vis, sym._cached_assignable, sym._write_to_conf)
+             for sym in self.unique_defined_syms],
+            [(choice.user_value, choice.user_selection, choice._cached_vis,
+              choice._cached_assignable, choice._cached_selection)
+             for choice in self.unique_choices],
+            self.missing_syms[:],
+            self.warnings[:])
+
+    def restore(self, snapshot):
+        """
+        Restores symbol and choice values from a snapshot returned by
+        Kconfig.snapshot().
+
+        This is much cheaper than calling Kconfig.unset_values() and setting
+        the values again, as it doesn't invalidate and recalculate any values.
+        It's a single pass over all symbols and choices.
+        """
+        sym_states, choice_states, missing_syms, warnings = snapshot
+
+        for sym, state in zip(self.unique_defined_syms, sym_states):
+            sym.user_value, sym._cached_str_val, sym._cached_tri_val, \
+            sym._cached_vis, sym._cached_assignable, sym._write_to_conf = \
+                state
+
+        for choice, state in zip(self.unique_choices, choice_states):
+            choice.user_value, choice.user_selection, choice._cached_vis, \
+            choice._cached_assignable, choice._cached_selection = state
+
+        self.missing_syms = missing_syms[:]
+        self.warnings = warnings[:]
+
+    def evaluate_configs(self, fn, args, jobs=1):
+        """
+        Calls fn(kconf, arg) for each 'arg' in 'args', each time starting from
+        the symbol values this Kconfig instance has when evaluate_configs() is
+        called, and returns a list with the return values, in order. The
+        values are restored afterwards as well.
+
+        This makes it cheap to evaluate many configurations with a single
+        parsed Kconfig tree. For example, 'fn' might call
+        Kconfig.load_config() with 'arg' and return some symbol values. See
+        Kconfig.snapshot() and Kconfig.restore().
+
+        fn:
+          Function to call for each configuration. It can modify symbol
+          values freely.
+
+        args:
+          Iterable with the arguments to pass to 'fn'.
+
+        jobs (default: 1):
+          Number of processes to evaluate configurations in. The processes
+          are forked from the current process, so the parsed Kconfig tree and
+          'fn' are shared without pickling them, but the return values of
+          'fn' need to be picklable. If None, the number of CPUs is used.
+
+          On systems without fork() (e.g. Windows), the configurations are
+          always evaluated in the current process.
+        """
+        # Only import as needed, to save some startup time
+        import multiprocessing
+
+        args = list(args)
+        snapshot = self.snapshot()
+
+        if jobs is None:
+            jobs = multiprocessing.cpu_count()
+        jobs = min(jobs, len(args))
+
+        if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # The arguments to the initializer are inherited by the forked
+            # processes rather than pickled
+            with multiprocessing.get_context("fork").Pool(
+                    jobs, _init_evaluate_configs_worker,
+                    (self, fn, args, snapshot)) as pool:
+                return pool.map(_evaluate_config, range(len(args)))
+
+        res = []
+        try:
+            for arg in args:
+                self.restore(snapshot)
+                res.append(fn(self, arg))
+        finally:
+            self.restore(snapshot)
+
+        return res
+
     def enable_warnings(self):
         """
         Do 'Kconfig.warn = True' instead. Maintained for backwards
@@ -2185,7 +2490,7 @@ class Kconfig(object):
                                       for name, linenr in self._include_path)))
 
         try:
-            self._readline = self._open(filename, "r").readline
+            self._readline = self._open_kconfig(filename).readline
         except EnvironmentError as e:
             # We already know that the file exists
             raise _KconfigIOError(
@@ -2449,6 +2754,12 @@ class Kconfig(object):
                         # Slow path
                         s, end_i = self._expand_str(s, i)
 
+                        if self._cache_inputs is not None:
+                            for var in _old_env_var_findall(s, i + 1,
+                                                            end_i - 1):
+                                self._cache_inputs[("env", var)] = \
+                                    os.environ.get(var)
+
                         # os.path.expandvars() and the $UNAME_RELEASE replace()
                         # is a backwards compatibility hack, which should be
                         # reasonably safe as expandvars() leaves references to
@@ -2807,6 +3118,8 @@ class Kconfig(object):
 
         fn = args[0]
 
+        self.expansion_count += 1
+
         if fn in self.variables:
             var = self.variables[fn]
 
@@ -2846,9 +3159,31 @@ class Kconfig(object):
                                    .format(self.filename, self.linenr, fn,
                                            expected_args, len(args) - 1))
 
-            return py_fn(self, *args)
+            # While parsing, reuse the result from an earlier call with the
+            # same arguments, unless the function is impure (e.g. $(info) or
+            # $(lineno)). Kconfig files often call the same functions with the
+            # same arguments many times.
+            key = tuple(args)
+            memoize = self._parsing_kconfigs and fn not in self._impure_fns
+            if memoize and key in self._fn_cache:
+                return self._fn_cache[key]
+
+            self.function_call_count += 1
+            res = py_fn(self, *args)
+
+            if memoize:
+                self._fn_cache[key] = res
+
+            if self._cache_inputs is not None and self._parsing_kconfigs and \
+               py_fn not in _FILE_DETERMINED_FNS:
+                self._cache_inputs[("call", key)] = res
+
+            return res
 
         # Environment variables are tried last
+        if self._cache_inputs is not None and self._parsing_kconfigs:
+            self._cache_inputs[("env", fn)] = os.environ.get(fn)
+
         if fn in os.environ:
             self.env_vars.add(fn)
             return os.environ[fn]
@@ -2970,7 +3305,15 @@ class Kconfig(object):
                 # - Sort the glob results to ensure a consistent ordering of
                 #   Kconfig symbols, which indirectly ensures a consistent
                 #   ordering in e.g. .config files
-                filenames = sorted(iglob(join(self._srctree_prefix, pattern)))
+                filenames = \
+                    self._prefetcher.glob(join(self._srctree_prefix, pattern)) \
+                    if self._prefetcher else \
+                    sorted(iglob(join(self._srctree_prefix, pattern)))
+
+                if self._cache_inputs is not None:
+                    self._cache_inputs[
+                        ("glob", join(self._srctree_prefix, pattern))] = \
+                        filenames
 
                 if not filenames and t0 in _OBL_SOURCE_TOKENS:
                     raise KconfigError(
@@ -3205,6 +3548,10 @@ class Kconfig(object):
                     env_var = self._expect_str_and_eol()
                     node.item.env_var = env_var
 
+                    if self._cache_inputs is not None:
+                        self._cache_inputs[("env", env_var)] = \
+                            os.environ.get(env_var)
+
                     if env_var in os.environ:
                         node.defaults.append(
                             (self._lookup_const_sym(os.environ[env_var]),
@@ -3718,6 +4065,146 @@ class Kconfig(object):
                 target.weak_rev_dep,
                 self._make_and(sym, cond))
 
+    #
+    # Kconfig tree cache
+    #
+
+    def _load_cache(self, cache_file, filename, warn, warn_to_stderr,
+                    encoding):
+        # Loads the Kconfig tree from 'cache_file'. Returns True if successful,
+        # and False if the cache is missing or not valid, in which case the
+        # Kconfig files need to be parsed. See Kconfig.__init__().
+
+        try:
+            f = open(cache_file, "rb")
+        except EnvironmentError:
+            return False
+
+        with f:
+            try:
+                unpickler = pickle.Unpickler(f)
+
+                if unpickler.load() != _cache_key(filename, warn, encoding):
+                    return False
+
+                # Set up what's needed to call preprocessor functions when
+                # checking the cache
+                self._encoding = encoding
+                self._cache_inputs = None
+                self.filename = filename
+                self.linenr = 0
+                self.warn = False
+                self.warnings = []
+                self.expansion_count = self.function_call_count = \
+                    self.shell_count = 0
+                self._init_functions()
+
+                if not self._cache_inputs_valid(unpickler.load()):
+                    return False
+
+                # Unpickling creates lots of objects that all stay alive, so
+                # the garbage collector just wastes time here (it triples the
+                # loading time)
+                gc_was_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    self._load_cache_objects(unpickler)
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+
+            except Exception:
+                # Treat any error as an invalid cache. The cache is just an
+                # optimization, and errors will be reported properly when the
+                # Kconfig files are parsed instead.
+                return False
+
+        self.warn = warn
+        self.warn_to_stderr = warn_to_stderr
+        if warn_to_stderr:
+            for msg in self.warnings:
+                sys.stderr.write(msg + "\n")
+
+        return True
+
+    def _load_cache_objects(self, unpickler):
+        # Helper for loading the Kconfig instance state and all symbols,
+        # choices, menu nodes, and variables from the cache. See _CachePickler.
+
+        for name, val in unpickler.load().items():
+            setattr(self, name, val)
+
+        while True:
+            obj_states = unpickler.load()
+            if obj_states is None:
+                break
+
+            for obj, state in obj_states:
+                for name, val in state:
+                    setattr(obj, name, val)
+                obj.kconfig = self
+
+    def _cache_inputs_valid(self, inputs):
+        # Returns True if all the inputs to parsing recorded in 'inputs' (see
+        # _write_cache()) still give the same values
+
+        for (kind, key), val in inputs:
+            if kind == "env":
+                if os.environ.get(key) != val:
+                    return False
+
+            elif kind == "glob":
+                if sorted(iglob(key)) != val:
+                    return False
+
+            elif kind == "file":
+                if _file_hash(key) != val:
+                    return False
+
+            else:  # kind == "call"
+                if key[0] not in self._functions:
+                    return False
+
+                self.function_call_count += 1
+                if self._functions[key[0]][0](self, *key) != val:
+                    return False
+
+        return True
+
+    def _write_cache(self, cache_file, filename, warn, encoding):
+        # Writes the parsed Kconfig tree to 'cache_file', together with the
+        # inputs to parsing that _load_cache() checks
+
+        inputs = self._cache_inputs
+        self._cache_inputs = None
+
+        for var in _CACHE_ENV_VARS:
+            inputs[("env", var)] = os.environ.get(var)
+
+        for path in self.kconfig_filenames:
+            path = join(self.srctree, path)
+            inputs[("file", path)] = _file_hash(path)
+
+        state = {name: getattr(self, name) for name in self.__slots__
+                 if name not in _CACHE_SKIP_SLOTS and hasattr(self, name)}
+
+        # Write to a temporary file first, so that a partially written cache
+        # is never loaded
+        tmp_file = cache_file + ".tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                pickler = _CachePickler(f)
+                pickler.dump(_cache_key(filename, warn, encoding))
+                # Check the cheap inputs first
+                pickler.dump(sorted(
+                    inputs.items(),
+                    key=lambda item: _CACHE_INPUT_KINDS.index(item[0][0])))
+                pickler.dump(state)
+                pickler.dump_objects()
+            os.replace(tmp_file, cache_file)
+        except EnvironmentError:
+            pass
+
     #
     # Misc.
     #
@@ -3920,6 +4407,19 @@ class Kconfig(object):
         return open(filename, "rU" if mode == "r" else mode) if _IS_PY2 else \
                open(filename, mode, encoding=self._encoding)
 
+    def _open_kconfig(self, filename):
+        # Opens the Kconfig file 'filename' for parsing. Uses the contents
+        # read by the prefetcher if prefetching is enabled and the file could
+        # be read. Otherwise, the file is opened as usual, which also gives
+        # the usual errors.
+
+        if self._prefetcher:
+            contents = self._prefetcher.read(filename)
+            if contents is not None:
+                return StringIO(contents)
+
+        return self._open(filename, "r")
+
     def _check_undef_syms(self):
         # Prints warnings for all references to undefined symbols within the
         # Kconfig files
@@ -4302,6 +4802,8 @@ class Symbol(object):
             self._cached_str_val = self.name
             return self.name
 
+        self.kconfig.evaluation_count += 1
+
         val = ""
         # Warning: See Symbol._rec_invalidate(), and note that this is a hidden
         # function call (property magic)
@@ -4442,6 +4944,8 @@ class Symbol(object):
             self._cached_tri_val = 0
             return 0
 
+        self.kconfig.evaluation_count += 1
+
         # Warning: See Symbol._rec_invalidate(), and note that this is a hidden
         # function call (property magic)
         vis = self.visibility
@@ -4861,36 +5365,39 @@ class Symbol(object):
         self._cached_str_val = self._cached_tri_val = self._cached_vis = \
         self._cached_assignable = None
 
+        self.kconfig.invalidation_count += 1
+
     def _rec_invalidate(self):
         # Invalidates the symbol and all items that (possibly) depend on it
 
-        if self is self.kconfig.modules:
-            # Invalidating MODULES has wide-ranging effects
-            self.kconfig._invalidate_all()
-        else:
-            self._invalidate()
+        _rec_invalidate(self)
 
-            for item in self._dependents:
-                # _cached_vis doubles as a flag that tells us whether 'item'
-                # has cached values, because it's calculated as a side effect
-                # of calculating all other (non-constant) cached values.
-                #
-                # If item._cached_vis is None, it means there can't be cached
-                # values on other items that depend on 'item', because if there
-                # were, some value on 'item' would have been calculated and
-                # item._cached_vis set as a side effect. It's therefore safe to
-                # stop the invalidation at symbols with _cached_vis None.
-                #
-                # This approach massively speeds up scripts that set a lot of
-                # values, vs simply invalidating all possibly dependent symbols
-                # (even when you already have a list of all the dependent
-                # symbols, because some symbols get huge dependency trees).
-                #
-                # This gracefully handles dependency loops too, which is nice
-                # for choices, where the choice depends on the choice symbols
-                # and vice versa.
-                if item._cached_vis is not None:
-                    item._rec_invalidate()
+    def _user_value_changed(self):
+        # Invalidates the symbol after a change to its user value, along with
+        # the items that depend on it if its value changes.
+        #
+        # Dependent items only look at the value of a non-choice bool/tristate
+        # symbol, so if a value is cached, it is recalculated right away, and
+        # the invalidation stops there if the value stays the same. This often
+        # happens, e.g. when the symbol is selected, or when loading a .config
+        # file that matches the current values. The visibility and assignable
+        # values don't depend on the user value and stay cached.
+        #
+        # Choice symbols aren't handled like this, as their user values also
+        # affect the choice.
+
+        if self._cached_tri_val is None or self.choice or \
+           self.orig_type not in _BOOL_TRISTATE or \
+           self is self.kconfig.modules:
+            self._rec_invalidate()
+            return
+
+        old_val = self._cached_tri_val
+        self._cached_str_val = self._cached_tri_val = None
+        self.kconfig.invalidation_count += 1
+
+        if self.tri_value != old_val:
+            self._rec_invalidate()
 
     def _rec_invalidate_if_has_prompt(self):
         # Invalidates the symbol and its dependent symbols, but only if the
@@ -4907,7 +5414,7 @@ class Symbol(object):
 
         for node in self.nodes:
             if node.prompt:
-                self._rec_invalidate()
+                self._user_value_changed()
                 return
 
         if self.kconfig._warn_assign_no_prompt:
@@ -5237,6 +5744,7 @@ class Choice(object):
         See the class documentation.
         """
         if self._cached_selection is _NO_CACHED_SELECTION:
+            self.kconfig.evaluation_count += 1
             self._cached_selection = self._selection()
         return self._cached_selection
 
@@ -5455,14 +5963,12 @@ class Choice(object):
         self._cached_vis = self._cached_assignable = None
         self._cached_selection = _NO_CACHED_SELECTION
 
+        self.kconfig.invalidation_count += 1
+
     def _rec_invalidate(self):
         # See Symbol._rec_invalidate()
 
-        self._invalidate()
-
-        for item in self._dependents:
-            if item._cached_vis is not None:
-                item._rec_invalidate()
+        _rec_invalidate(self)
 
 
 class MenuNode(object):
@@ -5979,6 +6485,109 @@ class _KconfigIOError(IOError):
         return self.msg
 
 
+class _KconfigPrefetcher(object):
+    # Reads Kconfig files ahead of the parser with a pool of threads. See the
+    # 'prefetch' parameter to Kconfig.__init__().
+    #
+    # Whenever a file has been read, the 'source' statements in it are
+    # scanned for, and the globs/files they reference are read in turn. This
+    # only guesses at what the parser will need: 'source' statements that
+    # can't be expanded with just the environment are skipped, and the parser
+    # ignores results it doesn't ask for. Results are keyed on the exact
+    # filename or glob pattern used by the parser, so a wrong guess can't
+    # change the result of parsing.
+
+    def __init__(self, srctree_prefix, encoding):
+        # Only import as needed, to save some startup time
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._srctree_prefix = srctree_prefix
+        self._encoding = encoding
+        self._executor = ThreadPoolExecutor(_PREFETCH_THREADS)
+        self._lock = threading.Lock()
+        # Maps filenames to futures for their contents, and ("glob", pattern)
+        # tuples to futures for the sorted list of matching files
+        self._futures = {}
+
+    def read(self, filename):
+        # Returns the contents of the file 'filename', or None if it couldn't
+        # be read (or decoded)
+
+        future = self._submit(filename, self._read, filename)
+        # If the read hasn't started yet, do it here instead of waiting for
+        # the reads queued before it
+        if future.cancel():
+            try:
+                return self._read(filename)
+            except Exception:
+                return None
+
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def glob(self, pattern):
+        # Returns a sorted list of the files that match the 'source' glob
+        # 'pattern'
+
+        future = self._submit(("glob", pattern), self._glob, pattern)
+        if future.cancel():
+            return self._glob(pattern)
+        return future.result()
+
+    def shutdown(self):
+        # Drops reads that haven't started yet and waits for the worker
+        # threads to finish
+
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+        self._executor.shutdown()
+
+    def _submit(self, key, fn, arg):
+        # Schedules fn(arg) for 'key', unless already scheduled. Returns the
+        # future.
+
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = self._executor.submit(fn, arg)
+            return future
+
+    def _read(self, filename):
+        with open(filename, encoding=self._encoding) as f:
+            contents = f.read()
+
+        # Path relative to $srctree, like Kconfig.filename (see
+        # Kconfig._enter_file())
+        if filename.startswith(self._srctree_prefix):
+            rel_filename = filename[len(self._srctree_prefix):]
+        else:
+            rel_filename = filename
+
+        for keyword, pattern, sq_pattern in _source_findall(contents):
+            pattern = _prefetch_expand(pattern or sq_pattern)
+            if pattern is None:
+                continue
+
+            if keyword in ("rsource", "orsource", "grsource"):
+                pattern = join(dirname(rel_filename), pattern)
+
+            # This mirrors how Kconfig._parse_block() builds the pattern
+            self._submit(("glob", join(self._srctree_prefix, pattern)),
+                         self._glob, join(self._srctree_prefix, pattern))
+
+        return contents
+
+    def _glob(self, pattern):
+        filenames = sorted(iglob(pattern))
+        for filename in filenames:
+            self._submit(filename, self._read, filename)
+        return filenames
+
+
 #
 # Public functions
 #
@@ -5998,19 +6607,37 @@ def expr_value(expr):
     if expr.__class__ is not tuple:
         return expr.tri_value
 
-    if expr[0] is AND:
-        v1 = expr_value(expr[1])
+    # Symbol and choice operands are looked up directly instead of through a
+    # recursive call, and min()/max() are avoided. Most operands are plain
+    # symbols, so this saves a function call per operand in the common case.
+
+    op = expr[0]
+
+    if op is AND:
+        v1 = expr[1]
+        v1 = v1.tri_value if v1.__class__ is not tuple else expr_value(v1)
         # Short-circuit the n case as an optimization (~5% faster
         # allnoconfig.py and allyesconfig.py, as of writing)
-        return 0 if not v1 else min(v1, expr_value(expr[2]))
+        if not v1:
+            return 0
+        v2 = expr[2]
+        v2 = v2.tri_value if v2.__class__ is not tuple else expr_value(v2)
+        return v1 if v1 < v2 else v2
 
-    if expr[0] is OR:
-        v1 = expr_value(expr[1])
+    if op is OR:
+        v1 = expr[1]
+        v1 = v1.tri_value if v1.__class__ is not tuple else expr_value(v1)
         # Short-circuit the y case as an optimization
-        return 2 if v1 == 2 else max(v1, expr_value(expr[2]))
+        if v1 == 2:
+            return 2
+        v2 = expr[2]
+        v2 = v2.tri_value if v2.__class__ is not tuple else expr_value(v2)
+        return v1 if v1 > v2 else v2
 
-    if expr[0] is NOT:
-        return 2 - expr_value(expr[1])
+    if op is NOT:
+        v1 = expr[1]
+        return 2 - (v1.tri_value if v1.__class__ is not tuple else
+                    expr_value(v1))
 
     # Relation
     #
@@ -6292,7 +6919,12 @@ def _visibility(sc):
 
     for node in sc.nodes:
         if node.prompt:
-            vis = max(vis, expr_value(node.prompt[1]))
+            cond_vis = expr_value(node.prompt[1])
+            if cond_vis > vis:
+                vis = cond_vis
+                if vis == 2:
+                    # Can't get any higher
+                    break
 
     if sc.__class__ is Symbol and sc.choice:
         if sc.choice.orig_type is TRISTATE and \
@@ -6312,6 +6944,21 @@ def _visibility(sc):
     return vis
 
 
+def _prefetch_expand(pattern):
+    # Expands references to environment variables in the 'source' pattern
+    # 'pattern' for _KconfigPrefetcher. Returns None if 'pattern' uses other
+    # preprocessor features, or escapes.
+
+    pattern = _prefetch_env_macro_sub(
+        lambda match: os.environ.get(match.group(1), ""), pattern)
+
+    if "$(" in pattern or "\\" in pattern:
+        return None
+
+    # See Kconfig._tokenize()
+    return expandvars(pattern.replace("$UNAME_RELEASE", _UNAME_RELEASE))
+
+
 def _depend_on(sc, expr):
     # Adds 'sc' (symbol or choice) as a "dependee" to all symbols in 'expr'.
     # Constant symbols in 'expr' are skipped as they can never change value
@@ -6740,6 +7387,130 @@ def _decoding_error(e, filename, macro_linenr=None):
             e.reason))
 
 
+def _cache_key(filename, warn, encoding):
+    # Returns the part of the Kconfig tree cache that must match for the cache
+    # to be valid, besides the inputs recorded during parsing. The hash of
+    # this file invalidates the cache for any Kconfiglib changes.
+
+    return (VERSION, _file_hash(__file__), filename, bool(warn), encoding)
+
+
+def _file_hash(path):
+    # Returns a hash of the contents of the file 'path', or None if it can't
+    # be read
+
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).digest()
+    except EnvironmentError:
+        return None
+
+
+class _CachePickler(pickle.Pickler):
+    # Pickler for the Kconfig tree cache.
+    #
+    # Symbols, choices, menu nodes, and variables are first pickled as empty
+    # objects, and their attributes are pickled afterwards by dump_objects(),
+    # in batches. Pickling the attributes right away would recurse for each
+    # link in the menu tree, which overflows the stack. The 'kconfig'
+    # attribute is left out, and set to the new Kconfig instance by
+    # Kconfig._load_cache().
+
+    def __init__(self, f):
+        pickle.Pickler.__init__(self, f, 4)
+        self._objs = []
+
+    def reducer_override(self, obj):
+        if obj.__class__ in _CACHE_CLASSES:
+            self._objs.append(obj)
+            return object.__new__, (obj.__class__,)
+
+        return NotImplemented
+
+    def dump_objects(self):
+        # Pickles the attributes of all objects seen so far, as lists of
+        # (<object>, [(<name>, <value>), ...]) tuples. New objects might be
+        # seen while doing that, so loop until there are none left. None
+        # marks the end.
+
+        while self._objs:
+            objs = self._objs
+            self._objs = []
+            self.dump([(obj, [(name, getattr(obj, name))
+                              for name in obj.__slots__
+                              if name != "kconfig" and hasattr(obj, name)])
+                       for obj in objs])
+
+        self.dump(None)
+
+
+def _init_evaluate_configs_worker(*state):
+    # Kconfig.evaluate_configs() helper. Saves the state inherited from the
+    # parent process.
+
+    global _evaluate_configs_state
+    _evaluate_configs_state = state
+
+
+def _evaluate_config(i):
+    # Kconfig.evaluate_configs() helper. Evaluates the configuration for the
+    # i'th argument in a worker process.
+
+    kconf, fn, args, snapshot = _evaluate_configs_state
+    kconf.restore(snapshot)
+    return fn(kconf, args[i])
+
+
+def _rec_invalidate(root):
+    # Symbol/Choice._rec_invalidate() implementation. Invalidates the symbol or
+    # choice 'root' and all items that (possibly) depend on it.
+    #
+    # _cached_vis doubles as a flag that tells us whether an item has
+    # cached values, because it's calculated as a side effect of
+    # calculating all other (non-constant) cached values.
+    #
+    # If item._cached_vis is None, it means there can't be cached values on
+    # other items that depend on 'item', because if there were, some value
+    # on 'item' would have been calculated and item._cached_vis set as a
+    # side effect. It's therefore safe to stop the invalidation at symbols
+    # with _cached_vis None.
+    #
+    # This approach massively speeds up scripts that set a lot of values,
+    # vs simply invalidating all possibly dependent symbols (even when you
+    # already have a list of all the dependent symbols, because some
+    # symbols get huge dependency trees).
+    #
+    # This gracefully handles dependency loops too, which is nice for
+    # choices, where the choice depends on the choice symbols and vice
+    # versa.
+    #
+    # The dependents are walked with an explicit stack rather than
+    # recursively, as some symbols have deep chains of dependents.
+
+    modules = root.kconfig.modules
+
+    stack = [root]
+    while stack:
+        item = stack.pop()
+
+        if item is modules:
+            # Invalidating MODULES has wide-ranging effects
+            root.kconfig._invalidate_all()
+            return
+
+        # Items can be pushed more than once before being invalidated.
+        # Always invalidate the first item though, even if it has no
+        # cached visibility.
+        if item._cached_vis is None and item is not root:
+            continue
+
+        item._invalidate()
+
+        for dep in item._dependents:
+            if dep._cached_vis is not None:
+                stack.append(dep)
+
+
 def _warn_verbose_deprecated(fn_name):
     sys.stderr.write(
         "Deprecation warning: {0}()'s 'verbose' argument has no effect. Since "
@@ -6785,6 +7556,8 @@ def _error_if_fn(kconf, _, cond, msg):
 def _shell_fn(kconf, _, command):
     import subprocess  # Only import as needed, to save some startup time
 
+    kconf.shell_count += 1
+
     stdout, stderr = subprocess.Popen(
         command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
     ).communicate()
@@ -6834,6 +7607,74 @@ _NO_CACHED_SELECTION = 0
 # Are we running on Python 2?
 _IS_PY2 = sys.version_info[0] < 3
 
+# Names of predefined preprocessor functions that have side effects or depend
+# on the parsing location, and whose results can't be reused between calls.
+# User-defined functions can be added via 'impure_functions' in the module
+# that defines them. See the module docstring.
+_IMPURE_FN_NAMES = (
+    "error-if",
+    "filename",
+    "info",
+    "lineno",
+    "warning-if",
+)
+
+# Predefined preprocessor functions whose results only depend on the Kconfig
+# files, which don't need to be checked separately for the Kconfig tree cache
+_FILE_DETERMINED_FNS = (
+    _error_if_fn,
+    _filename_fn,
+    _info_fn,
+    _lineno_fn,
+    _warning_if_fn,
+)
+
+# Environment variables that are read during parsing besides those referenced
+# in Kconfig files, and which are part of the Kconfig tree cache
+_CACHE_ENV_VARS = (
+    "CONFIG_",
+    "KCONFIG_AUTOHEADER_HEADER",
+    "KCONFIG_CONFIG_HEADER",
+    "KCONFIG_FUNCTIONS",
+    "KCONFIG_STRICT",
+    "KCONFIG_WARN_UNDEF",
+    "KCONFIG_WARN_UNDEF_ASSIGN",
+    "srctree",
+)
+
+# Kinds of inputs to parsing recorded for the Kconfig tree cache, from cheapest
+# to most expensive to check
+_CACHE_INPUT_KINDS = ("env", "glob", "file", "call")
+
+# Classes whose instances are pickled in two steps by _CachePickler
+_CACHE_CLASSES = frozenset((Symbol, Choice, MenuNode, Variable))
+
+# Kconfig attributes that are only used while parsing, and that aren't stored
+# in the Kconfig tree cache. _functions and _impure_fns are set up again when
+# loading the cache. The preprocessor counters count the work done when
+# checking the cache instead.
+_CACHE_SKIP_SLOTS = frozenset((
+    "_cache_inputs",
+    "_filestack",
+    "_fn_cache",
+    "_functions",
+    "_impure_fns",
+    "_line",
+    "expansion_count",
+    "function_call_count",
+    "shell_count",
+    "_prefetcher",
+    "_readline",
+    "_reuse_tokens",
+    "_tokens",
+    "_tokens_i",
+))
+
+# Number of threads used for reading Kconfig files ahead of the parser. See
+# _KconfigPrefetcher. The reads are I/O-bound, so this doesn't depend on the
+# number of CPUs.
+_PREFETCH_THREADS = 16
+
 try:
     _UNAME_RELEASE = os.uname()[2]
 except AttributeError:
@@ -7162,3 +8003,21 @@ _name_special_search = _re_search(r'[^A-Za-z0-9_$/.-]|\$\(|$')
 # A valid right-hand side for an assignment to a string symbol in a .config
 # file, including escaped characters. Extracts the contents.
 _conf_string_match = _re_match(r'"((?:[^\\"]|\\.)*)"')
+
+# References to environment variables with the old $FOO/${FOO} syntax, which
+# are expanded with os.path.expandvars(). Extracts the variable names, which
+# are recorded for the Kconfig tree cache.
+_old_env_var_findall = re.compile(r"\$\{?([A-Za-z0-9_]+)",
+                                  0 if _IS_PY2 else re.ASCII).findall
+
+# 'source' statements, for the prefetcher. Extracts the keyword and the quoted
+# pattern (in the second or third group, depending on the quotes used).
+_source_findall = re.compile(
+    r"""^[ \t]*(source|rsource|osource|orsource|gsource|grsource)[ \t]+"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)')[ \t]*(?:#.*)?$""",
+    re.MULTILINE).findall
+
+# References to preprocessor variables that might be environment variables,
+# for the prefetcher
+_prefetch_env_macro_sub = re.compile(r"\$\(([A-Za-z0-9_]+)\)",
+                                     0 if _IS_PY2 else re.ASCII).sub
@@ -0,0 +1,168 @@
+# Copyright (c) 2026 The Zephyr Project Contributors
+# SPDX-License-Identifier: ISC
+
+"""
+Search index for the jump-to dialogs in menuconfig.py and guiconfig.py.
+
+A search string consists of one or more space-separated regular expressions,
+which are matched case-insensitively. A symbol or choice matches if each
+regular expression matches either its name or its prompt. A menu or comment
+matches if each regular expression matches its prompt.
+
+The lowercased names and prompts are computed once, when the index is
+created, instead of on every search. When the search string is extended
+(e.g. while typing), only the previous matches are searched, as long as the
+search strings don't use regular expression features. Search strings without
+special characters are also matched with plain substring searches.
+
+The Kconfig search page in the documentation
+(doc/_extensions/zephyr/kconfig/static/kconfig.mjs) searches its database in
+the same way.
+"""
+
+import re
+
+from kconfiglib import Symbol, Choice
+
+# Characters with a special meaning in regular expressions. Search strings
+# without them can be matched with plain substring searches.
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
+class SearchIndex(object):
+    """
+    Index for searching the symbols, choices, menus, and comments in a
+    Kconfig tree.
+
+    nodes:
+      List of all MenuNodes that can be searched, in the order they are
+      returned in by search(). Symbol nodes come first, sorted by symbol name,
+      then choice nodes, sorted by prompt, then menus, and finally comments,
+      both sorted by prompt.
+    """
+
+    def __init__(self, kconf):
+        """
+        Creates a search index for the Kconfig instance 'kconf'.
+
+        The index is not updated if the Kconfig tree changes.
+        """
+        self.nodes = _sorted_sc_nodes(kconf) + _sorted_menu_comment_nodes(kconf)
+
+        # (node, lowercased name, lowercased prompt) tuples, in the same order
+        # as 'nodes'. The name or prompt is None if missing. Menus and comments
+        # are never matched on their name.
+        self._entries = [
+            (node,
+             node.item.name.lower()
+                 if isinstance(node.item, (Symbol, Choice)) and node.item.name
+                 else None,
+             node.prompt[0].lower() if node.prompt else None)
+            for node in self.nodes]
+
+        # Previous literal search string and the entries that matched it, for
+        # narrowing down searches incrementally
+        self._prev_search = None
+        self._prev_matches = None
+
+    def search(self, search_string):
+        """
+        Returns a list of the MenuNodes that match 'search_string', in the
+        order given by SearchIndex.nodes. See the module docstring for the
+        search syntax.
+
+        Raises re.error if 'search_string' holds an invalid regular
+        expression.
+        """
+        search_string = search_string.lower()
+        terms = search_string.split()
+
+        if _REGEX_SPECIAL.isdisjoint(search_string):
+            # Plain search. Strings that extend the previous search string
+            # can only match a subset of its matches: each term in the new
+            # string extends the corresponding term in the old string, or is
+            # a new term.
+            if self._prev_search is not None and \
+               search_string.startswith(self._prev_search):
+                entries = self._prev_matches
+            else:
+                entries = self._entries
+
+            matches = [entry for entry in entries
+                       if _matches_all(entry, terms)]
+
+            self._prev_search = search_string
+            self._prev_matches = matches
+
+        else:
+            # We could use re.IGNORECASE here instead of lower(), but this is
+            # noticeably less jerky while inputting regexes like '.*debug$'
+            # (though the '.*' is redundant there). Those probably have bad
+            # interactions with re.search(), which matches anywhere in the
+            # string.
+            regex_searches = [re.compile(regex).search for regex in terms]
+
+            matches = []
+            add_match = matches.append
+
+            for entry in self._entries:
+                _, name, prompt = entry
+
+                for search in regex_searches:
+                    # Does the regex match either the name or the prompt (if
+                    # any)? Give up on the first regex that doesn't match, to
+                    # speed things up a bit when multiple regexes are entered.
+                    if not (name and search(name) or
+                            prompt and search(prompt)):
+                        break
+                else:
+                    add_match(entry)
+
+            self._prev_search = self._prev_matches = None
+
+        return [entry[0] for entry in matches]
+
+
+def _matches_all(entry, terms):
+    # Returns True if each string in 'terms' is a substring of the name or the
+    # prompt in 'entry'
+
+    _, name, prompt = entry
+    for term in terms:
+        if not (name and term in name or prompt and term in prompt):
+            return False
+    return True
+
+
+def _sorted_sc_nodes(kconf):
+    # Returns a sorted list of symbol and choice nodes to search. The symbol
+    # nodes appear first, sorted by name, and then the choice nodes, sorted by
+    # prompt and (secondarily) name.
+
+    nodes = []
+
+    # Add symbol nodes
+    for sym in sorted(kconf.unique_defined_syms, key=lambda sym: sym.name):
+        nodes += sym.nodes
+
+    # Add choice nodes
+
+    choices = sorted(kconf.unique_choices,
+                     key=lambda choice: choice.name or "")
+
+    nodes += sorted(
+        [node for choice in choices for node in choice.nodes],
+        key=lambda node: node.prompt[0] if node.prompt else "")
+
+    return nodes
+
+
+def _sorted_menu_comment_nodes(kconf):
+    # Returns a list of menu and comment nodes to search, sorted by prompt,
+    # with the menus first
+
+    def prompt_text(mc):
+        return mc.prompt[0]
+
+    return sorted(kconf.menus, key=prompt_text) + \
+           sorted(kconf.comments, key=prompt_text)
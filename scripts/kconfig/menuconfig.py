@@ -222,6 +222,7 @@ from kconfiglib import Symbol, Choice, MENU, COMMENT, MenuNode, \
                        standard_sc_expr_str, \
                        TRI_TO_STR, TYPE_TO_STR, \
                        standard_kconfig, standard_config_filename
+from kconfigsearch import SearchIndex
 
 
 #
@@ -2078,55 +2079,12 @@ def _jump_to_dialog():
             prev_s = s
 
             try:
-                # We could use re.IGNORECASE here instead of lower(), but this
-                # is noticeably less jerky while inputting regexes like
-                # '.*debug$' (though the '.*' is redundant there). Those
-                # probably have bad interactions with re.search(), which
-                # matches anywhere in the string.
-                #
-                # It's not horrible either way. Just a bit smoother.
-                regex_searches = [re.compile(regex).search
-                                  for regex in s.lower().split()]
+                # List of matching nodes
+                matches = _search_index().search(s)
 
                 # No exception thrown, so the regexes are okay
                 bad_re = None
 
-                # List of matching nodes
-                matches = []
-                add_match = matches.append
-
-                # Search symbols and choices
-
-                for node in _sorted_sc_nodes():
-                    # Symbol/choice
-                    sc = node.item
-
-                    for search in regex_searches:
-                        # Both the name and the prompt might be missing, since
-                        # we're searching both symbols and choices
-
-                        # Does the regex match either the symbol name or the
-                        # prompt (if any)?
-                        if not (sc.name and search(sc.name.lower()) or
-                                node.prompt and search(node.prompt[0].lower())):
-
-                            # Give up on the first regex that doesn't match, to
-                            # speed things up a bit when multiple regexes are
-                            # entered
-                            break
-
-                    else:
-                        add_match(node)
-
-                # Search menus and comments
-
-                for node in _sorted_menu_comment_nodes():
-                    for search in regex_searches:
-                        if not search(node.prompt[0].lower()):
-                            break
-                    else:
-                        add_match(node)
-
             except re.error as e:
                 # Bad regex. Remember the error message so we can show it.
                 bad_re = "Bad regular expression"
@@ -2207,44 +2165,16 @@ def _jump_to_dialog():
                                          _width(edit_box) - 2)
 
 
-# Obscure Python: We never pass a value for cached_nodes, and it keeps pointing
+# Obscure Python: We never pass a value for cached_index, and it keeps pointing
 # to the same list. This avoids a global.
-def _sorted_sc_nodes(cached_nodes=[]):
-    # Returns a sorted list of symbol and choice nodes to search. The symbol
-    # nodes appear first, sorted by name, and then the choice nodes, sorted by
-    # prompt and (secondarily) name.
-
-    if not cached_nodes:
-        # Add symbol nodes
-        for sym in sorted(_kconf.unique_defined_syms,
-                          key=lambda sym: sym.name):
-            # += is in-place for lists
-            cached_nodes += sym.nodes
-
-        # Add choice nodes
-
-        choices = sorted(_kconf.unique_choices,
-                         key=lambda choice: choice.name or "")
-
-        cached_nodes += sorted(
-            [node for choice in choices for node in choice.nodes],
-            key=lambda node: node.prompt[0] if node.prompt else "")
-
-    return cached_nodes
-
-
-def _sorted_menu_comment_nodes(cached_nodes=[]):
-    # Returns a list of menu and comment nodes to search, sorted by prompt,
-    # with the menus first
-
-    if not cached_nodes:
-        def prompt_text(mc):
-            return mc.prompt[0]
+def _search_index(cached_index=[]):
+    # Returns the SearchIndex used by the jump-to dialog, creating it the first
+    # time
 
-        cached_nodes += sorted(_kconf.menus, key=prompt_text)
-        cached_nodes += sorted(_kconf.comments, key=prompt_text)
+    if not cached_index:
+        cached_index.append(SearchIndex(_kconf))
 
-    return cached_nodes
+    return cached_index[0]
 
 
 def _resize_jump_to_dialog(edit_box, matches_win, bot_sep_win, help_win,
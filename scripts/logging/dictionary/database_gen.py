@@ -8,8 +8,9 @@
 Dictionary-based Logging Database Generator
 
 This takes the built Zephyr ELF binary and produces a JSON database
-file for dictionary-based logging. This database is used together
-with the parser to decode binary log messages.
+file for dictionary-based logging, and optionally the same database
+in a binary format that the parser can load faster. This database is
+used together with the parser to decode binary log messages.
 """
 
 import argparse
@@ -27,9 +28,7 @@ from dictionary_parser.utils import find_string_in_mappings
 
 import elftools
 from elftools.elf.constants import SH_FLAGS
-from elftools.elf.elffile import ELFFile
 from elftools.elf.descriptions import describe_ei_data
-from elftools.elf.sections import SymbolTableSection
 from elftools.dwarf.descriptions import (
     describe_DWARF_expr
 )
@@ -37,6 +36,9 @@ from elftools.dwarf.locationlists import (
     LocationExpr, LocationParser
 )
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'build'))
+from elf_index import ElfIndex
+
 
 LOGGER_FORMAT = "%(name)s: %(levelname)s: %(message)s"
 logger = logging.getLogger(os.path.basename(sys.argv[0]))
@@ -85,13 +87,24 @@ def parse_args():
     argparser.add_argument("-v", "--verbose", action="store_true",
                            help="Print more information")
 
-    outfile_grp = argparser.add_mutually_exclusive_group(required=True)
+    outfile_grp = argparser.add_mutually_exclusive_group()
     outfile_grp.add_argument("--json",
                              help="Output Dictionary Logging Database file in JSON")
     outfile_grp.add_argument("--syst",
                              help="Output MIPI Sys-T Collateral XML file")
+    argparser.add_argument("--bin",
+                           help="Output Dictionary Logging Database file in "
+                                "binary format, alone or together with --json")
+
+    args = argparser.parse_args()
+
+    if not (args.json or args.syst or args.bin):
+        argparser.error("one of the arguments --json --syst --bin is required")
 
-    return argparser.parse_args()
+    if args.syst and args.bin:
+        argparser.error("argument --bin: not allowed with argument --syst")
+
+    return args
 
 
 def extract_elf_code_data_sections(elf):
@@ -135,36 +148,15 @@ def find_elf_sections(elf, sh_name):
     return None
 
 
-def get_kconfig_symbols(elf):
+def get_kconfig_symbols(index):
     """Get kconfig symbols from the ELF file"""
-    for section in elf.iter_sections():
-        if isinstance(section, SymbolTableSection):
-            return {sym.name: sym.entry.st_value
-                    for sym in section.iter_symbols()
-                       if sym.name.startswith("CONFIG_")}
-
-    raise LookupError("Could not find symbol table")
+    return {name: value for name, value in index.symbol_values().items()
+            if name.startswith("CONFIG_")}
 
 
-def find_log_const_symbols(elf):
+def find_log_const_symbols(index):
     """Extract all "log_const_*" symbols from ELF file"""
-    symbol_tables = [s for s in elf.iter_sections()
-                     if isinstance(s, elftools.elf.sections.SymbolTableSection)]
-
-    ret_list = []
-
-    for section in symbol_tables:
-        if not isinstance(section, elftools.elf.sections.SymbolTableSection):
-            continue
-
-        if section['sh_entsize'] == 0:
-            continue
-
-        for symbol in section.iter_symbols():
-            if symbol.name.startswith("log_const_"):
-                ret_list.append(symbol)
-
-    return ret_list
+    return [sym for sym in index.symbols if sym.name.startswith("log_const_")]
 
 
 def parse_log_const_symbols(database, log_const_section, log_const_symbols, string_mappings):
@@ -187,17 +179,17 @@ def parse_log_const_symbols(database, log_const_section, log_const_symbols, stri
     datum_size = struct.calcsize(formatter)
 
     # Get the address of first log instance
-    first_offset = log_const_symbols[0].entry['st_value']
+    first_offset = log_const_symbols[0].value
     for sym in log_const_symbols:
-        if sym.entry['st_value'] < first_offset:
-            first_offset = sym.entry['st_value']
+        if sym.value < first_offset:
+            first_offset = sym.value
 
     first_offset -= log_const_section['start']
 
     # find all log_const_*
     for sym in log_const_symbols:
         # Find data offset in log_const_section for this symbol
-        offset = sym.entry['st_value'] - log_const_section['start']
+        offset = sym.value - log_const_section['start']
 
         idx_s = offset
         idx_e = offset + datum_size
@@ -218,9 +210,9 @@ def parse_log_const_symbols(database, log_const_section, log_const_symbols, stri
         logger.info("Found Log Instance: %s, level: %d", instance_name, level)
 
         # source ID is simply the element index in the log instance array
-        source_id = int((offset - first_offset) / sym.entry['st_size'])
+        source_id = int((offset - first_offset) / sym.size)
 
-        database.add_log_instance(source_id, instance_name, level, sym.entry['st_value'])
+        database.add_log_instance(source_id, instance_name, level, sym.value)
 
 
 def extract_elf_information(elf, database):
@@ -237,9 +229,9 @@ def extract_elf_information(elf, database):
         sys.exit(1)
 
 
-def process_kconfigs(elf, database):
+def process_kconfigs(index, database):
     """Process kconfigs to extract information"""
-    kconfigs = get_kconfig_symbols(elf)
+    kconfigs = get_kconfig_symbols(index)
 
     # 32 or 64-bit target
     database.set_tgt_bits(64 if "CONFIG_64BIT" in kconfigs else 32)
@@ -258,13 +250,15 @@ def process_kconfigs(elf, database):
                              kconfigs['CONFIG_LOG_TIMESTAMP_64BIT'])
 
 
-def extract_logging_subsys_information(elf, database, string_mappings):
+def extract_logging_subsys_information(index, database, string_mappings):
     """
     Extract logging subsys related information and store in database.
 
     For example, this extracts the list of log instances to establish
     mapping from source ID to name.
     """
+    elf = index.elf
+
     # Extract log constant section for module names
     section_log_const = find_elf_sections(elf, "log_const_sections")
     if section_log_const is None:
@@ -276,7 +270,7 @@ def extract_logging_subsys_information(elf, database, string_mappings):
         sys.exit(1)
 
     # Find all "log_const_*" symbols and parse them
-    log_const_symbols = find_log_const_symbols(elf)
+    log_const_symbols = find_log_const_symbols(index)
     parse_log_const_symbols(database, section_log_const, log_const_symbols, string_mappings)
 
 
@@ -527,22 +521,22 @@ def main():
     elif args.verbose:
         logger.setLevel(logging.INFO)
 
-    elffile = open(args.elffile, "rb")
-    if not elffile:
-        logger.error("ERROR: Cannot open ELF file: %s, exiting...", args.elffile)
-        sys.exit(1)
-
     logger.info("ELF file %s", args.elffile)
 
     if args.json:
         logger.info("JSON Database file %s", args.json)
         section_extraction = True
 
+    if args.bin:
+        logger.info("Binary Database file %s", args.bin)
+        section_extraction = True
+
     if args.syst:
         logger.info("MIPI Sys-T Collateral file %s", args.syst)
         section_extraction = False
 
-    elf = ELFFile(elffile)
+    index = ElfIndex(args.elffile)
+    elf = index.elf
 
     database = LogDatabase()
 
@@ -560,7 +554,7 @@ def main():
 
     extract_elf_information(elf, database)
 
-    process_kconfigs(elf, database)
+    process_kconfigs(index, database)
 
     logger.info("Target: %s, %d-bit", database.get_arch(), database.get_tgt_bits())
     if database.is_tgt_little_endian():
@@ -586,7 +580,7 @@ def main():
         # with strings in various ELF sections.
         string_mappings = extract_static_strings(elf, database, section_extraction=True)
 
-    extract_logging_subsys_information(elf, database, string_mappings)
+    extract_logging_subsys_information(index, database, string_mappings)
 
     # Write database file
     if args.json:
@@ -595,14 +589,18 @@ def main():
                          args.json)
             sys.exit(1)
 
+    if args.bin:
+        if not LogDatabase.write_binary_database(args.bin, database):
+            logger.error("ERROR: Cannot open database file for write: %s, exiting...",
+                         args.bin)
+            sys.exit(1)
+
     if args.syst:
         if not LogDatabase.write_syst_database(args.syst, database):
             logger.error("ERROR: Cannot open database file for write: %s, exiting...",
                          args.syst)
             sys.exit(1)
 
-    elffile.close()
-
 
 if __name__ == "__main__":
     main()
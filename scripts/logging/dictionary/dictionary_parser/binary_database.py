@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Binary Format for Dictionary-based Logging Database
+
+The binary database holds the same information as the JSON database,
+laid out so that it can be memory-mapped and used without decoding
+all of it first:
+
+  header         Magic, format version, and offsets and sizes of the
+                 parts below. All integers are little endian.
+  string index   One entry per string mapping, sorted by pointer.
+  string table   The strings of the string mappings, in UTF-8.
+  section data   Raw contents of the sections, if any.
+  metadata       Everything else, as JSON, with the offsets and
+                 sizes of the section contents.
+"""
+
+import bisect
+import collections.abc
+import json
+import struct
+
+
+MAGIC = b"ZLOGDICT"
+
+# Update this if the binary format has changed
+FORMAT_VERSION = 1
+
+# magic, format version, reserved,
+# metadata offset, metadata size,
+# string index offset, number of strings,
+# string table offset, string table size
+HEADER = struct.Struct("<8sII QQ QQ QQ")
+
+# pointer, largest end address of this and all earlier entries,
+# position in the original string mappings, string table offset,
+# string size in bytes, string length in characters
+INDEX_ENTRY = struct.Struct("<QQIIII")
+
+# Alignment of the parts after the header
+PART_ALIGN = 8
+
+
+def is_binary_database(data):
+    """Return True if data starts like a binary database"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+class MappedData():
+    """
+    Part of a memory-mapped file, supporting the operations used
+    on section data without copying all of it
+    """
+    def __init__(self, mapped, offset, size):
+        self.mapped = mapped
+        self.offset = offset
+        self.size = size
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                raise ValueError("slice step not supported")
+
+            return self.mapped[self.offset + start:self.offset + max(start, stop)]
+
+        if key < 0:
+            key += self.size
+        if not 0 <= key < self.size:
+            raise IndexError("index out of range")
+
+        return self.mapped[self.offset + key]
+
+
+    def find(self, sub, start=0, end=None):
+        """Same as bytes.find()"""
+        if end is None or end > self.size:
+            end = self.size
+
+        idx = self.mapped.find(sub, self.offset + start, self.offset + end)
+        if idx == -1:
+            return -1
+
+        return idx - self.offset
+
+
+class MappedStringMappings(collections.abc.Mapping):
+    """
+    String mappings in a memory-mapped binary database, which maps
+    pointers to strings like the string mappings dictionary. Strings
+    are only decoded when looked up.
+    """
+    def __init__(self, mapped, index_offset, num_strings, strtab_offset):
+        self.mapped = mapped
+        self.index_offset = index_offset
+        self.num_strings = num_strings
+        self.strtab_offset = strtab_offset
+
+        self.pointers = _IndexField(self, 0)
+
+
+    def entry(self, idx):
+        """Return the index entry at idx"""
+        return INDEX_ENTRY.unpack_from(self.mapped,
+                                       self.index_offset + idx * INDEX_ENTRY.size)
+
+
+    def string(self, idx):
+        """Return the string of the index entry at idx"""
+        _, _, _, offset, size, _ = self.entry(idx)
+        offset += self.strtab_offset
+
+        return self.mapped[offset:offset + size].decode("utf-8")
+
+
+    def find(self, addr):
+        """
+        Return the pointer of the string containing addr, or None if
+        there is no such string. Works like AddressIndex.find().
+        """
+        idx = bisect.bisect_right(self.pointers, addr)
+        found = None
+        found_order = None
+
+        while idx > 0:
+            idx -= 1
+            ptr, max_end, order, _, _, length = self.entry(idx)
+            if max_end <= addr:
+                break
+
+            if ptr + length > addr and (found is None or order < found_order):
+                found = ptr
+                found_order = order
+
+        return found
+
+
+    def __getitem__(self, ptr):
+        idx = bisect.bisect_left(self.pointers, ptr)
+        if idx == self.num_strings or self.pointers[idx] != ptr:
+            raise KeyError(ptr)
+
+        return self.string(idx)
+
+
+    def __iter__(self):
+        # Iterate in the order of the original string mappings
+        entries = (self.entry(idx) for idx in range(self.num_strings))
+
+        return (entry[0] for entry in sorted(entries, key=lambda entry: entry[2]))
+
+
+    def __len__(self):
+        return self.num_strings
+
+
+class _IndexField(collections.abc.Sequence):
+    """One field of all string index entries, for bisect"""
+    def __init__(self, mappings, field):
+        self.mappings = mappings
+        self.field = field
+
+
+    def __getitem__(self, idx):
+        return self.mappings.entry(idx)[self.field]
+
+
+    def __len__(self):
+        return self.mappings.num_strings
+
+
+def _align(offset):
+    return (offset + PART_ALIGN - 1) // PART_ALIGN * PART_ALIGN
+
+
+def gen_binary_database(database):
+    """Generate the binary database from the database dictionary"""
+    metadata = {key: value for key, value in database.items()
+                if key not in ('string_mappings', 'sections')}
+
+    # String index and string table
+    index = b''
+    strtab = bytearray()
+    num_strings = 0
+
+    if 'string_mappings' in database:
+        entries = sorted((ptr, order, one_str) for order, (ptr, one_str)
+                         in enumerate(database['string_mappings'].items()))
+
+        max_end = 0
+        index = bytearray()
+        for ptr, order, one_str in entries:
+            encoded = one_str.encode("utf-8")
+            max_end = max(max_end, ptr + len(one_str))
+
+            index += INDEX_ENTRY.pack(ptr, max_end, order, len(strtab),
+                                      len(encoded), len(one_str))
+            strtab += encoded
+
+        num_strings = len(entries)
+
+    # Section contents go after the string table. Their offsets are
+    # stored in the metadata, which comes last.
+    index_offset = _align(HEADER.size)
+    strtab_offset = _align(index_offset + len(index))
+    data_offset = _align(strtab_offset + len(strtab))
+
+    section_data = []
+    if 'sections' in database:
+        metadata['sections'] = {}
+
+        for name, sect in database['sections'].items():
+            sect_meta = {key: value for key, value in sect.items() if key != 'data'}
+            sect_meta['data_offset'] = data_offset
+            sect_meta['data_size'] = len(sect['data'])
+            metadata['sections'][name] = sect_meta
+
+            section_data.append((data_offset, sect['data']))
+            data_offset = _align(data_offset + len(sect['data']))
+
+    encoded_meta = json.dumps(metadata).encode("utf-8")
+    meta_offset = data_offset
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0,
+                         meta_offset, len(encoded_meta),
+                         index_offset if 'string_mappings' in database else 0,
+                         num_strings,
+                         strtab_offset, len(strtab))
+
+    bin_db = bytearray(meta_offset + len(encoded_meta))
+    bin_db[:HEADER.size] = header
+    bin_db[index_offset:index_offset + len(index)] = index
+    bin_db[strtab_offset:strtab_offset + len(strtab)] = strtab
+    for offset, data in section_data:
+        bin_db[offset:offset + len(data)] = data
+    bin_db[meta_offset:] = encoded_meta
+
+    return bin_db
+
+
+def parse_binary_database(mapped):
+    """
+    Return the database dictionary for the memory-mapped binary
+    database. String mappings and section contents stay in the
+    mapped file. Return None if it is not a valid binary database.
+    """
+    if len(mapped) < HEADER.size:
+        return None
+
+    magic, version, _, meta_offset, meta_size, index_offset, num_strings, \
+        strtab_offset, _ = HEADER.unpack_from(mapped)
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+
+    try:
+        database = json.loads(mapped[meta_offset:meta_offset + meta_size])
+    except ValueError:
+        return None
+
+    if index_offset != 0:
+        database['string_mappings'] = MappedStringMappings(mapped, index_offset,
+                                                           num_strings, strtab_offset)
+
+    if 'sections' in database:
+        for _, sect in database['sections'].items():
+            sect['data'] = MappedData(mapped, sect.pop('data_offset'),
+                                      sect.pop('data_size'))
+
+    return database
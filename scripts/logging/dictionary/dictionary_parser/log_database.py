@@ -11,10 +11,15 @@ Class for Dictionary-based Logging Database
 import base64
 import copy
 import json
+import mmap
 
+from .binary_database import MappedStringMappings
+from .binary_database import gen_binary_database
+from .binary_database import is_binary_database
+from .binary_database import parse_binary_database
 from .mipi_syst import gen_syst_xml_file
+from .utils import AddressIndex
 from .utils import extract_one_string_in_section
-from .utils import find_string_in_mappings
 
 
 ARCHS = {
@@ -77,6 +82,11 @@ class LogDatabase():
 
         self.database = new_db
 
+        # Built by build_string_index()
+        self.mappings_index = None
+        self.sections_index = None
+        self.string_cache = None
+
 
     def get_version(self):
         """Get Database Version"""
@@ -168,6 +178,7 @@ class LogDatabase():
     def set_string_mappings(self, database):
         """Add string mappings to database"""
         self.database['string_mappings'] = database
+        self.build_string_index()
 
 
     def has_string_mappings(self):
@@ -186,12 +197,50 @@ class LogDatabase():
         return len(self.database['sections']) != 0
 
 
+    def build_string_index(self):
+        """
+        Build the address indexes of the string mappings and
+        sections used by find_string(). This needs to be called
+        again if the mappings or sections are changed directly.
+        """
+        self.mappings_index = None
+        self.sections_index = None
+        self.string_cache = {}
+
+        if self.has_string_mappings():
+            string_mappings = self.database['string_mappings']
+
+            if isinstance(string_mappings, MappedStringMappings):
+                # Already indexed in the binary database file
+                self.mappings_index = string_mappings
+            else:
+                self.mappings_index = AddressIndex(
+                    (ptr, len(string), ptr)
+                    for ptr, string in string_mappings.items())
+
+        if self.has_string_sections():
+            self.sections_index = AddressIndex(
+                (sect['start'], sect['size'], sect)
+                for sect in self.database['sections'].values())
+
+
     def __find_string_in_mappings(self, string_ptr):
         """
         Find string pointed by string_ptr in the string mapping
         list. Return None if not found.
         """
-        return find_string_in_mappings(self.database['string_mappings'], string_ptr)
+        string_mappings = self.database['string_mappings']
+
+        if string_ptr in string_mappings:
+            return string_mappings[string_ptr]
+
+        # No direct match on pointer value.
+        # This may be a combined string. So check for that.
+        ptr = self.mappings_index.find(string_ptr)
+        if ptr is None:
+            return None
+
+        return string_mappings[ptr][string_ptr - ptr:]
 
 
     def __find_string_in_sections(self, string_ptr):
@@ -199,26 +248,33 @@ class LogDatabase():
         Find string pointed by string_ptr in the binary data
         sections. Return None if not found.
         """
-        for _, sect in self.database['sections'].items():
-            one_str = extract_one_string_in_section(sect, string_ptr)
-
-            if one_str is not None:
-                return one_str
+        sect = self.sections_index.find(string_ptr)
+        if sect is None:
+            return None
 
-        return None
+        return extract_one_string_in_section(sect, string_ptr)
 
 
     def find_string(self, string_ptr):
         """Find string pointed by string_ptr in the database.
         Return None if not found."""
+        if self.string_cache is None:
+            self.build_string_index()
+
+        if string_ptr in self.string_cache:
+            return self.string_cache[string_ptr]
+
         one_str = None
 
-        if self.has_string_mappings():
+        if self.mappings_index is not None:
             one_str = self.__find_string_in_mappings(string_ptr)
 
-        if one_str is None and self.has_string_sections():
+        if one_str is None and self.sections_index is not None:
             one_str = self.__find_string_in_sections(string_ptr)
 
+        # Log messages keep using the same format strings
+        self.string_cache[string_ptr] = one_str
+
         return one_str
 
 
@@ -280,10 +336,54 @@ class LogDatabase():
                 new_str_map[int(addr)] = one_str
 
             database.set_string_mappings(new_str_map)
+        else:
+            database.build_string_index()
+
+        return database
+
+
+    @staticmethod
+    def read_binary_database(db_file_name):
+        """
+        Read database from binary file and return a LogDatabase object.
+        The file is memory-mapped, and string mappings and section
+        contents are only read when they are looked up.
+        """
+        try:
+            with open(db_file_name, "rb") as db_fd:
+                mapped = mmap.mmap(db_fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        bin_db = parse_binary_database(mapped)
+        if bin_db is None:
+            return None
+
+        database = LogDatabase()
+        database.database = bin_db
+        database.build_string_index()
 
         return database
 
 
+    @staticmethod
+    def read_database(db_file_name):
+        """
+        Read database from file in either binary or JSON format,
+        and return a LogDatabase object
+        """
+        try:
+            with open(db_file_name, "rb") as db_fd:
+                is_binary = is_binary_database(db_fd.read(16))
+        except OSError:
+            return None
+
+        if is_binary:
+            return LogDatabase.read_binary_database(db_file_name)
+
+        return LogDatabase.read_json_database(db_file_name)
+
+
     @staticmethod
     def write_json_database(db_file_name, database):
         """Write the database into file"""
@@ -304,6 +404,17 @@ class LogDatabase():
 
         return True
 
+    @staticmethod
+    def write_binary_database(db_file_name, database):
+        """Write the database into file in binary format"""
+        try:
+            with open(db_file_name, "wb") as db_fd:
+                db_fd.write(gen_binary_database(database.database))
+        except OSError:
+            return False
+
+        return True
+
     @staticmethod
     def write_syst_database(db_file_name, database):
         """
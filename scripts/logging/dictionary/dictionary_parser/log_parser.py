@@ -20,3 +20,8 @@ class LogParser(abc.ABC):
     def parse_log_data(self, logdata, debug=False):
         """Parse log data"""
         return None
+
+    @abc.abstractmethod
+    def parse_log_stream(self, chunks, debug=False):
+        """Parse log data arriving in chunks"""
+        return None
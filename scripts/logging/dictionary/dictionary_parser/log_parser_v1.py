@@ -14,6 +14,7 @@ version 1 databases.
 import logging
 import math
 import struct
+import sys
 import colorama
 from colorama import Fore
 
@@ -164,58 +165,52 @@ class DataTypes():
         return self.data_types[data_type]['fmt']
 
 
-class LogParserV1(LogParser):
-    """Log Parser V1"""
-    def __init__(self, database):
-        super().__init__(database=database)
+class FmtStrDecoder():
+    """
+    Decoder for the arguments of one format string
 
-        if self.database.is_tgt_little_endian():
-            endian = "<"
-        else:
-            endian = ">"
+    The format string is parsed once, into the offsets of its
+    arguments in the argument list and a single struct.Struct
+    unpacking all of them.
+    """
+    def __init__(self, fmt_str, data_types):
+        # Format string usable with Python's string formatting
+        self.fmt_str = formalize_fmt_string(fmt_str)
 
-        self.fmt_msg_type = endian + FMT_MSG_TYPE
-        self.fmt_dropped_cnt = endian + FMT_DROPPED_CNT
+        # (Argument index, offset in argument list) of the
+        # string arguments, which need to be looked up
+        self.str_args = []
 
-        if self.database.is_tgt_64bit():
-            self.fmt_msg_hdr = endian + FMT_MSG_HDR_64
-        else:
-            self.fmt_msg_hdr = endian + FMT_MSG_HDR_32
+        # Endianness prefix of the formatters
+        unpack_fmt = data_types.get_formatter(DataTypes.INT)[0]
 
-        if "CONFIG_LOG_TIMESTAMP_64BIT" in self.database.get_kconfigs():
-            self.fmt_msg_timestamp = endian + FMT_MSG_TIMESTAMP_64
-        else:
-            self.fmt_msg_timestamp = endian + FMT_MSG_TIMESTAMP_32
+        arg_offset = 0
+        unpacked_end = 0
+        for arg_idx, (arg_data_type, fmt) in enumerate(self.parse_fmt_str(fmt_str)):
+            if fmt == 's':
+                self.str_args.append((arg_idx, arg_offset))
 
-        self.data_types = DataTypes(self.database)
+            formatter = data_types.get_formatter(arg_data_type)[1:]
 
+            # Skip alignment and the unused part of long doubles
+            unpack_fmt += "x" * (arg_offset - unpacked_end) + formatter
+            unpacked_end = arg_offset + struct.calcsize(formatter)
 
-    def __get_string(self, arg, arg_offset, string_tbl):
-        one_str = self.database.find_string(arg)
-        if one_str is not None:
-            ret = one_str
-        else:
-            # The index from the string table is basically
-            # the order in va_list. Need to add to the index
-            # to skip the packaged string header and
-            # the format string.
-            str_idx = arg_offset + self.data_types.get_sizeof(DataTypes.PTR) * 2
-            str_idx /= self.data_types.get_sizeof(DataTypes.INT)
+            align = data_types.get_alignment(arg_data_type)
+            arg_offset += data_types.get_sizeof(arg_data_type)
 
-            if int(str_idx) not in string_tbl:
-                ret = "<string@0x{0:x}>".format(arg)
-            else:
-                ret = string_tbl[int(str_idx)]
+            # Align the offset
+            arg_offset = int((arg_offset + align - 1) / align) * align
 
-        return ret
+        self.args_struct = struct.Struct(unpack_fmt)
 
 
-    def process_one_fmt_str(self, fmt_str, arg_list, string_tbl):
-        """Parse the format string to extract arguments from
-        the binary arglist and return a tuple usable with
-        Python's string formatting"""
+    @staticmethod
+    def parse_fmt_str(fmt_str):
+        """Parse the format string and return a list of
+        (data type, conversion character) tuples for the
+        arguments, in order"""
         idx = 0
-        arg_offset = 0
         is_parsing = False
         do_extract = False
 
@@ -283,23 +278,96 @@ class LogParserV1(LogParser):
 
             if do_extract:
                 do_extract = False
+                args.append((arg_data_type, fmt))
+
+        return args
+
+
+    def decode_args(self, arg_list, get_string, string_tbl):
+        """Extract the arguments from the binary arglist and
+        return a tuple usable with Python's string formatting.
+        String arguments are looked up with get_string()."""
+        args = self.args_struct.unpack_from(arg_list)
+
+        if self.str_args:
+            args = list(args)
+            for arg_idx, arg_offset in self.str_args:
+                args[arg_idx] = get_string(args[arg_idx], arg_offset, string_tbl)
+            args = tuple(args)
+
+        return args
+
+
+class LogParserV1(LogParser):
+    """Log Parser V1"""
+    def __init__(self, database):
+        super().__init__(database=database)
+
+        if self.database.is_tgt_little_endian():
+            endian = "<"
+        else:
+            endian = ">"
+
+        self.fmt_msg_type = endian + FMT_MSG_TYPE
+        self.fmt_dropped_cnt = endian + FMT_DROPPED_CNT
+
+        if self.database.is_tgt_64bit():
+            self.fmt_msg_hdr = endian + FMT_MSG_HDR_64
+        else:
+            self.fmt_msg_hdr = endian + FMT_MSG_HDR_32
 
-                align = self.data_types.get_alignment(arg_data_type)
-                size = self.data_types.get_sizeof(arg_data_type)
-                unpack_fmt = self.data_types.get_formatter(arg_data_type)
+        if "CONFIG_LOG_TIMESTAMP_64BIT" in self.database.get_kconfigs():
+            self.fmt_msg_timestamp = endian + FMT_MSG_TIMESTAMP_64
+        else:
+            self.fmt_msg_timestamp = endian + FMT_MSG_TIMESTAMP_32
 
-                one_arg = struct.unpack_from(unpack_fmt, arg_list, arg_offset)[0]
+        # Message header followed by the timestamp
+        self.msg_hdr_struct = struct.Struct(self.fmt_msg_hdr + self.fmt_msg_timestamp[1:])
 
-                if fmt == 's':
-                    one_arg = self.__get_string(one_arg, arg_offset, string_tbl)
+        self.data_types = DataTypes(self.database)
 
-                args.append(one_arg)
-                arg_offset += size
+        # Compiled format strings, see get_fmt_str_decoder()
+        self.fmt_str_decoders = {}
 
-                # Align the offset
-                arg_offset = int((arg_offset + align - 1) / align) * align
 
-        return tuple(args)
+    def __get_string(self, arg, arg_offset, string_tbl):
+        one_str = self.database.find_string(arg)
+        if one_str is not None:
+            ret = one_str
+        else:
+            # The index from the string table is basically
+            # the order in va_list. Need to add to the index
+            # to skip the packaged string header and
+            # the format string.
+            str_idx = arg_offset + self.data_types.get_sizeof(DataTypes.PTR) * 2
+            str_idx /= self.data_types.get_sizeof(DataTypes.INT)
+
+            if int(str_idx) not in string_tbl:
+                ret = "<string@0x{0:x}>".format(arg)
+            else:
+                ret = string_tbl[int(str_idx)]
+
+        return ret
+
+
+    def get_fmt_str_decoder(self, fmt_str):
+        """Get the decoder for a format string, compiling it
+        on first use"""
+        decoder = self.fmt_str_decoders.get(fmt_str)
+        if decoder is None:
+            decoder = FmtStrDecoder(fmt_str, self.data_types)
+            self.fmt_str_decoders[fmt_str] = decoder
+
+        return decoder
+
+
+    def process_one_fmt_str(self, fmt_str, arg_list, string_tbl):
+        """Parse the format string to extract arguments from
+        the binary arglist and return a tuple usable with
+        Python's string formatting"""
+        decoder = self.get_fmt_str_decoder(fmt_str)
+
+        return decoder.decode_args(arg_list, self.__get_string, string_tbl)
 
 
     @staticmethod
@@ -358,12 +426,9 @@ class LogParserV1(LogParser):
 
     def parse_one_normal_msg(self, logdata, offset):
         """Parse one normal log message and print the encoded message"""
-        # Parse log message header
-        log_desc, source_id = struct.unpack_from(self.fmt_msg_hdr, logdata, offset)
-        offset += struct.calcsize(self.fmt_msg_hdr)
-
-        timestamp = struct.unpack_from(self.fmt_msg_timestamp, logdata, offset)[0]
-        offset += struct.calcsize(self.fmt_msg_timestamp)
+        # Parse log message header and timestamp
+        log_desc, source_id, timestamp = self.msg_hdr_struct.unpack_from(logdata, offset)
+        offset += self.msg_hdr_struct.size
 
         # domain_id, level, pkg_len, data_len
         domain_id = log_desc & 0x07
@@ -377,25 +442,20 @@ class LogParserV1(LogParser):
         # Skip over data to point to next message (save as return value)
         next_msg_offset = offset + pkg_len + data_len
 
-        # Offset from beginning of cbprintf_packaged data to end of va_list arguments
-        offset_end_of_args = struct.unpack_from("B", logdata, offset)[0]
+        # Offset from beginning of cbprintf_packaged data to end of va_list
+        # arguments, number of appended strings in package, and number of
+        # read-only and read-write string indexes
+        offset_end_of_args, num_packed_strings, num_ro_str_indexes, \
+            num_rw_str_indexes = struct.unpack_from("BBBB", logdata, offset)
+
         offset_end_of_args *= self.data_types.get_sizeof(DataTypes.INT)
         offset_end_of_args += offset
+        offset_end_of_args += num_ro_str_indexes
+        offset_end_of_args += num_rw_str_indexes
 
         # Extra data after packaged log
         extra_data = logdata[(offset + pkg_len):next_msg_offset]
 
-        # Number of appended strings in package
-        num_packed_strings = struct.unpack_from("B", logdata, offset+1)[0]
-
-        # Number of read-only string indexes
-        num_ro_str_indexes = struct.unpack_from("B", logdata, offset+2)[0]
-        offset_end_of_args += num_ro_str_indexes
-
-        # Number of read-write string indexes
-        num_rw_str_indexes = struct.unpack_from("B", logdata, offset+3)[0]
-        offset_end_of_args += num_rw_str_indexes
-
         # Extract the string table in the packaged log message
         string_tbl = self.extract_string_table(logdata[offset_end_of_args:(offset + pkg_len)])
 
@@ -423,10 +483,11 @@ class LogParserV1(LogParser):
             logger.error("------ Error getting format string at 0x%x", fmt_str_ptr)
             return None
 
-        args = self.process_one_fmt_str(fmt_str, logdata[offset:offset_end_of_args], string_tbl)
+        decoder = self.get_fmt_str_decoder(fmt_str)
+        args = decoder.decode_args(logdata[offset:offset_end_of_args],
+                                   self.__get_string, string_tbl)
 
-        fmt_str = formalize_fmt_string(fmt_str)
-        log_msg = fmt_str % args
+        log_msg = decoder.fmt_str % args
 
         if level == 0:
             print(f"{log_msg}", end='')
@@ -470,4 +531,66 @@ class LogParserV1(LogParser):
 
         return True
 
+
+    def get_msg_len(self, logdata, offset):
+        """Return the length of the message starting at offset,
+        or None if logdata does not contain enough of the message
+        to tell"""
+        if offset >= len(logdata):
+            return None
+
+        msg_type = struct.unpack_from(self.fmt_msg_type, logdata, offset)[0]
+        msg_len = struct.calcsize(self.fmt_msg_type)
+
+        if msg_type == MSG_TYPE_DROPPED:
+            return msg_len + struct.calcsize(self.fmt_dropped_cnt)
+
+        if msg_type != MSG_TYPE_NORMAL:
+            # Let parse_log_data() report the unknown message type
+            return msg_len
+
+        if offset + msg_len + struct.calcsize(self.fmt_msg_hdr) > len(logdata):
+            return None
+
+        log_desc = struct.unpack_from(self.fmt_msg_hdr, logdata, offset + msg_len)[0]
+        pkg_len = (log_desc >> 6) & int(math.pow(2, 10) - 1)
+        data_len = (log_desc >> 16) & int(math.pow(2, 12) - 1)
+
+        return msg_len + struct.calcsize(self.fmt_msg_hdr) \
+            + struct.calcsize(self.fmt_msg_timestamp) + pkg_len + data_len
+
+
+    def parse_log_stream(self, chunks, debug=False):
+        """Parse binary log data from an iterable of chunks and
+        print the encoded log messages. Each message is printed
+        as soon as all of it has been received, so this can be
+        used on a live log stream."""
+        pending = bytearray()
+
+        for chunk in chunks:
+            pending += chunk
+
+            offset = 0
+            while True:
+                msg_len = self.get_msg_len(pending, offset)
+                if msg_len is None or offset + msg_len > len(pending):
+                    break
+
+                if not self.parse_log_data(bytes(pending[offset:offset + msg_len]),
+                                           debug=debug):
+                    return False
+
+                offset += msg_len
+
+            # Keep the incomplete message for the next chunk
+            del pending[:offset]
+
+            sys.stdout.flush()
+
+        if pending:
+            logger.error("------ Incomplete message at end of log data")
+            return False
+
+        return True
+
 colorama.init()
@@ -9,20 +9,14 @@ Utilities for Dictionary-based Logging Parser
 """
 
 import binascii
+import bisect
+import itertools
 
 
 def convert_hex_file_to_bin(hexfile):
     """This converts a file in hexadecimal to binary"""
-    bin_data = b''
-
     with open(hexfile, "r", encoding="iso-8859-1") as hfile:
-        for line in hfile.readlines():
-            hex_str = line.strip()
-
-            bin_str = binascii.unhexlify(hex_str)
-            bin_data += bin_str
-
-    return bin_data
+        return b''.join(binascii.unhexlify(line.strip()) for line in hfile)
 
 
 def extract_one_string_in_section(section, str_ptr):
@@ -34,13 +28,12 @@ def extract_one_string_in_section(section, str_ptr):
     if offset < 0 or offset >= max_offset:
         return None
 
-    ret_str = ""
-
-    while (offset < max_offset) and (data[offset] != 0):
-        ret_str += chr(data[offset])
-        offset += 1
+    end = data.find(b'\0', offset, max_offset)
+    if end == -1:
+        end = max_offset
 
-    return ret_str
+    # Each byte is one character, like chr() would give
+    return bytes(data[offset:end]).decode("iso-8859-1")
 
 
 def find_string_in_mappings(string_mappings, str_ptr):
@@ -65,3 +58,45 @@ def find_string_in_mappings(string_mappings, str_ptr):
             return whole_str[str_ptr - ptr:]
 
     return None
+
+
+class AddressIndex():
+    """
+    Index of address ranges, for finding the range containing an
+    address with a binary search instead of checking every range
+    """
+    def __init__(self, ranges):
+        """
+        ranges is an iterable of (start, size, value) tuples. If several
+        ranges contain an address, the earliest one in ranges is used.
+        """
+        entries = sorted((start, start + size, order, value)
+                         for order, (start, size, value) in enumerate(ranges))
+
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.orders = [entry[2] for entry in entries]
+        self.values = [entry[3] for entry in entries]
+
+        # Largest end address of the ranges up to each index, to know when
+        # no earlier range can contain an address anymore
+        self.max_ends = list(itertools.accumulate(self.ends, max))
+
+    def find(self, addr):
+        """
+        Return the value of the range containing addr, or None if there
+        is no such range
+        """
+        idx = bisect.bisect_right(self.starts, addr)
+        found = None
+
+        while idx > 0 and self.max_ends[idx - 1] > addr:
+            idx -= 1
+            if self.ends[idx] > addr and \
+               (found is None or self.orders[idx] < self.orders[found]):
+                found = idx
+
+        if found is None:
+            return None
+
+        return self.values[found]
@@ -7,13 +7,19 @@
 """
 Log Parser for Dictionary-based Logging
 
-This uses the JSON database file to decode the input binary
-log data and print the log messages.
+This uses the database file, in either JSON or binary format,
+to decode the input binary log data and print the log messages.
+
+The log data is read and decoded in chunks, and each message is
+printed as soon as it has been received, so the log of a running
+device can be decoded as it is being captured, for example by
+reading it from standard input.
 """
 
 import argparse
 import binascii
 import logging
+import re
 import sys
 
 import dictionary_parser
@@ -25,13 +31,21 @@ logger = logging.getLogger("parser")
 
 LOG_HEX_SEP = "##ZLOGV1##"
 
+# Number of bytes read from the log data file at a time
+CHUNK_SIZE = 64 * 1024
+
+LINE_END_REGEX = re.compile("[\r\n]")
+NON_HEX_REGEX = re.compile("[^0-9a-fA-F]")
+
 
 def parse_args():
     """Parse command line arguments"""
     argparser = argparse.ArgumentParser(allow_abbrev=False)
 
-    argparser.add_argument("dbfile", help="Dictionary Logging Database file")
-    argparser.add_argument("logfile", help="Log Data file")
+    argparser.add_argument("dbfile",
+                           help="Dictionary Logging Database file, in JSON or binary format")
+    argparser.add_argument("logfile",
+                           help="Log Data file, or - to read from standard input")
     argparser.add_argument("--hex", action="store_true",
                            help="Log Data file is in hexadecimal strings")
     argparser.add_argument("--rawhex", action="store_true",
@@ -42,63 +56,155 @@ def parse_args():
     return argparser.parse_args()
 
 
-def read_log_file(args):
+class HexLogDecoder():
     """
-    Read the log from file
+    Incremental decoder for log data in hexadecimal strings, mixed
+    with other output. The log data starts after LOG_HEX_SEP and
+    ends at the first character that is not a hexadecimal digit.
+    Whitespace at the beginning and end of lines is ignored.
     """
-    logdata = None
+    def __init__(self):
+        self.found_start = False
+        self.done = False
 
-    # Open log data file for reading
-    if args.hex:
-        if args.rawhex:
-            # Simply log file with only hexadecimal data
-            logdata = dictionary_parser.utils.convert_hex_file_to_bin(args.logfile)
-        else:
-            hexdata = ''
-
-            with open(args.logfile, "r", encoding="iso-8859-1") as hexfile:
-                for line in hexfile.readlines():
-                    hexdata += line.strip()
-
-            if LOG_HEX_SEP not in hexdata:
-                logger.error("ERROR: Cannot find start of log data, exiting...")
-                sys.exit(1)
-
-            idx = hexdata.index(LOG_HEX_SEP) + len(LOG_HEX_SEP)
-            hexdata = hexdata[idx:]
-
-            if len(hexdata) % 2 != 0:
-                # Make sure there are even number of characters
-                idx = int(len(hexdata) / 2) * 2
-                hexdata = hexdata[:idx]
-
-            idx = 0
-            while idx < len(hexdata):
-                # When running QEMU via west or ninja, there may be additional
-                # strings printed by QEMU, west or ninja (for example, QEMU
-                # is terminated, or user interrupted, etc). So we need to
-                # figure out where the end of log data stream by
-                # trying to convert from hex to bin.
-                idx += 2
-
-                try:
-                    binascii.unhexlify(hexdata[:idx])
-                except binascii.Error:
-                    idx -= 2
-                    break
-
-            logdata = binascii.unhexlify(hexdata[:idx])
-    else:
-        logfile = open(args.logfile, "rb")
-        if not logfile:
-            logger.error("ERROR: Cannot open binary log data file: %s, exiting...", args.logfile)
-            sys.exit(1)
+        # Text searched for LOG_HEX_SEP so far
+        self.search_text = ''
+
+        # Whitespace at the end of the text so far, which is only
+        # part of the log data if the line continues
+        self.trailing_space = ''
+        self.line_started = False
+
+        # Hexadecimal digit left over from the last call
+        self.odd_digit = ''
+
+
+    def decode(self, text):
+        """
+        Return the binary log data in text, which continues the text
+        passed to earlier calls
+        """
+        if self.done:
+            return b''
+
+        bin_data = []
+
+        *lines, last_line = LINE_END_REGEX.split(self.trailing_space + text)
+
+        for line in lines:
+            if self.line_started:
+                line = line.rstrip()
+            else:
+                line = line.strip()
+            self.line_started = False
+
+            self.decode_stripped(line, bin_data)
+
+        # The beginning of an incomplete line can already be decoded
+        line = last_line.rstrip()
+        self.trailing_space = last_line[len(line):]
+        if not self.line_started:
+            line = line.lstrip()
+
+        if line:
+            self.line_started = True
+            self.decode_stripped(line, bin_data)
+
+        return b''.join(bin_data)
+
+
+    def decode_stripped(self, text, bin_data):
+        """Decode text with whitespace around lines removed"""
+        if self.done:
+            return
+
+        if not self.found_start:
+            self.search_text += text
+
+            idx = self.search_text.find(LOG_HEX_SEP)
+            if idx == -1:
+                # Keep enough to find a separator split between calls
+                self.search_text = self.search_text[-(len(LOG_HEX_SEP) - 1):]
+                return
+
+            self.found_start = True
+            text = self.search_text[idx + len(LOG_HEX_SEP):]
+            self.search_text = ''
+
+        # When running QEMU via west or ninja, there may be additional
+        # strings printed by QEMU, west or ninja (for example, QEMU
+        # is terminated, or user interrupted, etc). So the log data
+        # stream ends at the first character that is not hexadecimal.
+        match = NON_HEX_REGEX.search(text)
+        if match:
+            text = text[:match.start()]
+            self.done = True
+
+        text = self.odd_digit + text
+        idx = len(text) - len(text) % 2
+        self.odd_digit = text[idx:]
 
-        logdata = logfile.read()
+        bin_data.append(bytes.fromhex(text[:idx]))
 
-        logfile.close()
 
-    return logdata
+def decode_rawhex(texts):
+    """
+    Decode text chunks of a log file with only hexadecimal log data,
+    a line at a time
+    """
+    last_line = ''
+
+    for text in texts:
+        *lines, last_line = LINE_END_REGEX.split(last_line + text)
+
+        yield b''.join(binascii.unhexlify(line.strip()) for line in lines)
+
+    yield binascii.unhexlify(last_line.strip())
+
+
+def read_file_chunks(filename):
+    """
+    Read a file in chunks, returning each chunk as soon as it is
+    available. Standard input is read if filename is '-'.
+    """
+    if filename == "-":
+        logfile = sys.stdin.buffer
+        yield from iter(lambda: logfile.read1(CHUNK_SIZE), b'')
+        return
+
+    with open(filename, "rb") as logfile:
+        yield from iter(lambda: logfile.read1(CHUNK_SIZE), b'')
+
+
+def read_log_data(args):
+    """
+    Read the log from file, returning the binary log data in chunks
+    as it is read
+    """
+    chunks = read_file_chunks(args.logfile)
+
+    if not args.hex:
+        yield from chunks
+        return
+
+    texts = (chunk.decode("iso-8859-1") for chunk in chunks)
+
+    if args.rawhex:
+        # Simply log file with only hexadecimal data
+        yield from decode_rawhex(texts)
+        return
+
+    decoder = HexLogDecoder()
+
+    for text in texts:
+        yield decoder.decode(text)
+
+        if decoder.done:
+            break
+
+    if not decoder.found_start:
+        logger.error("ERROR: Cannot find start of log data, exiting...")
+        sys.exit(1)
 
 
 def main():
@@ -113,16 +219,11 @@ def main():
         logger.setLevel(logging.INFO)
 
     # Read from database file
-    database = LogDatabase.read_json_database(args.dbfile)
+    database = LogDatabase.read_database(args.dbfile)
     if database is None:
         logger.error("ERROR: Cannot open database file: %s, exiting...", args.dbfile)
         sys.exit(1)
 
-    logdata = read_log_file(args)
-    if logdata is None:
-        logger.error("ERROR: cannot read log from file: %s, exiting...", args.logfile)
-        sys.exit(1)
-
     log_parser = dictionary_parser.get_parser(database)
     if log_parser is not None:
         logger.debug("# Build ID: %s", database.get_build_id())
@@ -132,7 +233,7 @@ def main():
         else:
             logger.debug("# Endianness: Big")
 
-        ret = log_parser.parse_log_data(logdata, debug=args.debug)
+        ret = log_parser.parse_log_stream(read_log_data(args), debug=args.debug)
         if not ret:
             logger.error("ERROR: there were error(s) parsing log data")
             sys.exit(1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for elf_index.py"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.environ["ZEPHYR_BASE"], "scripts", "build"))
+import elf_index as iut  # Implementation Under Test
+
+ELF_FILE = "zephyr.elf"
+
+TEXT_DATA = bytes(range(16))
+RODATA_DATA = b"rodata!\0"
+BSS_SIZE = 0x100
+
+# Section indexes in the file written by write_elf()
+TEXT, RODATA, BSS = 1, 2, 3
+
+SHN_UNDEF = 0
+SHN_ABS = 0xfff1
+
+STB_LOCAL, STB_GLOBAL = 0, 1
+STT_NOTYPE, STT_OBJECT, STT_FUNC, STT_SECTION = 0, 1, 2, 3
+
+
+def addrs(elfclass):
+    """Return the (.text, .rodata, .bss) addresses for 'elfclass'"""
+    base = 0x10000000 if elfclass == 32 else 0xffff800010000000
+    # .rodata directly follows .text
+    return base, base + len(TEXT_DATA), base + 0x1000
+
+
+def symbols(elfclass):
+    """Return the (name, value, size, bind, type, shndx) symbols to write"""
+    text, rodata, bss = addrs(elfclass)
+    return [
+        ("", 0, 0, STB_LOCAL, STT_NOTYPE, SHN_UNDEF),
+        ("", text, 0, STB_LOCAL, STT_SECTION, TEXT),
+        ("$t", text, 0, STB_LOCAL, STT_NOTYPE, TEXT),
+        ("main", text, 8, STB_GLOBAL, STT_FUNC, TEXT),
+        ("CONFIG_X", text, 0, STB_GLOBAL, STT_NOTYPE, SHN_ABS),
+        ("alias", text, 8, STB_GLOBAL, STT_FUNC, TEXT),
+        ("dup", rodata, 8, STB_GLOBAL, STT_OBJECT, RODATA),
+        ("dup", bss, 4, STB_GLOBAL, STT_OBJECT, BSS),
+        ("ext", 0, 0, STB_GLOBAL, STT_NOTYPE, SHN_UNDEF),
+    ]
+
+
+def write_elf(elfclass, little_endian):
+    """Write a small ELF file with a few sections and symbols"""
+    bo = "<" if little_endian else ">"
+    if elfclass == 32:
+        ehdr_fmt, shdr_fmt = "16sHHIIIIIHHHHHH", "10I"
+    else:
+        ehdr_fmt, shdr_fmt = "16sHHIQQQIHHHHHH", "IIQQQQIIQQ"
+    ehdr_size = struct.calcsize(bo + ehdr_fmt)
+
+    strtab = bytearray(b"\0")
+    symtab = bytearray()
+    for name, value, size, bind, typ, shndx in symbols(elfclass):
+        name_offset = 0
+        if name:
+            name_offset = len(strtab)
+            strtab += name.encode() + b"\0"
+        info = (bind << 4) | typ
+        if elfclass == 32:
+            symtab += struct.pack(bo + "IIIBBH", name_offset, value, size,
+                                  info, 0, shndx)
+        else:
+            symtab += struct.pack(bo + "IBBHQQ", name_offset, info, 0, shndx,
+                                  value, size)
+
+    names = [".text", ".rodata", ".bss", ".symtab", ".strtab", ".shstrtab"]
+    shstrtab = b"\0" + b"\0".join(name.encode() for name in names) + b"\0"
+    name_offsets = [shstrtab.index(b"\0" + name.encode() + b"\0") + 1
+                    for name in names]
+
+    contents = [TEXT_DATA, RODATA_DATA, b"", bytes(symtab), bytes(strtab),
+                shstrtab]
+    offsets = []
+    offset = ehdr_size
+    for data in contents:
+        offsets.append(offset)
+        offset += len(data)
+    shoff = (offset + 7) & ~7
+
+    text, rodata, bss = addrs(elfclass)
+    first_global = 3
+    # name, type, flags, addr, offset, size, link, info, addralign, entsize
+    shdrs = [
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        (name_offsets[0], 1, 6, text, offsets[0], len(TEXT_DATA), 0, 0, 4, 0),
+        (name_offsets[1], 1, 2, rodata, offsets[1], len(RODATA_DATA), 0, 0,
+         4, 0),
+        (name_offsets[2], 8, 3, bss, offsets[2], BSS_SIZE, 0, 0, 4, 0),
+        (name_offsets[3], 2, 0, 0, offsets[3], len(symtab), 5, first_global,
+         4, 16 if elfclass == 32 else 24),
+        (name_offsets[4], 3, 0, 0, offsets[4], len(strtab), 0, 0, 1, 0),
+        (name_offsets[5], 3, 0, 0, offsets[5], len(shstrtab), 0, 0, 1, 0),
+    ]
+
+    ident = b"\x7fELF" + bytes([1 if elfclass == 32 else 2,
+                                1 if little_endian else 2, 1])
+    with open(ELF_FILE, "wb") as f:
+        # ET_EXEC, EM_NONE
+        f.write(struct.pack(bo + ehdr_fmt, ident, 2, 0, 1, text, 0, shoff,
+                            0, ehdr_size, 0, 0,
+                            struct.calcsize(bo + shdr_fmt), len(shdrs), 6))
+        for data in contents:
+            f.write(data)
+        f.write(bytes(shoff - f.tell()))
+        for shdr in shdrs:
+            f.write(struct.pack(bo + shdr_fmt, *shdr))
+
+
+FORMATS = [(32, True), (32, False), (64, True), (64, False)]
+
+
+@pytest.mark.parametrize("elfclass, little_endian", FORMATS)
+def test_symbols(tmpdir, elfclass, little_endian):
+    """Test that symbols are decoded like they were written"""
+    tmpdir.chdir()
+    write_elf(elfclass, little_endian)
+
+    index = iut.ElfIndex(ELF_FILE)
+    assert index.elfclass == elfclass
+    assert index.little_endian == little_endian
+
+    text, rodata, bss = addrs(elfclass)
+    assert [tuple(sym) for sym in index.symbols] == [
+        ("", 0, 0, "STT_NOTYPE", "STB_LOCAL", "SHN_UNDEF"),
+        ("", text, 0, "STT_SECTION", "STB_LOCAL", TEXT),
+        ("$t", text, 0, "STT_NOTYPE", "STB_LOCAL", TEXT),
+        ("main", text, 8, "STT_FUNC", "STB_GLOBAL", TEXT),
+        ("CONFIG_X", text, 0, "STT_NOTYPE", "STB_GLOBAL", "SHN_ABS"),
+        ("alias", text, 8, "STT_FUNC", "STB_GLOBAL", TEXT),
+        ("dup", rodata, 8, "STT_OBJECT", "STB_GLOBAL", RODATA),
+        ("dup", bss, 4, "STT_OBJECT", "STB_GLOBAL", BSS),
+        ("ext", 0, 0, "STT_NOTYPE", "STB_GLOBAL", "SHN_UNDEF"),
+    ]
+
+    # The last symbol with a name is used
+    assert index.symbol("dup").value == bss
+    assert index.symbol_values()["dup"] == bss
+    assert index.symbol("nope") is None
+
+    # Symbols saved next to the ELF file are the same
+    cached = iut.ElfIndex(ELF_FILE, cache=True).symbols
+    assert os.path.isfile(ELF_FILE + ".symidx")
+    assert iut.ElfIndex(ELF_FILE, cache=True).symbols == cached == \
+        index.symbols
+
+
+@pytest.mark.parametrize("elfclass, little_endian", FORMATS)
+def test_symbols_at(tmpdir, elfclass, little_endian):
+    """Test that symbols_at() returns section symbols in symtab order"""
+    tmpdir.chdir()
+    write_elf(elfclass, little_endian)
+
+    index = iut.ElfIndex(ELF_FILE)
+    text, rodata, bss = addrs(elfclass)
+
+    # Absolute and undefined symbols are not included
+    assert [sym.name for sym in index.symbols_at(text)] == \
+        ["", "$t", "main", "alias"]
+    assert [sym.name for sym in index.symbols_at(rodata)] == ["dup"]
+    assert [sym.shndx for sym in index.symbols_at(bss)] == [BSS]
+    assert index.symbols_at(text + 1) == []
+    assert index.symbols_at(0) == []
+
+
+@pytest.mark.parametrize("elfclass, little_endian", FORMATS)
+def test_read(tmpdir, elfclass, little_endian):
+    """Test reading section contents by address"""
+    tmpdir.chdir()
+    write_elf(elfclass, little_endian)
+
+    index = iut.ElfIndex(ELF_FILE)
+    text, rodata, bss = addrs(elfclass)
+
+    assert bytes(index.read(text, len(TEXT_DATA))) == TEXT_DATA
+    assert bytes(index.read(text + 12, 4)) == TEXT_DATA[12:]
+    assert bytes(index.read(rodata, len(RODATA_DATA))) == RODATA_DATA
+
+    # Reads across section boundaries, or outside of sections, fail
+    assert index.read(text + 14, 4) is None
+    assert index.read(rodata + len(RODATA_DATA) - 1, 2) is None
+    assert index.read(text - 1, 1) is None
+
+    # NOBITS sections have no contents in the file
+    assert index.read(bss, 1) is None
+    assert bytes(index.section_data(".bss")) == b""
+
+    assert bytes(index.section_data(".rodata")) == RODATA_DATA
+    assert index.section_data(".nope") is None
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for the --builtin-hash perfect hash table in process_gperf.py"""
+
+import argparse
+import io
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.environ["ZEPHYR_BASE"], "scripts", "build"))
+import process_gperf as iut  # Implementation Under Test
+
+KEYWORD_FILE = "kobject_hash.gperf"
+
+
+def write_keyword_file(addrs, ptr_size):
+    """Write a gperf input file like gen_kobject_list.py does"""
+    with open(KEYWORD_FILE, "w") as fp:
+        fp.write("%define lookup-function-name z_object_lookup\n"
+                 "%struct-type\n"
+                 "%{\n#include <zephyr/kernel.h>\n%}\n"
+                 "struct z_object;\n"
+                 "%%\n")
+        for addr in addrs:
+            key = "".join("\\x%02x" % b
+                          for b in addr.to_bytes(ptr_size, "little"))
+            fp.write('"%s", {0}, K_OBJ_SEM, 0, { .unused = 0 }\n' % key)
+        fp.write("%%\n")
+
+
+def gen_table(addrs, ptr_size):
+    """Return the generated C code for a table of addrs"""
+    iut.args = argparse.Namespace(verbose=False, pattern="struct z_object")
+
+    write_keyword_file(addrs, ptr_size)
+    fp = io.StringIO()
+    iut.write_builtin_hash(KEYWORD_FILE, fp)
+
+    return fp.getvalue()
+
+
+def make_lookup(code):
+    """Return a function that looks up addresses in the generated code"""
+    displacements = [int(d) for d in re.search(
+        r"displacements\[\] =\s*{([^}]*)}", code).group(1).split(",")
+                     if d.strip()]
+    wordlist = re.search(r"wordlist\[\] =\s*{(.*?)\n  };", code,
+                         re.DOTALL).group(1).splitlines()[1:]
+    names = [int(m.group(1), 16) if m else None
+             for m in (re.match(r"\s*{\(char \*\)(0x[0-9a-f]+),", entry)
+                       for entry in wordlist)]
+    seed, bucket_mul, mask, slot_mul, size = (int(v, 0) for v in re.search(
+        r"mix\(x \^ (\d+)U, (0x[0-9a-f]+)U\) & (\d+)U\], "
+        r"(0x[0-9a-f]+)U\) % (\d+)U", code).groups())
+
+    assert len(displacements) == mask + 1
+    assert len(names) == size
+
+    def lookup(addr):
+        x = (addr ^ (addr >> 32)) & 0xffffffff
+        d = displacements[iut.mix(x ^ seed, bucket_mul) & mask]
+        key = iut.mix(x ^ d, slot_mul) % size
+        return names[key] == addr
+
+    return lookup
+
+
+def test_builtin_hash(tmpdir):
+    """Test that every key is found, and that non-keys are not"""
+    tmpdir.chdir()
+    rand = random.Random(0)
+
+    for ptr_size in (4, 8):
+        for n in (0, 1, 2, 3, 100, 2000):
+            addrs = [0x20000000 + 4 * i
+                     for i in rand.sample(range(0x40000), n)]
+            if ptr_size == 8:
+                addrs = [0xffff800000000000 | addr for addr in addrs]
+
+            lookup = make_lookup(gen_table(addrs, ptr_size))
+
+            assert all(lookup(addr) for addr in addrs)
+            assert not any(lookup(addr + 1) or lookup(addr + 2)
+                           for addr in addrs)
+            assert not lookup(0)
+
+
+def test_builtin_hash_size(tmpdir):
+    """Test that the table size only depends on the number of keys"""
+    tmpdir.chdir()
+    rand = random.Random(0)
+
+    shapes = set()
+    for _ in range(5):
+        addrs = [0x20000000 + 4 * i for i in rand.sample(range(0x40000), 500)]
+        code = gen_table(addrs, 4)
+        shapes.add((re.search(r"MAX_HASH_VALUE \d+", code).group(0),
+                    re.search(r"static const \w+ displacements", code).group(0),
+                    len(re.search(r"displacements\[\] =\s*{([^}]*)}",
+                                  code).group(1).split(","))))
+
+    assert len(shapes) == 1
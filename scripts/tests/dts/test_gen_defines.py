@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for the --batch mode of gen_defines.py"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+GEN_DEFINES = os.path.join(os.environ["ZEPHYR_BASE"], "scripts", "dts",
+                           "gen_defines.py")
+
+BINDING = """
+description: Memory region
+compatible: "test,region"
+properties:
+  zephyr,memory-region:
+    type: string
+"""
+
+GOOD_DTS = """
+/dts-v1/;
+
+/ {
+	foo {
+		compatible = "test,region";
+		zephyr,memory-region = "FOO";
+	};
+};
+"""
+
+# Duplicate 'zephyr,memory-region' values are caught while writing the header
+BAD_DTS = """
+/dts-v1/;
+
+/ {
+	foo {
+		compatible = "test,region";
+		zephyr,memory-region = "FOO";
+	};
+	bar {
+		compatible = "test,region";
+		zephyr,memory-region = "FOO";
+	};
+};
+"""
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_error(tmpdir, jobs):
+    """Test that an error in one devicetree doesn't stop the others"""
+    tmpdir.chdir()
+    os.mkdir("bindings")
+    with open(os.path.join("bindings", "test,region.yaml"), "w") as f:
+        f.write(BINDING)
+
+    with open("bad.dts", "w") as f:
+        f.write(BAD_DTS)
+    with open("good.dts", "w") as f:
+        f.write(GOOD_DTS)
+    with open("batch.txt", "w") as f:
+        f.write("bad.dts out-bad\ngood.dts out-good\n")
+
+    proc = subprocess.run([sys.executable, GEN_DEFINES,
+                           "--bindings-dirs", "bindings",
+                           "--dtc-flags", "",
+                           "--batch", "batch.txt",
+                           "--batch-jobs", str(jobs),
+                           "--binding-cache", "bindings.pickle"],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          text=True)
+
+    assert proc.returncode != 0
+    assert "bad.dts: ERROR: Duplicate 'zephyr,memory-region'" in proc.stderr
+    assert "good.dts" not in proc.stderr
+
+    for name in ("devicetree_generated.h", "zephyr.dts", "edt.pickle"):
+        assert os.path.isfile(os.path.join("out-good", name))
+    assert not os.path.exists(os.path.join("out-bad", "edt.pickle"))
+
+    if jobs == 1:
+        assert os.path.isfile("bindings.pickle")
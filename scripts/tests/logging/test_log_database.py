@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 The Zephyr Project Contributors
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for the JSON and binary dictionary logging database formats"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.environ["ZEPHYR_BASE"], "scripts",
+                                "logging", "dictionary"))
+from dictionary_parser import binary_database
+from dictionary_parser.log_database import LogDatabase
+
+# Not sorted by address, with strings that overlap each other and strings
+# with non-ASCII characters
+STRING_MAPPINGS = {
+    0x1000: "hello world",
+    0x1800: "x",
+    0x1006: "world",
+    0x1003: "lo wo",
+    0x2000: "héllo ✓",
+    0x0fff: "ahello",
+}
+
+SECTION_DATA = b"abc\0d\xe9f\0tail"
+
+
+def make_database():
+    """Return a LogDatabase with string mappings and a section"""
+    database = LogDatabase()
+    database.set_arch("arm")
+    database.set_tgt_bits(32)
+    database.set_tgt_endianness(LogDatabase.LITTLE_ENDIAN)
+    database.set_build_id("0123456789abcdef")
+    database.add_kconfig("CONFIG_LOG", 1)
+    database.add_log_instance(3, "inst", 2, 0x4000)
+    database.database['sections'] = {
+        'rodata': {
+            'name': 'rodata',
+            'size': len(SECTION_DATA),
+            'start': 0x3000,
+            'end': 0x3000 + len(SECTION_DATA) - 1,
+            'data': SECTION_DATA,
+        },
+    }
+    database.set_string_mappings(dict(STRING_MAPPINGS))
+
+    return database
+
+
+def lookup_addrs():
+    """Return the addresses to look up strings at"""
+    addrs = set()
+    for ptr, one_str in STRING_MAPPINGS.items():
+        addrs.update(range(ptr - 1, ptr + len(one_str) + 1))
+    addrs.update(range(0x3000 - 1, 0x3000 + len(SECTION_DATA) + 1))
+    addrs.update((0, 0x10000))
+
+    return sorted(addrs)
+
+
+def write_databases(database):
+    """Write database in both formats, and return the paths"""
+    assert LogDatabase.write_json_database("db.json", database)
+    assert LogDatabase.write_binary_database("db.bin", database)
+
+    return "db.json", "db.bin"
+
+
+def test_round_trip(tmpdir):
+    """Test that both formats give the same strings as the original"""
+    tmpdir.chdir()
+    database = make_database()
+
+    for path in write_databases(database):
+        read_db = LogDatabase.read_database(path)
+        assert read_db is not None, path
+
+        assert list(read_db.get_string_mappings()) == list(STRING_MAPPINGS)
+        assert dict(read_db.get_string_mappings().items()) == STRING_MAPPINGS
+
+        for addr in lookup_addrs():
+            assert read_db.find_string(addr) == database.find_string(addr), \
+                (path, hex(addr))
+
+        assert read_db.get_build_id() == "0123456789abcdef"
+        assert read_db.get_kconfigs() == {"CONFIG_LOG": 1}
+        assert read_db.get_log_source_string(0, 3) == "inst"
+        assert read_db.is_tgt_little_endian()
+
+    # Overlapping strings and section data are found
+    assert database.find_string(0x1008) == "rld"
+    assert database.find_string(0x2001) == "éllo ✓"
+    assert database.find_string(0x3004) == "déf"
+    assert database.find_string(0x1801) is None
+
+
+@pytest.mark.parametrize("size", [0, 4, binary_database.HEADER.size - 1,
+                                  binary_database.HEADER.size, 100, -1])
+def test_truncated(tmpdir, size):
+    """Test that truncated binary databases are not read"""
+    tmpdir.chdir()
+    _, bin_path = write_databases(make_database())
+
+    with open(bin_path, "rb") as f:
+        data = f.read()
+    with open(bin_path, "wb") as f:
+        f.write(data[:size])
+
+    assert LogDatabase.read_database(bin_path) is None
+
+
+def test_wrong_version(tmpdir):
+    """Test that binary databases with another format version are not read"""
+    tmpdir.chdir()
+    _, bin_path = write_databases(make_database())
+
+    with open(bin_path, "r+b") as f:
+        f.seek(len(binary_database.MAGIC))
+        f.write((binary_database.FORMAT_VERSION + 1).to_bytes(4, "little"))
+
+    assert LogDatabase.read_database(bin_path) is None